@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Import Throughput Benchmark
+Drives fetch_data_from_api_async, insert_records_bulk_async and the whole import
+pipeline against the mock Logcomex API (no API quota used) and reports records/s,
+p50/p99 latency and peak RSS, compared with a stored baseline.
+
+The insert and import stages write to the configured MySQL database; they use
+importer names starting with "BENCHMARK IMPORTER" and delete those rows afterwards.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import sys
+import time
+
+import aiohttp
+
+import main as app_main
+from mock_logcomex_server import MockConfig, start_mock_server
+
+STAGES = ("fetch", "insert", "import")
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def stage_result(records, elapsed, latencies):
+    return {
+        "records": records,
+        "seconds": round(elapsed, 3),
+        "records_per_second": round(records / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+
+async def run_concurrently(items, concurrency, func):
+    """Run func(item) for every item with bounded concurrency; returns (results, latencies, elapsed)"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def timed(item):
+        async with semaphore:
+            started = time.perf_counter()
+            result = await func(item)
+            latencies.append(time.perf_counter() - started)
+            return result
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(timed(item) for item in items))
+    return results, latencies, time.perf_counter() - started
+
+
+async def bench_fetch(importers, start_date, end_date, concurrency):
+    fetched, latencies, elapsed = await run_concurrently(
+        importers, concurrency,
+        lambda name: app_main.fetch_data_from_api_async(start_date, end_date, name)
+    )
+    return stage_result(sum(len(records) for records in fetched), elapsed, latencies), fetched
+
+
+async def bench_insert(batches, concurrency):
+    inserted, latencies, elapsed = await run_concurrently(batches, concurrency, app_main.insert_records_bulk_async)
+    return stage_result(sum(inserted), elapsed, latencies)
+
+
+async def bench_import(importers, since, concurrency, app_url):
+    async def import_one(name):
+        body = {"since": since, "importer_name": name, "run_summarize": True}
+        if app_url:
+            async with aiohttp.ClientSession() as session:
+                async with session.post(f"{app_url.rstrip('/')}/import", json=body, timeout=600) as response:
+                    return (await response.json()).get("records_inserted", 0)
+        response = await app_main.run_import_async(app_main.ImportRequest(**body))
+        return response.records_inserted
+
+    inserted, latencies, elapsed = await run_concurrently(importers, concurrency, import_one)
+    return stage_result(sum(inserted), elapsed, latencies)
+
+
+async def cleanup(importers):
+    for name in importers:
+        await app_main.delete_importer_records_async(name)
+        await app_main.delete_importer_summary_async(name)
+
+
+def compare(results, baseline, max_regression):
+    """Print changes against the baseline; returns False if throughput regressed too much"""
+    ok = True
+    print(f"\n{'stage':>8} {'metric':>20} {'baseline':>12} {'current':>12} {'change':>9}")
+    for stage, current in results.items():
+        previous = baseline.get(stage)
+        if not previous:
+            continue
+        for metric in ("records_per_second", "p50_ms", "p99_ms", "peak_rss_mb"):
+            before, after = previous.get(metric), current.get(metric)
+            if not before:
+                continue
+            change = (after - before) / before * 100
+            print(f"{stage:>8} {metric:>20} {before:>12,.1f} {after:>12,.1f} {change:>+8.1f}%")
+            if metric == "records_per_second" and change < -max_regression:
+                ok = False
+    return ok
+
+
+async def run(args):
+    importers = [f"BENCHMARK IMPORTER {i:03d} SA DE CV" for i in range(args.importers)]
+    start_date, end_date = app_main.calculate_date_range(args.since)
+
+    runner = None
+    api_url = args.api_url
+    if not api_url:
+        config = MockConfig(
+            records=args.records, latency_ms=args.latency_ms, error_rate=args.error_rate,
+            burst_every=args.burst_every, burst_length=args.burst_length, retry_after=0
+        )
+        runner, base_url, stats = await start_mock_server(config, port=args.mock_port)
+        api_url = f"{base_url}/api/v1/details"
+    app_main.API_URL = api_url
+    app_main.API_PAGE_DELAY_SECONDS = args.page_delay
+    app_main.API_RETRY_BACKOFF_SECONDS = 0.01
+    print(f"📊 {args.importers} importers x {args.records} records, concurrency {args.concurrency}, API {api_url}")
+
+    results = {}
+    try:
+        fetch_result, batches = await bench_fetch(importers, start_date, end_date, args.concurrency)
+        if "fetch" in args.stages:
+            results["fetch"] = fetch_result
+        if "insert" in args.stages or "import" in args.stages:
+            await app_main.create_database()
+            await cleanup(importers)
+        if "insert" in args.stages:
+            results["insert"] = await bench_insert(batches, args.concurrency)
+            await cleanup(importers)
+        if "import" in args.stages:
+            if args.app_url:
+                print(f"ℹ️  /import runs on {args.app_url}; that server must use API_URL={api_url}")
+            results["import"] = await bench_import(importers, args.since, args.concurrency, args.app_url)
+            await cleanup(importers)
+    finally:
+        if runner:
+            await runner.cleanup()
+        if app_main.async_db_pool:
+            app_main.async_db_pool.close()
+            await app_main.async_db_pool.wait_closed()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark import throughput against the mock Logcomex API")
+    parser.add_argument("--stages", default="fetch", help=f"Comma-separated stages to measure: {', '.join(STAGES)}")
+    parser.add_argument("--importers", type=int, default=8)
+    parser.add_argument("--records", type=int, default=2000, help="Records per importer served by the mock")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--since", default="Last 6 Months")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Mock latency per page")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of mock pages answered with 500")
+    parser.add_argument("--burst-every", type=int, default=0, help="Mock answers 429 after every N requests")
+    parser.add_argument("--burst-length", type=int, default=0)
+    parser.add_argument("--page-delay", type=float, default=0.0, help="API_PAGE_DELAY_SECONDS for the run")
+    parser.add_argument("--mock-port", type=int, default=0, help="Port of the in-process mock (0 picks a free one)")
+    parser.add_argument("--api-url", help="Use an already running API instead of the in-process mock")
+    parser.add_argument("--app-url", help="Send the import stage to a running backend instead of calling it in-process")
+    parser.add_argument("--baseline", default="benchmark_import_baseline.json")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the new baseline")
+    parser.add_argument("--max-regression", type=float, default=10.0, help="Fail if records/s drops by more than this percent")
+    args = parser.parse_args()
+    args.stages = [stage.strip() for stage in args.stages.split(",") if stage.strip()]
+    unknown = set(args.stages) - set(STAGES)
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(sorted(unknown))}")
+
+    results = asyncio.run(run(args))
+
+    print(f"\n{'stage':>8} {'records':>9} {'seconds':>9} {'rec/s':>11} {'p50 ms':>9} {'p99 ms':>9} {'RSS MB':>8}")
+    for stage, result in results.items():
+        print(f"{stage:>8} {result['records']:>9,} {result['seconds']:>9.3f} {result['records_per_second']:>11,.1f} "
+              f"{result['p50_ms']:>9.1f} {result['p99_ms']:>9.1f} {result['peak_rss_mb']:>8.1f}")
+
+    ok = True
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            ok = compare(results, json.load(f), args.max_regression)
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Baseline saved to {args.baseline}")
+    if not ok:
+        print(f"\n❌ Throughput regressed by more than {args.max_regression}%")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
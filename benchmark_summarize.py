@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Summarization Scale Benchmark
+Times /summarize (MySQL) and import_summarize.py (SQLite) on datasets written by
+generate_dataset.py, and appends each run to a history file so summary time can be
+tracked as the data grows.
+
+    python generate_dataset.py --rows 1M --sqlite-path bench_1m.db
+    python benchmark_summarize.py --target sqlite --sqlite-path bench_1m.db
+    python benchmark_summarize.py --target mysql --mode incremental
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sqlite3
+import time
+from datetime import datetime
+
+import aiohttp
+
+import import_summarize
+import main as app_main
+
+
+def run_sqlite(path: str, since: str, clear: bool) -> dict:
+    """The import_summarize.py pipeline without its prompts, timed per phase"""
+    import_summarize.DATABASE_FILE = path
+    start_date, end_date = (datetime.strptime(value, "%Y-%m-%d") for value in app_main.calculate_date_range(since))
+    conn = sqlite3.connect(path)
+    (rows,) = conn.execute("SELECT COUNT(*) FROM import_records").fetchone()
+    conn.close()
+
+    import_summarize.create_summary_table()
+    if clear:
+        import_summarize.clear_summaries()
+
+    started = time.perf_counter()
+    importers = import_summarize.get_importers()
+    timings = {"read": 0.0, "calculate": 0.0, "write": 0.0}
+    rows_read = summaries = 0
+    for importer in importers:
+        phase_started = time.perf_counter()
+        records = import_summarize.get_importer_records(importer, start_date, end_date)
+        timings["read"] += time.perf_counter() - phase_started
+        rows_read += len(records)
+        if not records:
+            continue
+        phase_started = time.perf_counter()
+        summary = import_summarize.calculate_summary(importer, records)
+        timings["calculate"] += time.perf_counter() - phase_started
+        phase_started = time.perf_counter()
+        if summary and import_summarize.insert_summary(summary):
+            summaries += 1
+        timings["write"] += time.perf_counter() - phase_started
+    elapsed = time.perf_counter() - started
+
+    return {
+        "rows": rows,
+        "importers": len(importers),
+        "summaries": summaries,
+        "rows_read": rows_read,
+        "seconds": round(elapsed, 3),
+        "rows_per_second": round(rows_read / elapsed, 1) if elapsed else 0.0,
+        **{f"{phase}_seconds": round(seconds, 3) for phase, seconds in timings.items()},
+    }
+
+
+async def run_mysql_async(since: str, clear: bool, mode: str, app_url: str) -> dict:
+    """One /summarize run, in-process or against a running backend"""
+    body = {"since": since, "clear_existing": clear}
+    try:
+        rows = await app_main.get_table_row_count_async("import_records")
+        started = time.perf_counter()
+        if app_url:
+            async with aiohttp.ClientSession() as session:
+                async with session.post(f"{app_url.rstrip('/')}/summarize", params={"mode": mode}, json=body, timeout=3600) as response:
+                    result = await response.json()
+        else:
+            await app_main.create_database()
+            result = (await app_main.run_summarization_internal_async(app_main.SummaryRequest(**body), mode)).model_dump()
+        elapsed = time.perf_counter() - started
+    finally:
+        if app_main.async_db_pool:
+            app_main.async_db_pool.close()
+            await app_main.async_db_pool.wait_closed()
+
+    if not result.get("success"):
+        raise SystemExit(f"❌ Summarization failed: {result.get('error') or result.get('message')}")
+    return {
+        "rows": rows,
+        "mode": mode,
+        "importers": result.get("importers_processed"),
+        "summaries": result.get("summaries_created"),
+        "seconds": round(elapsed, 3),
+        "rows_per_second": round(rows / elapsed, 1) if elapsed else 0.0,
+    }
+
+
+def print_history(history_path: str, target: str):
+    """Earlier runs of the same target, smallest dataset first"""
+    with open(history_path, encoding="utf-8") as f:
+        runs = [json.loads(line) for line in f if line.strip()]
+    runs = sorted((run for run in runs if run["target"] == target), key=lambda run: (run["rows"], run["timestamp"]))
+    print(f"\n{'rows':>12} {'importers':>10} {'seconds':>10} {'rows/s':>12}  timestamp")
+    for run in runs:
+        print(f"{run['rows']:>12,} {run['importers'] or 0:>10,} {run['seconds']:>10.2f} {run['rows_per_second']:>12,.0f}  {run['timestamp']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark summarization on generated datasets")
+    parser.add_argument("--target", choices=["sqlite", "mysql"], default="sqlite")
+    parser.add_argument("--sqlite-path", default="bench_dataset.db", help="SQLite dataset (never the live importer.db)")
+    parser.add_argument("--since", default="Last 6 Months")
+    parser.add_argument("--mode", choices=["full", "incremental"], default="full", help="MySQL /summarize mode")
+    parser.add_argument("--keep-existing", action="store_true", help="Do not clear existing summaries first")
+    parser.add_argument("--app-url", help="MySQL: POST /summarize to a running backend instead of running it in-process")
+    parser.add_argument("--history", default="benchmark_summarize_history.jsonl")
+    args = parser.parse_args()
+
+    clear = not args.keep_existing
+    if args.target == "sqlite":
+        # Summarizing clears and rewrites import_summaries
+        if os.path.abspath(args.sqlite_path) == os.path.abspath(import_summarize.DATABASE_FILE):
+            parser.error(f"--sqlite-path must not be the live {import_summarize.DATABASE_FILE}; use a bench_*.db file")
+        if not os.path.exists(args.sqlite_path):
+            parser.error(f"{args.sqlite_path} not found; create it with generate_dataset.py")
+        result = run_sqlite(args.sqlite_path, args.since, clear)
+    else:
+        result = asyncio.run(run_mysql_async(args.since, clear and args.mode == "full", args.mode, args.app_url))
+
+    run = {"timestamp": datetime.now().isoformat(timespec="seconds"), "target": args.target, "since": args.since, **result}
+    print("📊 " + ", ".join(f"{key}={value}" for key, value in run.items()))
+    with open(args.history, "a", encoding="utf-8") as f:
+        f.write(json.dumps(run) + "\n")
+    print_history(args.history, args.target)
+
+
+if __name__ == "__main__":
+    main()
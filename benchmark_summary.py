@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Summary KPI Benchmark
+Measures calculate_summary throughput inline and across process pool sizes
+using synthetic import_records rows (no database needed)
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+from decimal import Decimal
+
+import main as app_main
+from main import calculate_summary, calculate_summary_columns, pack_summary_columns
+
+TRANSPORTS = ["CARRETERO", "AÉREO", "MARÍTIMO", "FERROVIARIO", None]
+CUSTOMS = [
+    "NUEVO LAREDO, NUEVO LAREDO, TAMAULIPAS",
+    "MANZANILLO, MANZANILLO, COLIMA",
+    "VERACRUZ, VERACRUZ, VERACRUZ",
+    "AEROPUERTO INTERNACIONAL DE LA CIUDAD DE MEXICO, CIUDAD DE MEXICO, CIUDAD DE MEXICO",
+    "CIUDAD JUAREZ, CIUDAD JUAREZ, CHIHUAHUA",
+]
+COUNTRIES = ["CHINA", "ESTADOS UNIDOS DE AMERICA", "ALEMANIA", "TAIWAN", "JAPON", None]
+REGIMES = ["A1", "F4", "IN", "A3", "AF", "C1", "F5", "V1", None]
+INCOTERMS = ["DAP", "EXW", "FCA", "FOB", "CIF", "CFR", "NO INFORMADO", "DDP", None]
+BROKERS = ["3995", "3714", "1720", "1973", "1893", "1983", "9831", None]
+
+
+def make_records(importer_name, count, rng):
+    """Build rows shaped like SELECT * FROM import_records"""
+    start = date(2024, 1, 1)
+    records = []
+    for i in range(count):
+        row = [None] * 22
+        row[0] = i + 1
+        row[1] = start + timedelta(days=rng.randrange(365))
+        row[2] = importer_name
+        row[6] = rng.choice(COUNTRIES)
+        row[8] = rng.choice(TRANSPORTS)
+        row[9] = f"{rng.randrange(1, 98):02d}{rng.randrange(10000):04d}"
+        row[10] = Decimal(f"{rng.uniform(1, 5000):.2f}")
+        row[11] = Decimal(f"{rng.uniform(10, 200000):.2f}")
+        row[12] = rng.choice(CUSTOMS)
+        row[13] = rng.choice(CUSTOMS)
+        row[14] = rng.choice(BROKERS)
+        row[16] = rng.choice(REGIMES)
+        row[19] = "ABC010101XYZ"
+        row[20] = rng.choice(INCOTERMS)
+        records.append(tuple(row))
+    return records
+
+
+def run_inline(batches):
+    start = time.perf_counter()
+    for importer_name, records in batches:
+        calculate_summary(importer_name, records)
+    return time.perf_counter() - start
+
+
+def run_pool(batches, workers):
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        # Warm the workers so process start-up isn't part of the measurement
+        list(pool.map(calculate_summary_columns, ["warmup"] * workers, [pack_summary_columns(batches[0][1][:10])] * workers))
+        start = time.perf_counter()
+        futures = [
+            pool.submit(calculate_summary_columns, importer_name, pack_summary_columns(records))
+            for importer_name, records in batches
+        ]
+        for future in futures:
+            future.result()
+        return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark summary KPI computation")
+    parser.add_argument("--importers", type=int, default=32, help="Number of importers to summarize")
+    parser.add_argument("--rows", type=int, default=20000, help="Records per importer")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1, help="Largest process pool to try")
+    parser.add_argument("--seed", type=int, default=42)
+    # Pool workers read SUMMARY_BACKEND from the environment when they import main
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    batches = [(f"IMPORTER {i:03d} SA DE CV", make_records(f"IMPORTER {i:03d} SA DE CV", args.rows, rng)) for i in range(args.importers)]
+    total_rows = args.importers * args.rows
+    print(f"📊 {args.importers} importers x {args.rows} rows ({total_rows:,} rows), {os.cpu_count()} CPUs")
+
+    backend = app_main.SUMMARY_BACKEND
+    app_main.SUMMARY_BACKEND = "python"
+    baseline = run_inline(batches)
+    app_main.SUMMARY_BACKEND = backend
+    print(f"{'mode':>10} {'seconds':>9} {'rows/s':>12} {'speedup':>8}")
+    print(f"{'inline':>10} {baseline:>9.3f} {total_rows / baseline:>12,.0f} {1.0:>8.2f}")
+    if app_main.use_numpy_backend():
+        elapsed = run_inline(batches)
+        print(f"{'numpy':>10} {elapsed:>9.3f} {total_rows / elapsed:>12,.0f} {baseline / elapsed:>8.2f}")
+
+    workers = 1
+    while workers <= args.max_workers:
+        elapsed = run_pool(batches, workers)
+        print(f"{f'{workers} proc':>10} {elapsed:>9.3f} {total_rows / elapsed:>12,.0f} {baseline / elapsed:>8.2f}")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Synthetic Dataset Generator
+Writes realistic import_records rows for scale testing the summarizer: Zipf-distributed
+importers, and the customs offices, HS chapters, countries, incoterms, regimes and
+brokers that the summary KPIs classify (taken from SUMMARY_DIMENSIONS in main.py).
+
+    python generate_dataset.py --rows 1M --target sqlite --sqlite-path bench_1m.db
+    python generate_dataset.py --rows 10k --target mysql --reset
+"""
+
+import argparse
+import asyncio
+import itertools
+import os
+import random
+import sqlite3
+import time
+from datetime import datetime, timedelta
+
+import import_records
+import main as app_main
+
+RECORD_COLUMNS = [
+    "dispatch_date", "importer_name", "importer_address", "supplier_name", "supplier_address",
+    "origin_destination_country", "buyer_seller_country", "entry_exit_transport",
+    "departure_hscodes", "departure_gross_weight", "departure_goods_usd_value",
+    "dispatch_customs", "entry_customs", "custom_broker_id", "customs_regime",
+    "customs_regime_id", "declaration_type", "dispatch_customs_state", "importer_id",
+    "incoterm", "container_type", "teus_qty", "departure_insurance_usd_value",
+    "departure_freight_usd_value",
+]
+
+NAME_WORDS = [
+    "INDUSTRIAS", "COMERCIALIZADORA", "DISTRIBUIDORA", "AUTOPARTES", "ELECTRONICA", "MANUFACTURAS",
+    "TECNOLOGIA", "LOGISTICA", "QUIMICA", "PLASTICOS", "METALES", "TEXTILES", "ALIMENTOS",
+    "SISTEMAS", "COMPONENTES", "EQUIPOS", "GLOBAL", "DEL NORTE", "DE MEXICO", "INTERNACIONAL",
+]
+LEGAL_FORMS = ["SA DE CV", "S DE RL DE CV", "SAPI DE CV", "SA"]
+
+
+def parse_count(value: str) -> int:
+    """'10k' -> 10000, '1M' -> 1000000"""
+    value = value.strip().upper()
+    scale = {"K": 1_000, "M": 1_000_000}.get(value[-1:], 1)
+    return int(float(value[:-1] if scale > 1 else value) * scale)
+
+
+def dimension_values(name: str, extra: list) -> list:
+    """The first spelling of every category of a summary dimension, plus values that fall into 'other'"""
+    return [patterns[0] for _, patterns in app_main.SUMMARY_DIMENSIONS[name]["categories"]] + extra
+
+
+def long_tail_weights(count: int) -> list:
+    return [1 / (rank + 1) ** 0.8 for rank in range(count)]
+
+
+class Vocabulary:
+    def __init__(self):
+        self.ports = dimension_values("port", ["CIUDAD JUAREZ, CIUDAD JUAREZ, CHIHUAHUA", "PIEDRAS NEGRAS, PIEDRAS NEGRAS, COAHUILA"])
+        self.countries = dimension_values("origin", ["ESTADOS UNIDOS DE AMERICA", "JAPON", "COREA DEL SUR", "ITALIA", "INDIA"])
+        self.incoterms = dimension_values("incoterm", ["DDP", "CPT", None])
+        self.regimes = dimension_values("regime", ["V1", "RT", None])
+        self.hs_chapters = dimension_values("hs", ["39", "40", "87", "94", "30", "48"])
+        self.transports = ["CARRETERO", "MARÍTIMO", "AÉREO", "FERROVIARIO", None]
+        self.brokers = list(app_main.SUMMARY_TRACKED_BROKERS) + ["1973", "1893", "1983", "9831", "1995", "3011", None]
+        self.weights = {name: long_tail_weights(len(getattr(self, name)))
+                        for name in ("ports", "countries", "incoterms", "regimes", "hs_chapters", "transports", "brokers")}
+
+    def pick(self, rng: random.Random, name: str):
+        return rng.choices(getattr(self, name), weights=self.weights[name])[0]
+
+
+def make_importers(count: int, rng: random.Random, vocabulary: Vocabulary) -> list:
+    """Importer profiles: name, RFC and the values most of its operations use"""
+    importers = []
+    seen = set()
+    for index in range(count):
+        while True:
+            name = f"{rng.choice(NAME_WORDS)} {rng.choice(NAME_WORDS)} {rng.randrange(1000):03d} {rng.choice(LEGAL_FORMS)}"
+            if name not in seen:
+                seen.add(name)
+                break
+        importers.append({
+            "name": name,
+            "rfc": f"{''.join(rng.choices('ABCDEFGHIJKLMNOPQRSTUVWXYZ', k=3))}{rng.randrange(1000000):06d}{rng.randrange(100):02d}A",
+            "address": f"AV. INDUSTRIAL {rng.randrange(1, 999)}, {rng.choice(vocabulary.ports).split(',')[1].strip()}",
+            "profile": {name: vocabulary.pick(rng, name) for name in vocabulary.weights},
+        })
+    return importers
+
+
+def generate_rows(rows: int, importers: list, vocabulary: Vocabulary, start: datetime, days: int,
+                  zipf_s: float, chunk_size: int, rng: random.Random):
+    """Yield chunks of 24-value tuples in RECORD_COLUMNS order"""
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) ** zipf_s for rank in range(len(importers))))
+
+    def value(profile, name):
+        # Importers mostly repeat their own routes, origins and brokers
+        return profile[name] if rng.random() < 0.7 else vocabulary.pick(rng, name)
+
+    produced = 0
+    while produced < rows:
+        count = min(chunk_size, rows - produced)
+        chunk = []
+        for importer in rng.choices(importers, cum_weights=cum_weights, k=count):
+            profile = importer["profile"]
+            port = value(profile, "ports")
+            regime = value(profile, "regimes")
+            goods_value = round(rng.lognormvariate(9, 1.5), 2)
+            chunk.append((
+                (start + timedelta(days=rng.randrange(days))).strftime("%Y-%m-%d"),
+                importer["name"],
+                importer["address"],
+                f"SUPPLIER {rng.randrange(500):03d} CO LTD",
+                f"{rng.randrange(1, 9999)} INDUSTRIAL PARK",
+                value(profile, "countries"),
+                value(profile, "countries"),
+                value(profile, "transports"),
+                f"{value(profile, 'hs_chapters')}{rng.randrange(10000):04d}",
+                round(rng.lognormvariate(6, 1.5), 2),
+                goods_value,
+                port,
+                port if rng.random() < 0.8 else vocabulary.pick(rng, "ports"),
+                value(profile, "brokers"),
+                regime,
+                regime,
+                "IMPORTACION DEFINITIVA",
+                port.split(",")[-1].strip(),
+                importer["rfc"],
+                value(profile, "incoterms"),
+                None,
+                0.0,
+                round(goods_value * rng.uniform(0, 0.01), 2),
+                round(goods_value * rng.uniform(0.01, 0.08), 2),
+            ))
+        produced += count
+        yield chunk
+
+
+class ProgressReporter:
+    """Print the running row count and rate every `interval` seconds"""
+
+    def __init__(self, interval: float = 5.0):
+        self.interval = interval
+        self.started = self.last = time.perf_counter()
+
+    def __call__(self, written: int):
+        now = time.perf_counter()
+        if now - self.last >= self.interval:
+            self.last = now
+            print(f"  {written:,} rows written ({written / (now - self.started):,.0f} rows/s)")
+
+
+def write_sqlite(path: str, chunks, reset: bool, create_index: bool, progress: ProgressReporter) -> int:
+    import_records.DATABASE_FILE = path
+    import_records.create_database()
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=OFF")
+    if reset:
+        conn.execute("DELETE FROM import_records")
+    query = (
+        f"INSERT INTO import_records ({', '.join(RECORD_COLUMNS)}) "
+        f"VALUES ({', '.join(['?'] * len(RECORD_COLUMNS))})"
+    )
+    written = 0
+    for chunk in chunks:
+        conn.executemany(query, chunk)
+        conn.commit()
+        written += len(chunk)
+        progress(written)
+    if create_index:
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_importer_date ON import_records (importer_name, dispatch_date)")
+    conn.commit()
+    conn.close()
+    return written
+
+
+async def write_mysql_async(chunks, reset: bool, progress: ProgressReporter) -> int:
+    """Bulk insert raw rows, then rebuild the catalog, monthly aggregates and counters once"""
+    await app_main.create_database()
+    if reset:
+        await app_main.clear_existing_data_async()
+    query = (
+        f"INSERT INTO import_records ({', '.join(RECORD_COLUMNS)}) "
+        f"VALUES ({', '.join(['%s'] * len(RECORD_COLUMNS))})"
+    )
+    written = 0
+    for chunk in chunks:
+        async with app_main.acquire_db_connection() as conn:
+            async with conn.cursor() as cursor:
+                await cursor.executemany(query, chunk)
+        written += len(chunk)
+        progress(written)
+
+    print("🔄 Rebuilding importers catalog, monthly aggregates and row counters...")
+    await app_main.execute_query_async("DELETE FROM importers")
+    async with app_main.acquire_db_connection() as conn:
+        async with conn.cursor() as cursor:
+            await app_main.backfill_importer_catalog_async(cursor)
+    if app_main.SUMMARY_MONTHLY_AGGREGATES:
+        await app_main.backfill_monthly_aggregates_async()
+    importers = await app_main.get_importers_async()
+    async with app_main.db_transaction() as cursor:
+        await cursor.execute("SELECT COUNT(*) FROM import_records")
+        (total,) = await cursor.fetchone()
+        await app_main.record_table_write_async("import_records", cursor, row_count=total)
+        await app_main.mark_importers_dirty_async({name: (None, None) for name in importers}, cursor)
+
+    app_main.async_db_pool.close()
+    await app_main.async_db_pool.wait_closed()
+    return written
+
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic import_records data")
+    parser.add_argument("--rows", default="10k", help="Rows to generate, e.g. 10k, 1M, 10M")
+    parser.add_argument("--importers", type=int, help="Distinct importers (default: rows / 200, at least 10)")
+    parser.add_argument("--zipf-s", type=float, default=1.1, help="Zipf exponent of rows per importer")
+    parser.add_argument("--months", type=int, default=12, help="Months of dispatch dates, ending where 'Last N Months' windows end")
+    parser.add_argument("--target", choices=["sqlite", "mysql"], default="sqlite")
+    parser.add_argument("--sqlite-path", default="bench_dataset.db", help="SQLite dataset (never the live importer.db)")
+    parser.add_argument("--no-index", action="store_true", help="SQLite: skip the (importer_name, dispatch_date) index")
+    parser.add_argument("--reset", action="store_true", help="Delete existing import records first")
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    if args.target == "sqlite" and os.path.abspath(args.sqlite_path) == os.path.abspath(import_records.DATABASE_FILE):
+        parser.error(f"--sqlite-path must not be the live {import_records.DATABASE_FILE}; use a bench_*.db file")
+
+    rows = parse_count(args.rows)
+    importer_count = args.importers or max(10, rows // 200)
+    rng = random.Random(args.seed)
+    vocabulary = Vocabulary()
+    importers = make_importers(importer_count, rng, vocabulary)
+    start_date, end_date = app_main.calculate_date_range(f"Last {args.months} Months")
+    start = datetime.strptime(start_date, "%Y-%m-%d")
+    days = (datetime.strptime(end_date, "%Y-%m-%d") - start).days + 1
+
+    print(f"📊 Generating {rows:,} rows for {importer_count:,} importers ({start_date} to {end_date}) into {args.target}")
+    chunks = generate_rows(rows, importers, vocabulary, start, days, args.zipf_s, args.chunk_size, rng)
+    progress = ProgressReporter()
+    if args.target == "sqlite":
+        written = write_sqlite(args.sqlite_path, chunks, args.reset, not args.no_index, progress)
+    else:
+        written = asyncio.run(write_mysql_async(chunks, args.reset, progress))
+    elapsed = time.perf_counter() - progress.started
+    print(f"✅ Wrote {written:,} rows in {elapsed:.1f}s ({written / elapsed:,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
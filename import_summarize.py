@@ -4,9 +4,16 @@ Minimalistic Import Summarize Script
 Self-contained - all business logic included
 """
 
+import argparse
 import os
 import sqlite3
 import csv
+import gzip
+import json
+import threading
+import time
+import requests
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from collections import Counter
 
@@ -16,6 +23,32 @@ MONTHS_BACK = 6
 # Configuration
 DATABASE_FILE = "importer.db"
 
+# Webhook delivery: comma-separated endpoints, each optionally prefixed with its HTTP method
+# ("GET https://..."; POST otherwise). Summary writes queue deliveries in the webhook_outbox
+# table; only those are sent, WEBHOOK_PAGE_SIZE at a time, split into chunks of at most
+# WEBHOOK_MAX_CHUNK_BYTES of JSON, gzip-compressed (except for GET endpoints) and sent from
+# background threads. Retry waits, including a server's Retry-After, are capped at
+# WEBHOOK_MAX_RETRY_DELAY_SECONDS.
+WEBHOOK_URLS = [url.strip() for url in os.getenv(
+    "WEBHOOK_URLS",
+    "GET http://68.183.85.45:5678/webhook-test/1538d58f-70e9-4879-84ee-4ac85b7a755c,"
+    "POST http://68.183.85.45:5678/webhook/1538d58f-70e9-4879-84ee-4ac85b7a755c"
+).split(",") if url.strip()]
+WEBHOOK_PAGE_SIZE = int(os.getenv("WEBHOOK_PAGE_SIZE", "1000"))
+WEBHOOK_MAX_CHUNK_BYTES = int(os.getenv("WEBHOOK_MAX_CHUNK_BYTES", str(512 * 1024)))
+WEBHOOK_GZIP = os.getenv("WEBHOOK_GZIP", "true").lower() == "true"
+WEBHOOK_CONCURRENCY = int(os.getenv("WEBHOOK_CONCURRENCY", "4"))
+WEBHOOK_TIMEOUT_SECONDS = float(os.getenv("WEBHOOK_TIMEOUT_SECONDS", "30"))
+WEBHOOK_MAX_RETRIES = int(os.getenv("WEBHOOK_MAX_RETRIES", "3"))
+WEBHOOK_RETRY_BACKOFF_SECONDS = float(os.getenv("WEBHOOK_RETRY_BACKOFF_SECONDS", "1"))
+WEBHOOK_MAX_RETRY_DELAY_SECONDS = float(os.getenv("WEBHOOK_MAX_RETRY_DELAY_SECONDS", "60"))
+# Durable outbox: a chunk that still fails after those retries is tried again on a later
+# pass after WEBHOOK_OUTBOX_BACKOFF_SECONDS, doubling up to WEBHOOK_OUTBOX_MAX_BACKOFF_SECONDS,
+# and dead-lettered after WEBHOOK_OUTBOX_MAX_ATTEMPTS passes
+WEBHOOK_OUTBOX_MAX_ATTEMPTS = int(os.getenv("WEBHOOK_OUTBOX_MAX_ATTEMPTS", "8"))
+WEBHOOK_OUTBOX_BACKOFF_SECONDS = float(os.getenv("WEBHOOK_OUTBOX_BACKOFF_SECONDS", "30"))
+WEBHOOK_OUTBOX_MAX_BACKOFF_SECONDS = float(os.getenv("WEBHOOK_OUTBOX_MAX_BACKOFF_SECONDS", "3600"))
+
 def get_date_input(date_type):
     """Get date input from user with month, day, year"""
     print(f"\n📅 Enter {date_type} date:")
@@ -165,18 +198,62 @@ def create_summary_table():
         ocean_freight_potential INTEGER,
         supply_chain_potential INTEGER,
         created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-        updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+        updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        change_seq INTEGER
+    )
+    """)
+    
+    # change_seq increases every time a summary is created or its values change
+    cursor.execute("PRAGMA table_info(import_summaries)")
+    if "change_seq" not in [row[1] for row in cursor.fetchall()]:
+        cursor.execute("ALTER TABLE import_summaries ADD COLUMN change_seq INTEGER")
+        cursor.execute("UPDATE import_summaries SET change_seq = id")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_import_summaries_change_seq ON import_summaries (change_seq)")
+    
+    # Webhook outbox: every summary write queues one delivery per registered endpoint in the
+    # same transaction; rows are deleted once delivered and marked 'dead' after
+    # WEBHOOK_OUTBOX_MAX_ATTEMPTS failed sends. enqueued_seq is the highest change_seq
+    # already queued for an endpoint, so a newly configured one gets the backlog once.
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS webhook_endpoints (
+        endpoint TEXT PRIMARY KEY,
+        enqueued_seq INTEGER NOT NULL DEFAULT 0
+    )
+    """)
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS webhook_outbox (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        endpoint TEXT NOT NULL,
+        importer_name TEXT NOT NULL,
+        change_seq INTEGER,
+        status TEXT NOT NULL DEFAULT 'pending',
+        attempts INTEGER NOT NULL DEFAULT 0,
+        next_attempt_at REAL NOT NULL DEFAULT 0,
+        last_error TEXT,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP
     )
     """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_webhook_outbox_due ON webhook_outbox (endpoint, status, next_attempt_at)")
+    
+    # Delivery watermarks from before the outbox: everything up to them was delivered
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'webhook_deliveries'")
+    if cursor.fetchone():
+        cursor.execute("""
+        INSERT OR IGNORE INTO webhook_endpoints (endpoint, enqueued_seq)
+        SELECT endpoint, delivered_seq FROM webhook_deliveries
+        """)
+        cursor.execute("DROP TABLE webhook_deliveries")
     
     conn.commit()
     conn.close()
 
 def clear_summaries():
-    """Clear existing summaries"""
+    """Clear existing summaries (regenerated summaries are delivered to webhooks again)"""
     conn = sqlite3.connect(DATABASE_FILE)
     cursor = conn.cursor()
     cursor.execute("DELETE FROM import_summaries")
+    cursor.execute("DELETE FROM webhook_outbox WHERE status = 'pending'")
+    cursor.execute("UPDATE webhook_endpoints SET enqueued_seq = 0")
     conn.commit()
     conn.close()
 
@@ -435,28 +512,37 @@ def calculate_summary(importer_name, records):
     }
 
 def insert_summary(summary):
-    """Insert summary into database"""
+    """
+    Insert or update an importer's summary. An existing row is only rewritten (with a
+    new updated_at and change_seq) when one of its values changed; a written row is
+    queued in the webhook outbox for every registered endpoint in the same transaction.
+    """
     conn = sqlite3.connect(DATABASE_FILE)
     cursor = conn.cursor()
     
+    columns = list(summary)
+    updated = [column for column in columns if column != "importer_name"]
     try:
-        cursor.execute("""
-        INSERT INTO import_summaries (
-            importer_name, rfc, total_pedimentos_last_6_months, total_freight_usd_value,
-            avg_freight_usd_per_shipment, customs_offices_used, pct_shipments_key_locations,
-            pct_regime_A1, pct_regime_F4, pct_regime_IN, pct_regime_A3, pct_regime_AF,
-            pct_transport_carretero, pct_transport_aereo, pct_transport_maritimo, pct_transport_not_declared,
-            pct_port_NUEVO_LAREDO, pct_port_COLOMBIA_NL, pct_port_MONTERREY_AIRPORT, pct_port_MANZANILLO,
-            pct_port_PUEBLA, pct_port_OTHERS, pct_hs_84, pct_hs_85, pct_hs_90, pct_hs_73, pct_hs_74,
-            pct_hs_OTROS, is_origin_usa, is_candidate_for_crossborder, pct_incoterm_DAP, pct_incoterm_EXW,
-            pct_incoterm_FCA, pct_incoterm_OTROS, custom_brokers_used, top_custom_broker_id,
-            pct_top_custom_broker_id, num_custom_brokers_used, pct_origin_TAIWAN, pct_origin_VIETNAM, pct_origin_CHINA, pct_origin_USA,
-            pct_origin_GERMANY, pct_origin_DENMARK, pct_origin_FRANCE, pct_origin_OTROS,
-            last_import_date, first_import_date, total_weight_kg, avg_weight_per_shipment,
-            business_opportunity_score, crossborder_potential, ocean_freight_potential, supply_chain_potential
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        cursor.execute(f"""
+        INSERT INTO import_summaries ({', '.join(columns)}, change_seq)
+        VALUES ({', '.join(['?'] * len(columns))}, (SELECT COALESCE(MAX(change_seq), 0) + 1 FROM import_summaries))
+        ON CONFLICT(importer_name) DO UPDATE SET
+            {', '.join(f"{column} = excluded.{column}" for column in updated)},
+            change_seq = excluded.change_seq,
+            updated_at = CURRENT_TIMESTAMP
+        WHERE ({', '.join(updated)}) IS NOT ({', '.join(f"excluded.{column}" for column in updated)})
         """, tuple(summary.values()))
         
+        if cursor.rowcount:
+            cursor.execute("""
+            INSERT INTO webhook_outbox (endpoint, importer_name, change_seq)
+            SELECT webhook_endpoints.endpoint, import_summaries.importer_name, import_summaries.change_seq
+            FROM webhook_endpoints, import_summaries WHERE import_summaries.importer_name = ?
+            """, (summary['importer_name'],))
+            cursor.execute("""
+            UPDATE webhook_endpoints
+            SET enqueued_seq = (SELECT change_seq FROM import_summaries WHERE importer_name = ?)
+            """, (summary['importer_name'],))
         conn.commit()
         return True
     except Exception as e:
@@ -518,6 +604,336 @@ def export_to_csv():
     except Exception as e:
         print(f"❌ Error exporting to CSV: {e}")
 
+def register_webhook_endpoints(endpoints=None):
+    """
+    Make the configured endpoints the ones summary writes queue deliveries for, queueing
+    the summaries an endpoint has not been sent yet (all of them for a new endpoint)
+    """
+    keys = [" ".join(parse_webhook_endpoint(endpoint)) for endpoint in (endpoints or WEBHOOK_URLS)]
+    conn = sqlite3.connect(DATABASE_FILE)
+    cursor = conn.cursor()
+    cursor.execute(f"DELETE FROM webhook_endpoints WHERE endpoint NOT IN ({', '.join(['?'] * len(keys))})", keys)
+    queued = 0
+    for key in keys:
+        cursor.execute("INSERT OR IGNORE INTO webhook_endpoints (endpoint) VALUES (?)", (key,))
+        cursor.execute("""
+        INSERT INTO webhook_outbox (endpoint, importer_name, change_seq)
+        SELECT ?, importer_name, change_seq FROM import_summaries
+        WHERE change_seq > (SELECT enqueued_seq FROM webhook_endpoints WHERE endpoint = ?)
+        ORDER BY change_seq
+        """, (key, key))
+        queued += cursor.rowcount
+        cursor.execute("""
+        UPDATE webhook_endpoints SET enqueued_seq = (SELECT COALESCE(MAX(change_seq), 0) FROM import_summaries)
+        WHERE endpoint = ?
+        """, (key,))
+    conn.commit()
+    conn.close()
+    return queued
+
+def get_outbox_counts(endpoint):
+    """{status: distinct importers} of an endpoint's outbox rows"""
+    conn = sqlite3.connect(DATABASE_FILE)
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT status, COUNT(DISTINCT importer_name) FROM webhook_outbox WHERE endpoint = ? GROUP BY status",
+        (endpoint,)
+    )
+    counts = dict(cursor.fetchall())
+    conn.close()
+    return counts
+
+def get_next_outbox_attempt(endpoints):
+    """Earliest next_attempt_at of the pending rows of these endpoints (None if there are none)"""
+    conn = sqlite3.connect(DATABASE_FILE)
+    cursor = conn.cursor()
+    cursor.execute(
+        f"SELECT MIN(next_attempt_at) FROM webhook_outbox WHERE status = 'pending' AND endpoint IN ({', '.join(['?'] * len(endpoints))})",
+        endpoints
+    )
+    next_attempt = cursor.fetchone()[0]
+    conn.close()
+    return next_attempt
+
+def claim_due_outbox(endpoint, limit):
+    """
+    Up to `limit` due deliveries of an endpoint, oldest first, as (summary, outbox ids,
+    attempts) with the summary's current values; several queued changes of one importer
+    are sent once
+    """
+    conn = sqlite3.connect(DATABASE_FILE)
+    conn.row_factory = sqlite3.Row
+    cursor = conn.cursor()
+    cursor.execute("""
+    SELECT importer_name, GROUP_CONCAT(id) AS ids, MAX(attempts) AS attempts, MIN(id) AS first_id
+    FROM webhook_outbox
+    WHERE endpoint = ? AND status = 'pending' AND next_attempt_at <= ?
+    GROUP BY importer_name ORDER BY first_id LIMIT ?
+    """, (endpoint, time.time(), limit))
+    due = cursor.fetchall()
+    
+    summaries = {}
+    if due:
+        names = [row["importer_name"] for row in due]
+        cursor.execute(f"SELECT * FROM import_summaries WHERE importer_name IN ({', '.join(['?'] * len(names))})", names)
+        summaries = {row["importer_name"]: dict(row) for row in cursor.fetchall()}
+    
+    claimed = []
+    orphaned = []
+    for row in due:
+        ids = [int(outbox_id) for outbox_id in row["ids"].split(",")]
+        if row["importer_name"] in summaries:
+            claimed.append((summaries[row["importer_name"]], ids, row["attempts"]))
+        else:
+            orphaned.extend(ids)
+    if orphaned:
+        # The summary was deleted since it was queued; there is nothing left to deliver
+        cursor.executemany("DELETE FROM webhook_outbox WHERE id = ?", [(outbox_id,) for outbox_id in orphaned])
+        conn.commit()
+    conn.close()
+    return claimed
+
+def complete_outbox(ids):
+    conn = sqlite3.connect(DATABASE_FILE)
+    conn.executemany("DELETE FROM webhook_outbox WHERE id = ?", [(outbox_id,) for outbox_id in ids])
+    conn.commit()
+    conn.close()
+
+def fail_outbox(deliveries, error):
+    """Schedule the next attempt of (ids, attempts) deliveries with exponential backoff, or dead-letter them"""
+    now = time.time()
+    updates = []
+    for ids, attempts in deliveries:
+        attempts += 1
+        status = "dead" if attempts >= WEBHOOK_OUTBOX_MAX_ATTEMPTS else "pending"
+        delay = min(WEBHOOK_OUTBOX_MAX_BACKOFF_SECONDS, WEBHOOK_OUTBOX_BACKOFF_SECONDS * 2 ** (attempts - 1))
+        updates.extend((status, attempts, now + delay, error, outbox_id) for outbox_id in ids)
+    conn = sqlite3.connect(DATABASE_FILE)
+    conn.executemany(
+        "UPDATE webhook_outbox SET status = ?, attempts = ?, next_attempt_at = ?, last_error = ? WHERE id = ?",
+        updates
+    )
+    conn.commit()
+    conn.close()
+
+def retry_dead_outbox():
+    """Move dead-lettered deliveries back to pending; returns how many"""
+    conn = sqlite3.connect(DATABASE_FILE)
+    cursor = conn.cursor()
+    cursor.execute("UPDATE webhook_outbox SET status = 'pending', attempts = 0, next_attempt_at = 0 WHERE status = 'dead'")
+    count = cursor.rowcount
+    conn.commit()
+    conn.close()
+    return count
+
+def webhook_gzip_enabled(method):
+    """Chunks are gzip-compressed for POST/PUT only; GET endpoints get plain JSON"""
+    return WEBHOOK_GZIP and method != "GET"
+
+def build_webhook_chunks(summaries, trigger="summary_created", max_bytes=None, extra=None, compress=None):
+    """
+    Serialize summaries into webhook request bodies holding at most max_bytes of
+    summary JSON each (a single larger summary still gets a chunk of its own),
+    gzip-compressed when `compress` is true (default WEBHOOK_GZIP).
+    Returns (body, summaries in the chunk) pairs.
+    """
+    max_bytes = max_bytes or WEBHOOK_MAX_CHUNK_BYTES
+    compress = WEBHOOK_GZIP if compress is None else compress
+    groups = []
+    current = []
+    current_size = 0
+    for summary in summaries:
+        encoded = json.dumps(summary, ensure_ascii=False, default=str).encode("utf-8")
+        if current and current_size + len(encoded) + 1 > max_bytes:
+            groups.append(current)
+            current = []
+            current_size = 0
+        current.append(encoded)
+        current_size += len(encoded) + 1
+    if current:
+        groups.append(current)
+    
+    timestamp = datetime.now().isoformat()
+    chunks = []
+    for index, group in enumerate(groups, 1):
+        header = json.dumps({
+            "timestamp": timestamp,
+            "source": "logcomex_importer",
+            "trigger": trigger,
+            "summary_count": len(group),
+            "chunk": index,
+            "chunk_count": len(groups),
+            **(extra or {}),
+        })
+        body = header[:-1].encode("utf-8") + b', "data": [' + b",".join(group) + b"]}"
+        chunks.append((gzip.compress(body, compresslevel=6) if compress else body, len(group)))
+    return chunks
+
+def parse_webhook_endpoint(endpoint):
+    """'GET https://host/path' -> ('GET', 'https://host/path'); bare URLs are POSTed"""
+    method, _, url = endpoint.partition(" ")
+    if url and method.upper() in ("GET", "POST", "PUT"):
+        return method.upper(), url.strip()
+    return "POST", endpoint
+
+def send_webhook_chunk(session, method, url, body):
+    """
+    Send one chunk, retrying connection errors, 429 and 5xx responses with exponential
+    backoff (or the Retry-After header), waiting at most WEBHOOK_MAX_RETRY_DELAY_SECONDS
+    between attempts. Returns (delivered, detail)
+    """
+    headers = {
+        'Content-Type': 'application/json',
+        'User-Agent': 'Logcomex-Importer/1.0'
+    }
+    if webhook_gzip_enabled(method):
+        headers['Content-Encoding'] = 'gzip'
+    
+    detail = ""
+    for attempt in range(WEBHOOK_MAX_RETRIES + 1):
+        delay = WEBHOOK_RETRY_BACKOFF_SECONDS * 2 ** attempt
+        try:
+            response = session.request(method, url, data=body, headers=headers, timeout=WEBHOOK_TIMEOUT_SECONDS)
+            if 200 <= response.status_code < 300:
+                return True, f"HTTP {response.status_code}"
+            detail = f"HTTP {response.status_code}"
+            if response.status_code != 429 and response.status_code < 500:
+                return False, detail
+            try:
+                delay = float(response.headers.get("Retry-After", delay))
+            except ValueError:
+                pass
+        except requests.RequestException as e:
+            detail = str(e)
+        if attempt < WEBHOOK_MAX_RETRIES:
+            time.sleep(min(max(delay, 0.0), WEBHOOK_MAX_RETRY_DELAY_SECONDS))
+    return False, detail
+
+class WebhookDispatcher:
+    """
+    Drains the webhook outbox from background threads so the rest of the script carries
+    on meanwhile. Endpoints drain concurrently; each takes up to WEBHOOK_PAGE_SIZE due
+    summaries at a time and sends their chunks concurrently. Delivered rows leave the
+    outbox, failed ones are retried with backoff on a later pass (at-least-once).
+    """
+    
+    def __init__(self, endpoints=None, concurrency=None):
+        self.endpoints = [parse_webhook_endpoint(endpoint) for endpoint in (endpoints or WEBHOOK_URLS)]
+        self.endpoint_executor = ThreadPoolExecutor(max_workers=max(1, len(self.endpoints)), thread_name_prefix="webhook-drain")
+        self.chunk_executor = ThreadPoolExecutor(max_workers=max(1, concurrency or WEBHOOK_CONCURRENCY), thread_name_prefix="webhook")
+        self.futures = []
+        self.local = threading.local()
+    
+    def _session(self):
+        # requests sessions are not thread-safe; keep one per worker thread for connection reuse
+        if not hasattr(self.local, "session"):
+            self.local.session = requests.Session()
+        return self.local.session
+    
+    def _deliver(self, method, url, body):
+        return send_webhook_chunk(self._session(), method, url, body)
+    
+    def _drain_endpoint(self, method, url, trigger):
+        """One pass over an endpoint's due deliveries; stops at the first page with a failure"""
+        started = time.perf_counter()
+        endpoint = f"{method} {url}"
+        result = {"endpoint": endpoint, "summaries": 0, "chunks": 0, "bytes": 0, "error": None}
+        result["pending"] = get_outbox_counts(endpoint).get("pending", 0)
+        page_number = 0
+        while result["error"] is None:
+            claimed = claim_due_outbox(endpoint, WEBHOOK_PAGE_SIZE)
+            if not claimed:
+                break
+            page_number += 1
+            chunks = build_webhook_chunks([summary for summary, _, _ in claimed], trigger, extra={
+                "delta": True,
+                "page": page_number,
+                "total_summaries": result["pending"],
+            }, compress=webhook_gzip_enabled(method))
+            outcomes = list(self.chunk_executor.map(lambda chunk: self._deliver(method, url, chunk[0]), chunks))
+            
+            offset = 0
+            delivered_ids = []
+            for (body, count), (delivered, detail) in zip(chunks, outcomes):
+                deliveries = claimed[offset:offset + count]
+                offset += count
+                if delivered:
+                    delivered_ids.extend(outbox_id for _, ids, _ in deliveries for outbox_id in ids)
+                    result["summaries"] += count
+                    result["chunks"] += 1
+                    result["bytes"] += len(body)
+                else:
+                    fail_outbox([(ids, attempts) for _, ids, attempts in deliveries], detail)
+                    result["error"] = detail
+            complete_outbox(delivered_ids)
+        
+        counts = get_outbox_counts(endpoint)
+        result["remaining"] = counts.get("pending", 0)
+        result["dead"] = counts.get("dead", 0)
+        result["seconds"] = time.perf_counter() - started
+        return result
+    
+    def dispatch(self, trigger="summary_created"):
+        """Start one drain pass of every endpoint in the background"""
+        for method, url in self.endpoints:
+            self.futures.append(self.endpoint_executor.submit(self._drain_endpoint, method, url, trigger))
+    
+    def wait(self):
+        """Block until the current pass has finished; returns one result per endpoint"""
+        results = [future.result() for future in self.futures]
+        self.futures = []
+        return results
+    
+    def drain(self, trigger="summary_created"):
+        """Keep passing over the outbox, sleeping out the backoff, until nothing is pending"""
+        keys = [f"{method} {url}" for method, url in self.endpoints]
+        while True:
+            self.dispatch(trigger)
+            print_webhook_results(self.wait())
+            next_attempt = get_next_outbox_attempt(keys)
+            if next_attempt is None:
+                return
+            delay = max(0.0, next_attempt - time.time())
+            if delay >= 1:
+                print(f"⏳ Next retry in {delay:.0f}s...")
+            time.sleep(delay)
+    
+    def close(self):
+        self.endpoint_executor.shutdown(wait=True)
+        self.chunk_executor.shutdown(wait=True)
+
+def print_webhook_results(results):
+    """Per-endpoint delivery report"""
+    for result in results:
+        dead = f", {result['dead']} dead-lettered" if result["dead"] else ""
+        if result["error"]:
+            print(f"  ❌ {result['endpoint']}: {result['summaries']} summaries delivered, {result['remaining']} still queued{dead}, "
+                  f"last error: {result['error']}")
+        elif result["summaries"]:
+            print(f"  ✅ {result['endpoint']}: {result['summaries']} summaries in {result['chunks']} chunks, "
+                  f"{result['bytes'] / 1024:.1f} KB{dead}")
+        elif result["remaining"]:
+            print(f"  ⏳ {result['endpoint']}: {result['remaining']} summaries waiting for their next retry{dead}")
+        else:
+            print(f"  ✅ {result['endpoint']}: up to date, nothing to send{dead}")
+
+def drain_outbox(retry_dead=False):
+    """--drain-outbox: deliver everything queued in the outbox, then exit"""
+    print("📤 DRAINING WEBHOOK OUTBOX")
+    print("=" * 25)
+    create_summary_table()
+    if retry_dead:
+        print(f"♻️  Requeued {retry_dead_outbox()} dead-lettered deliveries")
+    queued = register_webhook_endpoints()
+    if queued:
+        print(f"Queued {queued} deliveries for newly configured endpoints")
+    dispatcher = WebhookDispatcher()
+    try:
+        dispatcher.drain()
+    finally:
+        dispatcher.close()
+    print("🎉 Nothing left pending in the outbox")
+
 def main():
     print("LOGCOMEX IMPORT SUMMARIZER")
     print("=" * 40)
@@ -555,6 +971,7 @@ def main():
     # Create summary table
     print("Setting up summary table...")
     create_summary_table()
+    register_webhook_endpoints()
     
     # Check existing summaries
     cursor.execute("SELECT COUNT(*) FROM import_summaries")
@@ -656,87 +1073,37 @@ def main():
     conn.close()
     print(f"\nSummarization completed successfully!")
     
-    # Offer CSV export
-    export_to_csv()
-    
-    # Trigger webhook if requested
+    # Drain the webhook outbox in the background so it overlaps the CSV export prompt
+    dispatcher = None
     if trigger_webhook:
-        # Auto-trigger webhook after summary creation
         print(f"\n🚀 AUTO-TRIGGERING WEBHOOK...")
         try:
-            # Import webhook sender directly
-            import requests
-            import json
-            from datetime import datetime
-            
-            # Webhook URLs
-            test_url = "http://68.183.85.45:5678/webhook-test/1538d58f-70e9-4879-84ee-4ac85b7a755c"
-            prod_url = "http://68.183.85.45:5678/webhook/1538d58f-70e9-4879-84ee-4ac85b7a755c"
-           
-            # Get the summary data we just created
-            conn = sqlite3.connect(DATABASE_FILE)
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM import_summaries")
-            summaries = cursor.fetchall()
-            
-            # Get column names
-            cursor.execute("PRAGMA table_info(import_summaries)")
-            columns = [row[1] for row in cursor.fetchall()]
-            
-            # Convert to list of dictionaries
-            summary_data = []
-            for summary in summaries:
-                summary_dict = {}
-                for i, col in enumerate(columns):
-                    summary_dict[col] = summary[i]
-                summary_data.append(summary_dict)
-            
-            conn.close()
-            
-            # Prepare payload
-            payload = {
-                "timestamp": datetime.now().isoformat(),
-                "source": "logcomex_importer",
-                "trigger": "summary_created",
-                "summary_count": len(summary_data),
-                "data": summary_data
-            }
-            
-            headers = {
-                'Content-Type': 'application/json',
-                'User-Agent': 'Logcomex-Importer/1.0'
-            }
-            
-            # Send to test webhook
-            print(f"📤 Sending to TEST webhook...")
-            try:
-                response = requests.get(test_url, json=payload, headers=headers, timeout=30)
-                if response.status_code == 200:
-                    print(f"  ✅ TEST webhook triggered successfully!")
-                else:
-                    print(f"  ❌ TEST webhook failed: {response.status_code}")
-            except Exception as e:
-                print(f"  ❌ TEST webhook error: {e}")
-            
-            # Send to production webhook
-            print(f"📤 Sending to PRODUCTION webhook...")
-            try:
-                response = requests.post(prod_url, json=payload, headers=headers, timeout=30)
-                if response.status_code == 200:
-                    print(f"  ✅ PRODUCTION webhook triggered successfully!")
-                else:
-                    print(f"  ❌ PRODUCTION webhook failed: {response.status_code}")
-            except Exception as e:
-                print(f"  ❌ PRODUCTION webhook error: {e}")
-            
-            print(f"🎉 Webhook auto-trigger completed!")
-            
+            dispatcher = WebhookDispatcher()
+            dispatcher.dispatch()
+            print(f"📤 Sending new and changed summaries to {len(dispatcher.endpoints)} endpoints in the background...")
         except Exception as e:
             print(f"⚠️  Webhook auto-trigger failed: {e}")
-            print(f"💡 Summary was created successfully, but webhook trigger failed")
-    else:
-        print(f"\n⏭️  Webhook trigger skipped as requested.")
+            print(f"💡 Summary was created successfully; queued deliveries stay in the outbox")
+            dispatcher = None
+    
+    # Offer CSV export
+    export_to_csv()
+    
+    if dispatcher:
+        print(f"\n⏳ Waiting for webhook deliveries...")
+        print_webhook_results(dispatcher.wait())
+        dispatcher.close()
+        print(f"🎉 Webhook auto-trigger completed! Failed deliveries stay queued; retry them with --drain-outbox")
+    elif not trigger_webhook:
+        print(f"\n⏭️  Webhook trigger skipped as requested; changes stay queued in the outbox (--drain-outbox sends them).")
 
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Summarize import records and deliver summaries to webhooks")
+    parser.add_argument("--drain-outbox", action="store_true", help="Only deliver queued webhook summaries, retrying with backoff until none are pending")
+    parser.add_argument("--retry-dead", action="store_true", help="With --drain-outbox: requeue dead-lettered deliveries first")
+    args = parser.parse_args()
+    if args.drain_outbox:
+        drain_outbox(retry_dead=args.retry_dead)
+    else:
+        main() 
\ No newline at end of file
@@ -7,27 +7,56 @@ Integrates import_records and import_summarize functionality
 import os
 import mysql.connector
 import aiomysql
+import pymysql
 import aiohttp
 import asyncio
 import requests
 import json
 import time
 import csv
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, date
 from decimal import Decimal
-from collections import Counter
-from typing import Optional, List, Dict, Any
-from fastapi import FastAPI, HTTPException, BackgroundTasks, Query
-from fastapi.responses import JSONResponse, FileResponse
+from collections import Counter, OrderedDict
+from typing import Optional, List, Dict, Any, Callable
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Query, Header, Request
+from fastapi.responses import JSONResponse, FileResponse, Response
 from pydantic import BaseModel, Field, ValidationError
 from dotenv import load_dotenv
 import uvicorn
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+from array import array
+from operator import itemgetter
 import logging
 import re
+import base64
+import socket
+import hashlib
+import hmac
+import heapq
+import sys
+import threading
+import uuid
+import random
+import unicodedata
+import bisect
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from functools import lru_cache, wraps
 from fastapi.exceptions import RequestValidationError
 from dateutil.relativedelta import relativedelta
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 # Configure logging for better debugging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -42,14 +71,714 @@ DB_NAME = os.getenv("DB_NAME", "logcomex")
 DB_USER = os.getenv("DB_USER", "sarvesh")
 DB_PASSWORD = os.getenv("DB_PASSWORD", "Saved6-Hydrogen-Smirk-Paltry-Trimmer")
 API_KEY = os.getenv("API_KEY", "n8HPUtVG16Ea5mYi5jvlOYqFyObzTd1ZvXMTjU8s")
-API_URL = "https://bi-api.logcomex.io/api/v1/details"
+API_URL = os.getenv("API_URL", "https://bi-api.logcomex.io/api/v1/details")
+# Pause between API pages, and retries of a page answered with 429 or 5xx
+API_PAGE_DELAY_SECONDS = float(os.getenv("API_PAGE_DELAY_SECONDS", "0.5"))
+API_MAX_RETRIES = int(os.getenv("API_MAX_RETRIES", "3"))
+API_RETRY_BACKOFF_SECONDS = float(os.getenv("API_RETRY_BACKOFF_SECONDS", "1"))
 DEFAULT_MONTHS_BACK = int(os.getenv("DEFAULT_MONTHS_BACK", "6"))
 DEFAULT_IMPORTER_NAME = os.getenv("DEFAULT_IMPORTER_NAME", "DANFOSS INDUSTRIES SA DE CV")
+EXPORTS_DIR = "exports"
+EXPORT_CACHE_MAX_BYTES = int(os.getenv("EXPORT_CACHE_MAX_BYTES", str(500 * 1024 * 1024)))
+# Exports written or served within this many seconds are never evicted (a response may still be opening them)
+EXPORT_EVICT_MIN_AGE_SECONDS = float(os.getenv("EXPORT_EVICT_MIN_AGE_SECONDS", "30"))
+SUMMARY_CACHE_MAX_ENTRIES = int(os.getenv("SUMMARY_CACHE_MAX_ENTRIES", "1000"))
+SUMMARY_CACHE_TTL_SECONDS = float(os.getenv("SUMMARY_CACHE_TTL_SECONDS", "300"))
+# How often each process checks the import_summaries change counter for writes by other workers
+SUMMARY_CACHE_VERSION_CHECK_MS = float(os.getenv("SUMMARY_CACHE_VERSION_CHECK_MS", "1000"))
+STATUS_CACHE_TTL_SECONDS = float(os.getenv("STATUS_CACHE_TTL_SECONDS", "5"))
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_POLL_INTERVAL_SECONDS = float(os.getenv("JOB_POLL_INTERVAL_SECONDS", "2"))
+JOB_STALE_SECONDS = int(os.getenv("JOB_STALE_SECONDS", "300"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+IMPORT_LOCK_TIMEOUT_SECONDS = int(os.getenv("IMPORT_LOCK_TIMEOUT_SECONDS", "900"))
+# Import-lock connections each process may open at once (background jobs and synchronous POST /import)
+IMPORT_LOCK_CONNECTIONS = max(1, int(os.getenv("IMPORT_LOCK_CONNECTIONS") or JOB_WORKERS + 1))
+SCHEMA_LOCK_TIMEOUT_SECONDS = int(os.getenv("SCHEMA_LOCK_TIMEOUT_SECONDS", "900"))
+SUMMARY_MONTHLY_AGGREGATES = os.getenv("SUMMARY_MONTHLY_AGGREGATES", "true").lower() == "true"
+SUMMARY_UPSERT_BATCH_SIZE = max(1, int(os.getenv("SUMMARY_UPSERT_BATCH_SIZE", "200")))
+# Default /import handling of names missing from the importers catalog: off, suggest, correct or strict
+IMPORTER_NAME_RESOLUTION = os.getenv("IMPORTER_NAME_RESOLUTION", "off").lower()
+IMPORTER_INDEX_REFRESH_SECONDS = float(os.getenv("IMPORTER_INDEX_REFRESH_SECONDS", "300"))
+# Tracing: the share of traces logged in full, plus any trace or query slower than its threshold
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0.01"))
+SLOW_TRACE_MS = float(os.getenv("SLOW_TRACE_MS", "30000"))
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "1000"))
+TRACE_MAX_SPANS = int(os.getenv("TRACE_MAX_SPANS", "500"))
+# Admin-only request profiling (?profile=1 or X-Profile: 1 with X-Admin-Token) and the slow request log
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_STORE_SIZE = int(os.getenv("PROFILE_STORE_SIZE", "20"))
+SLOW_REQUEST_LOG_SIZE = int(os.getenv("SLOW_REQUEST_LOG_SIZE", "50"))
+SLOW_REQUEST_WINDOW_SECONDS = float(os.getenv("SLOW_REQUEST_WINDOW_SECONDS", "3600"))
+
+# Composite covering indexes for /summaries/top: filter column first, then the
+# sort key (score, freight), then every projected column so no row lookup is needed
+TOP_SUMMARY_COLUMNS = [
+    "importer_name", "rfc", "business_opportunity_score", "total_freight_usd_value",
+    "total_pedimentos_last_6_months", "is_origin_usa", "is_candidate_for_crossborder"
+]
+SUMMARY_TOP_INDEXES = {
+    "idx_top_score": "business_opportunity_score, total_freight_usd_value, is_origin_usa, is_candidate_for_crossborder, total_pedimentos_last_6_months, importer_name, rfc",
+    "idx_top_usa": "is_origin_usa, business_opportunity_score, total_freight_usd_value, is_candidate_for_crossborder, total_pedimentos_last_6_months, importer_name, rfc",
+    "idx_top_crossborder": "is_candidate_for_crossborder, business_opportunity_score, total_freight_usd_value, is_origin_usa, total_pedimentos_last_6_months, importer_name, rfc",
+}
+
+class LRUTTLCache:
+    """
+    Bounded in-memory cache with least-recently-used eviction and per-entry TTL.
+    
+    Each process keeps its own copy. Callers that share a change counter with the
+    other workers (table_versions) pass it to validate() when version_check_due(),
+    so writes made by another process drop the stale entries within
+    `version_check_seconds`; otherwise the TTL bounds how long another worker can
+    serve an entry after this process invalidated it. Writes made by this process
+    invalidate their own keys and are reported with record_own_write(), so they do
+    not clear the whole cache at the next check.
+    """
+    
+    def __init__(self, max_entries: int, ttl_seconds: float, version_check_seconds: float = 0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.version_check_seconds = version_check_seconds
+        self._entries: OrderedDict = OrderedDict()
+        self._generation = 0
+        self._version: Optional[int] = None
+        self._version_checked_at: Optional[float] = None
+        self._own_writes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+    
+    @property
+    def generation(self) -> int:
+        """Counter bumped by every invalidation, used to drop loads that raced with a write"""
+        return self._generation
+    
+    @property
+    def own_writes(self) -> int:
+        """Change counter bumps committed by this process since the last validate()"""
+        return self._own_writes
+    
+    def record_own_write(self):
+        """Count a committed bump of the shared change counter made by this process"""
+        self._own_writes += 1
+    
+    def version_check_due(self) -> bool:
+        """Whether the shared change counter has not been checked for version_check_seconds"""
+        return (
+            self._version_checked_at is None
+            or time.monotonic() - self._version_checked_at >= self.version_check_seconds
+        )
+    
+    def validate(self, version: Optional[int], own_writes: int = 0):
+        """
+        Drop every entry if the shared change counter moved by more than the
+        `own_writes` of this process (read from own_writes before fetching `version`)
+        since the last check.
+        """
+        self._version_checked_at = time.monotonic()
+        if version is None:
+            return
+        if self._version is not None and version != self._version + own_writes:
+            self.clear()
+        self._version = version
+        self._own_writes -= own_writes
+    
+    def get(self, key: Any) -> tuple[bool, Any]:
+        """Return (found, value) for a key, counting the lookup as a hit or miss"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return False, None
+        
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return False, None
+        
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return True, value
+    
+    def set(self, key: Any, value: Any, generation: Optional[int] = None):
+        """Store a value unless an invalidation happened since `generation` was read"""
+        if generation is not None and generation != self._generation:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+    
+    def invalidate(self, key: Any):
+        """Drop a single key"""
+        self._generation += 1
+        self.invalidations += 1
+        self._entries.pop(key, None)
+    
+    def clear(self):
+        """Drop every key"""
+        self._generation += 1
+        self.invalidations += 1
+        self._entries.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and occupancy"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations
+        }
+
+class ImporterNameIndex:
+    """
+    In-memory index of known importer names for autocomplete and typo checks.
+    
+    The normalized names are kept sorted, so a prefix query is a bisect into the
+    contiguous run of matches (a flattened trie without per-node dicts); a trigram
+    index over the names without their legal-form suffix (SA DE CV, S DE RL...)
+    yields fuzzy candidates that are ranked by edit distance. Results always carry
+    the original spelling.
+    """
+    
+    LEGAL_SUFFIX_TOKENS = {"SA", "SAB", "SAPI", "SAPIB", "S", "DE", "RL", "CV", "SC", "AC", "SRL", "SPR", "RI"}
+    
+    def __init__(self, max_candidates: int = 50):
+        self.max_candidates = max_candidates
+        self.loaded_at: Optional[float] = None
+        self._reset()
+    
+    def _reset(self):
+        self._names: Dict[str, str] = {}
+        self._cores: Dict[str, List[str]] = {}
+        self._sorted_keys: List[str] = []
+        self._trigrams: Dict[str, set] = {}
+    
+    def __len__(self) -> int:
+        return len(self._names)
+    
+    @staticmethod
+    def normalize(name: str) -> str:
+        """Fold case, accents and punctuation: 'Danfoss Industries, S.A. de C.V.' -> 'DANFOSS INDUSTRIES SA DE CV'"""
+        text = unicodedata.normalize("NFKD", name or "")
+        text = "".join(ch for ch in text if not unicodedata.combining(ch)).upper()
+        text = re.sub(r"[.,']", "", text)
+        return " ".join(re.sub(r"[^A-Z0-9&]+", " ", text).split())
+    
+    @classmethod
+    def core(cls, key: str) -> str:
+        """Normalized name without trailing legal-form tokens"""
+        tokens = key.split()
+        while len(tokens) > 1 and tokens[-1] in cls.LEGAL_SUFFIX_TOKENS:
+            tokens.pop()
+        return " ".join(tokens)
+    
+    @staticmethod
+    def trigrams(text: str) -> set:
+        padded = f"  {text} "
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
+    
+    @staticmethod
+    def edit_distance(a: str, b: str, limit: int) -> int:
+        """Levenshtein distance, or limit + 1 as soon as it must exceed `limit`"""
+        if abs(len(a) - len(b)) > limit:
+            return limit + 1
+        previous = list(range(len(b) + 1))
+        for i, char_a in enumerate(a, 1):
+            current = [i]
+            for j, char_b in enumerate(b, 1):
+                current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+            if min(current) > limit:
+                return limit + 1
+            previous = current
+        return previous[-1]
+    
+    @staticmethod
+    def typo_distance(core: str) -> int:
+        """Largest edit distance still treated as a typo of a name of this length"""
+        return min(3, max(1, len(core) // 8))
+    
+    @classmethod
+    def from_names(cls, names) -> "ImporterNameIndex":
+        """Build a complete index (safe to run in a worker thread, then swap in)"""
+        index = cls()
+        for name in names:
+            index._index(name)
+        index._sorted_keys = sorted(index._names)
+        index.loaded_at = time.monotonic()
+        return index
+    
+    def add(self, name: str) -> None:
+        """Index one name (no-op if an equivalent spelling is already known)"""
+        key = self._index(name)
+        if key:
+            bisect.insort(self._sorted_keys, key)
+    
+    def _index(self, name: str) -> Optional[str]:
+        key = self.normalize(name)
+        if not key or key in self._names:
+            return None
+        self._names[key] = name
+        core = self.core(key)
+        keys = self._cores.setdefault(core, [])
+        if not keys:
+            for gram in self.trigrams(core):
+                self._trigrams.setdefault(gram, set()).add(core)
+        keys.append(key)
+        return key
+    
+    def prefix(self, query: str, limit: int) -> List[str]:
+        """Names whose normalized form starts with the normalized query, alphabetically"""
+        key = self.normalize(query)
+        if not key:
+            return []
+        start = bisect.bisect_left(self._sorted_keys, key)
+        names = []
+        for candidate in self._sorted_keys[start:start + limit]:
+            if not candidate.startswith(key):
+                break
+            names.append(self._names[candidate])
+        return names
+    
+    def similar(self, query: str, max_distance: int) -> List[tuple]:
+        """(name, distance) pairs within `max_distance` of the query's core, closest first"""
+        core = self.core(self.normalize(query))
+        if not core:
+            return []
+        shared = Counter()
+        for gram in self.trigrams(core):
+            shared.update(self._trigrams.get(gram, ()))
+        
+        matches = []
+        for candidate, _ in shared.most_common(self.max_candidates):
+            distance = self.edit_distance(core, candidate, max_distance)
+            if distance <= max_distance:
+                matches.extend((self._names[key], distance) for key in self._cores[candidate])
+        matches.sort(key=lambda match: (match[1], match[0]))
+        return matches
+    
+    def lookup(self, name: str) -> Optional[str]:
+        """
+        The known spelling of a name: an exact match after normalization, or the only
+        known name with the same core (e.g. 'Danfoss Industries' -> '... SA DE CV').
+        """
+        key = self.normalize(name)
+        if key in self._names:
+            return self._names[key]
+        keys = self._cores.get(self.core(key), [])
+        return self._names[keys[0]] if len(keys) == 1 else None
+    
+    def search(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Autocomplete results: prefix matches first, then the closest fuzzy matches"""
+        results = [{"importer_name": name, "match": "prefix", "distance": None} for name in self.prefix(query, limit)]
+        if len(results) < limit:
+            seen = {result["importer_name"] for result in results}
+            core = self.core(self.normalize(query))
+            for name, distance in self.similar(query, max(2, len(core) // 4)):
+                if name not in seen:
+                    results.append({"importer_name": name, "match": "fuzzy", "distance": distance})
+                    if len(results) >= limit:
+                        break
+        return results
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "names": len(self._names),
+            "trigrams": len(self._trigrams),
+            "age_seconds": round(time.monotonic() - self.loaded_at, 1) if self.loaded_at is not None else None
+        }
+
+class Metric:
+    """
+    Base for the in-process metrics rendered by /metrics in the Prometheus text
+    format. Label values are passed positionally in the order of `label_names`.
+    Every series also carries a `pid` label naming the worker process it comes from.
+    """
+    
+    metric_type = "untyped"
+    
+    def __init__(self, name: str, help_text: str, label_names: tuple = ()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        metrics_registry.append(self)
+    
+    def format_labels(self, labels: tuple, extra: str = "") -> str:
+        pairs = [f'pid="{os.getpid()}"']
+        pairs.extend(f'{name}="{escape_label_value(value)}"' for name, value in zip(self.label_names, labels))
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}"
+    
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+    
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.metric_type}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+class MetricCounter(Metric):
+    """Monotonic total per label set"""
+    
+    metric_type = "counter"
+    
+    def __init__(self, name: str, help_text: str, label_names: tuple = ()):
+        super().__init__(name, help_text, label_names)
+        self._values: Dict[tuple, float] = {}
+    
+    def inc(self, amount: float = 1.0, *labels):
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+    
+    def samples(self) -> List[str]:
+        return [f"{self.name}{self.format_labels(labels)} {value}" for labels, value in self._values.items()]
+
+class MetricHistogram(Metric):
+    """Bucketed observations (counts per bucket are kept non-cumulative and summed on render)"""
+    
+    metric_type = "histogram"
+    
+    def __init__(self, name: str, help_text: str, buckets: tuple, label_names: tuple = ()):
+        super().__init__(name, help_text, label_names)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[tuple, list] = {}
+    
+    def observe(self, value: float, *labels):
+        series = self._series.get(labels)
+        if series is None:
+            # [per-bucket counts (last slot is +Inf), sum, count]
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+    
+    def samples(self) -> List[str]:
+        lines = []
+        for labels, (counts, total, count) in self._series.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{float(bound)}"'
+                lines.append(f"{self.name}_bucket{self.format_labels(labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{self.format_labels(labels)} {total}")
+            lines.append(f"{self.name}_count{self.format_labels(labels)} {count}")
+        return lines
+
+class MetricCallback(Metric):
+    """Values read from existing state at scrape time: collect() returns {label tuple: value}"""
+    
+    def __init__(self, name: str, help_text: str, metric_type: str, collect: Callable[[], Dict[tuple, float]], label_names: tuple = ()):
+        super().__init__(name, help_text, label_names)
+        self.metric_type = metric_type
+        self.collect = collect
+    
+    def samples(self) -> List[str]:
+        return [f"{self.name}{self.format_labels(labels)} {value}" for labels, value in self.collect().items()]
+
+def escape_label_value(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+class TraceSpan:
+    """One timed step of a trace; `attrs` holds row counts, the SQL text of query spans, etc."""
+    
+    __slots__ = ("trace", "span_id", "parent_id", "name", "started", "duration", "attrs")
+    
+    def __init__(self, trace: "Trace", parent_id: Optional[int], name: str, attrs: Dict[str, Any]):
+        self.trace = trace
+        self.parent_id = parent_id
+        self.name = name
+        self.attrs = attrs
+        self.duration: Optional[float] = None
+        self.span_id = trace.add(self)
+        self.started = time.perf_counter()
+    
+    def to_dict(self) -> Dict[str, Any]:
+        entry = {"id": self.span_id, "parent": self.parent_id, "name": self.name,
+                 "ms": round(self.duration * 1000, 2) if self.duration is not None else None}
+        for key, value in self.attrs.items():
+            if key == "sql":
+                entry["fingerprint"] = query_fingerprint(value)
+            else:
+                entry[key] = value
+        return entry
+
+class Trace:
+    """
+    Spans of one root operation (an import, a summarize run, an export). The sampling
+    decision is made once at the root; unsampled traces only keep their spans in memory
+    and are emitted as a single log line if they end up slower than SLOW_TRACE_MS.
+    """
+    
+    def __init__(self):
+        self.trace_id = os.urandom(8).hex()
+        self.sampled = random.random() < TRACE_SAMPLE_RATE
+        self.spans: List[TraceSpan] = []
+        self.dropped = 0
+    
+    def add(self, span: TraceSpan) -> Optional[int]:
+        if len(self.spans) >= TRACE_MAX_SPANS:
+            self.dropped += 1
+            return None
+        self.spans.append(span)
+        return len(self.spans) - 1
+    
+    def emit(self):
+        logger.info("trace " + json.dumps({
+            "trace_id": self.trace_id,
+            "sampled": self.sampled,
+            "dropped_spans": self.dropped,
+            "spans": [span.to_dict() for span in self.spans]
+        }, default=json_default))
+
+current_span: ContextVar[Optional[TraceSpan]] = ContextVar("current_span", default=None)
+# Set by untraced(): root traces started inside are timed but never emitted
+tracing_suppressed: ContextVar[bool] = ContextVar("tracing_suppressed", default=False)
+
+@contextmanager
+def trace_span(name: str, **attrs):
+    """
+    Time a block as a span of the current trace, starting a new trace when there is
+    none. Works across awaits; tasks started inside the block inherit it as parent.
+    """
+    parent = current_span.get()
+    trace = parent.trace if parent is not None else Trace()
+    span = TraceSpan(trace, parent.span_id if parent is not None else None, name, attrs)
+    token = current_span.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.attrs["error"] = type(e).__name__
+        raise
+    finally:
+        span.duration = time.perf_counter() - span.started
+        current_span.reset(token)
+        if parent is None and not tracing_suppressed.get() and (trace.sampled or span.duration * 1000 >= SLOW_TRACE_MS):
+            trace.emit()
+
+@contextmanager
+def untraced():
+    """
+    Keep the spans of background housekeeping (job queue polls, heartbeats) out of the
+    trace log, where every poll would otherwise show up as a root trace of its own.
+    Slow queries inside are still logged by execute_query_async.
+    """
+    token = tracing_suppressed.set(True)
+    try:
+        yield
+    finally:
+        tracing_suppressed.reset(token)
+
+def traced(name: str):
+    """Run an async function as a span named `name` (see trace_span)"""
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            with trace_span(name):
+                return await func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def set_span_attrs(**attrs):
+    """Attach attributes such as row counts to the innermost active span"""
+    span = current_span.get()
+    if span is not None:
+        span.attrs.update(attrs)
+
+@lru_cache(maxsize=1024)
+def query_fingerprint(query: str) -> str:
+    """SQL with literals replaced by ? and repeated VALUES groups folded, for grouping slow queries"""
+    text = " ".join(query.split())
+    text = re.sub(r"'(?:[^'\\]|\\.)*'", "?", text)
+    text = re.sub(r"\b\d+(\.\d+)?\b", "?", text)
+    text = re.sub(r"(\([^()]*\))(?:\s*,\s*\1)+", r"\1, ...", text)
+    text = re.sub(r"IN \([?, ]+\)", "IN (...)", text)
+    return text[:300]
+
+class SamplingProfiler:
+    """
+    Samples the call stack of one thread at a fixed interval from a background thread
+    and counts identical stacks, giving collapsed-stack output for flamegraph tools.
+    
+    The event loop thread serves every request, so concurrent requests show up in the
+    samples too; summary work in the process pool does not.
+    """
+    
+    def __init__(self, thread_id: int, interval_seconds: float):
+        self.thread_id = thread_id
+        self.interval_seconds = interval_seconds
+        self.samples = Counter()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+    
+    def start(self):
+        self._thread.start()
+    
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+    
+    def _run(self):
+        while not self._stopped.wait(self.interval_seconds):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+    
+    def collapsed(self) -> str:
+        """One "frame;frame;frame count" line per distinct stack, most frequent first"""
+        return "\n".join(f"{stack} {count}" for stack, count in self.samples.most_common()) + "\n"
+
+class SlowRequestLog:
+    """The slowest requests of the last `window_seconds`, at most `max_entries` of them"""
+    
+    def __init__(self, max_entries: int, window_seconds: float):
+        self.max_entries = max_entries
+        self.window_seconds = window_seconds
+        self._entries: List[tuple] = []  # min-heap of (duration, sequence, entry)
+        self._sequence = 0
+    
+    def _prune(self):
+        cutoff = time.time() - self.window_seconds
+        if any(entry["finished_at"] < cutoff for _, _, entry in self._entries):
+            self._entries = [item for item in self._entries if item[2]["finished_at"] >= cutoff]
+            heapq.heapify(self._entries)
+    
+    def would_keep(self, duration: float) -> bool:
+        """Cheap check before building an entry (expired entries don't count against it)"""
+        self._prune()
+        return len(self._entries) < self.max_entries or duration > self._entries[0][0]
+    
+    def add(self, duration: float, entry: Dict[str, Any]):
+        self._prune()
+        self._sequence += 1
+        item = (duration, self._sequence, entry)
+        if len(self._entries) < self.max_entries:
+            heapq.heappush(self._entries, item)
+        elif duration > self._entries[0][0]:
+            heapq.heapreplace(self._entries, item)
+    
+    def entries(self) -> List[Dict[str, Any]]:
+        self._prune()
+        return [entry for _, _, entry in sorted(self._entries, key=lambda item: item[0], reverse=True)]
+
+# Process sizing: WEB_CONCURRENCY worker processes share a budget of DB_MAX_CONNECTIONS
+WEB_CONCURRENCY = max(1, int(os.getenv("WEB_CONCURRENCY", "1")))
+DB_MAX_CONNECTIONS = int(os.getenv("DB_MAX_CONNECTIONS", "20"))
+DB_SYNC_POOL_SIZE = int(os.getenv("DB_SYNC_POOL_SIZE", "2"))
+# The async pool never drops below one connection per job worker plus two for requests
+DB_POOL_MIN_MAXSIZE = JOB_WORKERS + 2
+
+def worker_connections(pool_maxsize: int) -> int:
+    """
+    Most MySQL connections one worker process opens: its async pool, the sync pool,
+    the import-lock connections held outside the pool (IMPORT_LOCK_CONNECTIONS) and
+    the schema-lock connection taken at startup
+    """
+    return pool_maxsize + DB_SYNC_POOL_SIZE + IMPORT_LOCK_CONNECTIONS + 1
+
+def default_pool_maxsize(workers: int) -> int:
+    """Async pool size that fills one worker's share of DB_MAX_CONNECTIONS"""
+    return max(DB_POOL_MIN_MAXSIZE, DB_MAX_CONNECTIONS // workers - worker_connections(0))
+
+def default_worker_count() -> int:
+    """Worker processes for --production: one per CPU, as many as DB_MAX_CONNECTIONS can hold"""
+    return max(1, min(os.cpu_count() or 1, DB_MAX_CONNECTIONS // worker_connections(DB_POOL_MIN_MAXSIZE)))
+
+DB_POOL_MAXSIZE = int(os.getenv("DB_POOL_MAXSIZE") or default_pool_maxsize(WEB_CONCURRENCY))
+DB_POOL_MINSIZE = min(int(os.getenv("DB_POOL_MINSIZE", "5")), DB_POOL_MAXSIZE)
+# Connection health: recycle connections older than this (-1 disables), ping ones idle
+# longer than DB_POOL_PING_AFTER_SECONDS before use, and bound connect and checkout waits
+DB_POOL_RECYCLE_SECONDS = int(os.getenv("DB_POOL_RECYCLE_SECONDS", "3600"))
+DB_POOL_PING_AFTER_SECONDS = float(os.getenv("DB_POOL_PING_AFTER_SECONDS", "30"))
+DB_CONNECT_TIMEOUT_SECONDS = int(os.getenv("DB_CONNECT_TIMEOUT_SECONDS", "10"))
+DB_POOL_ACQUIRE_TIMEOUT_SECONDS = float(os.getenv("DB_POOL_ACQUIRE_TIMEOUT_SECONDS", "60"))
+DB_POOL_WAIT_WARN_MS = float(os.getenv("DB_POOL_WAIT_WARN_MS", "1000"))
+THREAD_POOL_WORKERS = int(os.getenv("THREAD_POOL_WORKERS", "4"))
+# Summary KPIs run in worker processes so large batches don't block the event loop (0 disables)
+SUMMARY_PROCESS_WORKERS = int(os.getenv("SUMMARY_PROCESS_WORKERS") or max(1, (os.cpu_count() or 1) // WEB_CONCURRENCY))
+SUMMARY_OFFLOAD_MIN_ROWS = int(os.getenv("SUMMARY_OFFLOAD_MIN_ROWS", "1000"))
+# KPI counting backend: "auto" uses NumPy when it is installed, "python" always uses the pure-Python path
+SUMMARY_BACKEND = os.getenv("SUMMARY_BACKEND", "auto").lower()
+if SUMMARY_BACKEND == "numpy" and np is None:
+    logger.warning("SUMMARY_BACKEND=numpy but NumPy is not installed; using the pure-Python backend")
+
+# MySQL error code for a missing table
+ER_NO_SUCH_TABLE = 1146
 
 # Global database connection pool
 db_pool = None
 async_db_pool = None
-thread_pool = ThreadPoolExecutor(max_workers=4)
+thread_pool = ThreadPoolExecutor(max_workers=THREAD_POOL_WORKERS)
+summary_process_pool: Optional[ProcessPoolExecutor] = None
+inflight_imports: Dict[tuple, tuple] = {}
+summary_cache = LRUTTLCache(
+    SUMMARY_CACHE_MAX_ENTRIES, SUMMARY_CACHE_TTL_SECONDS, SUMMARY_CACHE_VERSION_CHECK_MS / 1000
+)
+status_cache = LRUTTLCache(1, STATUS_CACHE_TTL_SECONDS)
+importer_name_index = ImporterNameIndex()
+importer_name_index_lock = asyncio.Lock()
+# Bounds the import-lock connections of this process; imports of the same importer
+# queue on a local lock first (name -> [lock, waiting and running imports])
+import_lock_connections = asyncio.Semaphore(IMPORT_LOCK_CONNECTIONS)
+local_import_locks: Dict[str, list] = {}
+# Importers whose import lock the current task holds (the lock is re-entrant per task)
+held_import_locks: ContextVar[frozenset] = ContextVar("held_import_locks", default=frozenset())
+# Set once this process has created the schema and run pending backfills
+schema_ready = False
+schema_ready_lock = asyncio.Lock()
+slow_requests = SlowRequestLog(SLOW_REQUEST_LOG_SIZE, SLOW_REQUEST_WINDOW_SECONDS)
+request_profiles: OrderedDict = OrderedDict()
+
+# In-process metrics served by /metrics (each worker process keeps its own)
+metrics_registry: List[Metric] = []
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+api_page_latency = MetricHistogram("logcomex_api_page_seconds", "Latency of one Logcomex API page request", LATENCY_BUCKETS, ("outcome",))
+api_pages_per_import = MetricHistogram("logcomex_api_pages_per_import", "Logcomex API pages fetched per import", (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000))
+import_stage_latency = MetricHistogram("import_stage_seconds", "Duration of each import stage", LATENCY_BUCKETS, ("stage",))
+rows_inserted_total = MetricCounter("import_rows_inserted_total", "Records inserted into import_records")
+insert_seconds_total = MetricCounter("import_insert_seconds_total", "Time spent inserting records (rows per second = rate of rows / rate of seconds)")
+summary_compute_latency = MetricHistogram("summary_compute_seconds", "Time to compute the summary of one importer", LATENCY_BUCKETS)
+summarize_run_latency = MetricHistogram("summarize_run_seconds", "Duration of /summarize runs", LATENCY_BUCKETS, ("mode",))
+db_pool_wait_latency = MetricHistogram(
+    "db_pool_wait_seconds", "Time spent waiting for a pooled MySQL connection",
+    (0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+)
+db_pool_hold_latency = MetricHistogram("db_pool_hold_seconds", "Time a pooled MySQL connection stays checked out", LATENCY_BUCKETS)
+db_pool_saturated_total = MetricCounter("db_pool_saturated_total", "Connection checkouts that found every pooled connection in use")
+db_pool_stale_total = MetricCounter("db_pool_stale_connections_total", "Pooled connections discarded because a ping failed")
+db_pool_acquire_timeouts_total = MetricCounter("db_pool_acquire_timeouts_total", "Connection checkouts that gave up after DB_POOL_ACQUIRE_TIMEOUT_SECONDS")
+export_bytes_total = MetricCounter("export_bytes_total", "Bytes of CSV exports served", ("export", "cache"))
+MetricCallback(
+    "db_pool_connections", "Connections of this process's MySQL pool", "gauge",
+    lambda: {} if async_db_pool is None else {
+        ("in_use",): async_db_pool.size - async_db_pool.freesize,
+        ("idle",): async_db_pool.freesize,
+        ("max",): async_db_pool.maxsize
+    },
+    ("state",)
+)
+MetricCallback(
+    "cache_lookups_total", "Lookups of the in-process caches", "counter",
+    lambda: {
+        (name, result): count
+        for name, cache in (("summaries", summary_cache), ("status", status_cache))
+        for result, count in (("hit", cache.hits), ("miss", cache.misses))
+    },
+    ("cache", "result")
+)
 
 def calculate_date_range(since: str) -> tuple[str, str]:
     """
@@ -111,11 +840,75 @@ def validate_importer_name(importer_name: str) -> tuple[bool, str]:
     
     return True, "Valid importer name"
 
+def resolve_importer_name(importer_name: str, mode: str) -> tuple[str, Optional[str], List[str]]:
+    """
+    Check an importer name against the known-names index before calling the API.
+    
+    Returns (name to import, error message or None, suggestions). Modes:
+    - off: no check
+    - suggest: reject unknown names that look like a typo of a known one
+    - correct: like suggest, but replace the name when one known name is clearly closest
+    - strict: reject every unknown name
+    Unknown names without close matches pass in suggest/correct mode (new importers),
+    and every name passes while the index is empty.
+    """
+    if mode == "off" or not len(importer_name_index):
+        return importer_name, None, []
+    
+    known = importer_name_index.lookup(importer_name)
+    if known:
+        return (known if mode == "correct" else importer_name), None, []
+    
+    core = ImporterNameIndex.core(ImporterNameIndex.normalize(importer_name))
+    matches = importer_name_index.similar(importer_name, ImporterNameIndex.typo_distance(core))[:5]
+    suggestions = [name for name, _ in matches]
+    if mode == "correct" and matches and (len(matches) == 1 or matches[0][1] < matches[1][1]):
+        logger.info(f"Corrected importer name '{importer_name}' to '{matches[0][0]}'")
+        return matches[0][0], None, suggestions
+    if suggestions:
+        return importer_name, f"Unknown importer '{importer_name}'. Did you mean: {', '.join(suggestions)}?", suggestions
+    if mode == "strict":
+        return importer_name, f"Unknown importer '{importer_name}'. It has not been imported before.", []
+    return importer_name, None, []
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create this process's pools and background workers at startup and close them at shutdown"""
+    try:
+        if WEB_CONCURRENCY * worker_connections(DB_POOL_MAXSIZE) > DB_MAX_CONNECTIONS:
+            logger.warning(
+                f"{WEB_CONCURRENCY} workers can open up to {worker_connections(DB_POOL_MAXSIZE)} MySQL connections "
+                f"each, more than DB_MAX_CONNECTIONS={DB_MAX_CONNECTIONS}"
+            )
+        await get_async_db_pool()
+        await create_database()
+        logger.info(f"Database initialized (pool {DB_POOL_MINSIZE}-{DB_POOL_MAXSIZE} connections)")
+        await ensure_importer_name_index_async()
+    except Exception as e:
+        # Keep serving; the pool is created lazily on the first request that needs it
+        logger.error(f"Database initialization failed at startup: {e}")
+    start_summary_process_pool()
+    # Job workers retry on their own until the database is reachable
+    await start_job_workers()
+    
+    yield
+    
+    global async_db_pool
+    await stop_job_workers()
+    stop_summary_process_pool()
+    if async_db_pool:
+        async_db_pool.close()
+        await async_db_pool.wait_closed()
+        async_db_pool = None
+    thread_pool.shutdown(wait=True)
+    logger.info("Server shutdown completed")
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Logcomex Importer API",
     description="API for importing and analyzing import records from Logcomex",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Global exception handlers
@@ -202,6 +995,10 @@ class ImportRequest(BaseModel):
     clear_existing: bool = Field(False, description="Whether to clear existing records before import")
     run_summarize: bool = Field(True, description="Whether to run summarization after import")
     type: str = Field("import", description="Type of operation: 'import' or 'export' (affects product-signature header)")
+    name_resolution: Optional[str] = Field(
+        None, pattern="^(off|suggest|correct|strict)$",
+        description="How to treat names missing from the importers catalog: 'off', 'suggest', 'correct' or 'strict' (default IMPORTER_NAME_RESOLUTION)"
+    )
 
 class ImportResponse(BaseModel):
     success: bool
@@ -214,6 +1011,8 @@ class ImportResponse(BaseModel):
     summary_data: Optional[Dict] = None
     execution_time: float
     error: Optional[str] = Field(None, description="Error message if success is False")
+    resolved_importer_name: Optional[str] = Field(None, description="Known importer name used instead of the requested one")
+    suggestions: Optional[List[str]] = Field(None, description="Known importer names close to an unknown requested name")
 
 class SummaryRequest(BaseModel):
     since: str = Field(..., description="Time period like 'Last 3 Months', 'Last 6 Months', etc.")
@@ -228,16 +1027,92 @@ class SummaryResponse(BaseModel):
     execution_time: float
     error: Optional[str] = Field(None, description="Error message if success is False")
 
+class JobResponse(BaseModel):
+    job_id: int
+    status: str
+    progress: Optional[Dict] = None
+    result: Optional[Dict] = None
+    error: Optional[str] = None
+    created_at: Optional[str] = None
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+
+class ImportProgress:
+    """Progress of a running import: page/row counters and per-stage timings"""
+    
+    def __init__(self):
+        self.stage = "queued"
+        self.pages_fetched = 0
+        self.records_fetched = 0
+        self.rows_inserted = 0
+        self.stage_timings: Dict[str, float] = {}
+        self._stage_started: Optional[float] = None
+    
+    def start_stage(self, stage: str):
+        """Close the timing of the current stage and start a new one"""
+        self._close_stage()
+        self.stage = stage
+        self._stage_started = time.perf_counter()
+    
+    def record_page(self, page: int, record_count: int):
+        """Callback for fetch_data_from_api_async"""
+        self.pages_fetched = page
+        self.records_fetched += record_count
+    
+    def copy_counters_from(self, other: "ImportProgress"):
+        """Adopt the counters of the run this import was coalesced into"""
+        self.pages_fetched = other.pages_fetched
+        self.records_fetched = other.records_fetched
+        self.rows_inserted = other.rows_inserted
+    
+    def finish(self):
+        """Close the timing of the last stage"""
+        self._close_stage()
+        self.stage = "done"
+    
+    def _close_stage(self):
+        if self._stage_started is not None:
+            elapsed = time.perf_counter() - self._stage_started
+            self.stage_timings[self.stage] = round(self.stage_timings.get(self.stage, 0.0) + elapsed, 3)
+            import_stage_latency.observe(elapsed, self.stage)
+            self._stage_started = None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "stage": self.stage,
+            "pages_fetched": self.pages_fetched,
+            "records_fetched": self.records_fetched,
+            "rows_inserted": self.rows_inserted,
+            "stage_timings": dict(self.stage_timings)
+        }
+
 class ErrorResponse(BaseModel):
     success: bool
     error: str
     detail: str
     status_code: int
 
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with orjson when available"""
+    
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content, default=json_default)
+        return json.dumps(content, default=json_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def json_default(value: Any):
+    """Serialize values returned by MySQL that JSON encoders do not handle natively"""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
 class StatusResponse(BaseModel):
     database_exists: bool
     records_count: int
     summaries_count: int
+    importers_count: Optional[int] = None
     last_updated: Optional[str] = None
 
 # Database connection management
@@ -253,11 +1128,64 @@ async def get_async_db_pool():
             db=DB_NAME,
             charset='utf8mb4',
             autocommit=True,
-            minsize=5,
-            maxsize=20
+            minsize=DB_POOL_MINSIZE,
+            maxsize=DB_POOL_MAXSIZE,
+            pool_recycle=DB_POOL_RECYCLE_SECONDS,
+            connect_timeout=DB_CONNECT_TIMEOUT_SECONDS
         )
     return async_db_pool
 
+@asynccontextmanager
+async def acquire_db_connection():
+    """
+    Check out a connection from the async pool and return it afterwards, recording
+    the wait and hold times and whether the pool was exhausted at checkout.
+    """
+    pool = await get_async_db_pool()
+    if pool.freesize == 0 and pool.size >= pool.maxsize:
+        db_pool_saturated_total.inc()
+    started = time.perf_counter()
+    conn = await acquire_live_connection_async(pool)
+    waited = time.perf_counter() - started
+    db_pool_wait_latency.observe(waited)
+    if waited * 1000 >= DB_POOL_WAIT_WARN_MS:
+        logger.warning(f"Waited {waited * 1000:.0f} ms for a database connection ({pool.size - pool.freesize}/{pool.maxsize} in use)")
+    
+    checked_out = time.perf_counter()
+    try:
+        yield conn
+    finally:
+        db_pool_hold_latency.observe(time.perf_counter() - checked_out)
+        await pool.release(conn)
+
+async def acquire_live_connection_async(pool, attempts: int = 3):
+    """
+    Take a connection from the pool, pinging it first if it has been idle longer than
+    DB_POOL_PING_AFTER_SECONDS. Dead connections (e.g. after an RDS failover) are
+    closed and replaced instead of failing the caller's first query.
+    """
+    loop = asyncio.get_running_loop()
+    for attempt in range(1, attempts + 1):
+        try:
+            conn = await asyncio.wait_for(pool.acquire(), timeout=DB_POOL_ACQUIRE_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            db_pool_acquire_timeouts_total.inc()
+            raise RuntimeError(
+                f"Timed out after {DB_POOL_ACQUIRE_TIMEOUT_SECONDS:g}s waiting for a database connection "
+                f"({pool.size - pool.freesize}/{pool.maxsize} in use)"
+            )
+        if DB_POOL_PING_AFTER_SECONDS < 0 or loop.time() - conn.last_usage < DB_POOL_PING_AFTER_SECONDS:
+            return conn
+        try:
+            await asyncio.wait_for(conn.ping(reconnect=False), timeout=DB_CONNECT_TIMEOUT_SECONDS)
+            return conn
+        except Exception as e:
+            db_pool_stale_total.inc()
+            logger.warning(f"Discarding dead pooled connection (attempt {attempt}/{attempts}): {e}")
+            conn.close()
+            await pool.release(conn)
+    raise RuntimeError(f"No live database connection after {attempts} attempts")
+
 def get_db_connection():
     """Get a database connection from the pool"""
     global db_pool
@@ -265,7 +1193,7 @@ def get_db_connection():
         # Initialize connection pool with more connections
         db_pool = mysql.connector.pooling.MySQLConnectionPool(
             pool_name="logcomex_pool",
-            pool_size=10,  # Increased pool size
+            pool_size=DB_SYNC_POOL_SIZE,
             host=DB_HOST,
             port=DB_PORT,
             user=DB_USER,
@@ -284,33 +1212,161 @@ def close_db_connection(conn):
         conn.close()
 
 async def execute_query_async(query: str, params: tuple = None):
-    """Execute a query asynchronously"""
-    pool = await get_async_db_pool()
-    async with pool.acquire() as conn:
+    """Execute a query asynchronously, as a "query" span of the current trace"""
+    with trace_span("query", sql=query) as span:
+        async with acquire_db_connection() as conn:
+            async with conn.cursor() as cursor:
+                await cursor.execute(query, params or ())
+                # Check if it's a SELECT query (including SELECT COUNT, SELECT *, etc.)
+                verb = query.lstrip()[:6].upper()
+                if verb.startswith('SELECT') or verb.startswith('SHOW'):
+                    result = await cursor.fetchall()
+                    span.attrs["rows"] = len(result) if result else 0
+                else:
+                    result = cursor.rowcount
+                    span.attrs["rows"] = result
+        elapsed_ms = (time.perf_counter() - span.started) * 1000
+        if elapsed_ms >= SLOW_QUERY_MS:
+            logger.warning(f"Slow query ({elapsed_ms:.0f} ms, {span.attrs['rows']} rows, trace {span.trace.trace_id}): {query_fingerprint(query)}")
+        return result
+
+async def fetch_dicts_async(query: str, params: tuple = None) -> List[Dict]:
+    """Execute a SELECT and return rows as dictionaries keyed by column name"""
+    with trace_span("query", sql=query) as span:
+        async with acquire_db_connection() as conn:
+            async with conn.cursor() as cursor:
+                await cursor.execute(query, params or ())
+                columns = [column[0] for column in cursor.description]
+                rows = await cursor.fetchall()
+                span.attrs["rows"] = len(rows)
+                return [dict(zip(columns, row)) for row in rows]
+
+async def open_dedicated_connection_async():
+    """
+    Open a MySQL connection outside the async pool, for session state that is held
+    across long waits (advisory locks) and must not tie up pooled connections
+    """
+    return await aiomysql.connect(
+        host=DB_HOST,
+        port=DB_PORT,
+        user=DB_USER,
+        password=DB_PASSWORD,
+        db=DB_NAME,
+        charset='utf8mb4',
+        autocommit=True,
+        connect_timeout=DB_CONNECT_TIMEOUT_SECONDS
+    )
+
+@asynccontextmanager
+async def advisory_lock(lock_name: str, timeout: int, timeout_message: str):
+    """
+    Hold a MySQL advisory lock (GET_LOCK) on a dedicated connection outside the pool,
+    so that waiting for the lock and holding it never take connections from the
+    queries of the lock holder or of other requests. MySQL releases the lock if the
+    connection drops.
+    """
+    conn = await open_dedicated_connection_async()
+    try:
         async with conn.cursor() as cursor:
-            await cursor.execute(query, params or ())
-            # Check if it's a SELECT query (including SELECT COUNT, SELECT *, etc.)
-            query_upper = query.strip().upper()
-            logger.info(f"Executing query: {query}")
-            logger.info(f"Query upper: {query_upper}")
-            logger.info(f"Starts with SELECT: {query_upper.startswith('SELECT')}")
-            logger.info(f"Starts with SHOW: {query_upper.startswith('SHOW')}")
-            
-            if query_upper.startswith('SELECT') or query_upper.startswith('SHOW'):
-                result = await cursor.fetchall()
-                logger.info(f"SELECT query result type: {type(result)}, length: {len(result) if result else 'None'}")
-                return result
-            else:
-                result = cursor.rowcount
-                logger.info(f"Non-SELECT query result: {result}, type: {type(result)}")
-                return result
+            await cursor.execute("SELECT GET_LOCK(%s, %s)", (lock_name, timeout))
+            (acquired,) = await cursor.fetchone()
+        if acquired != 1:
+            raise RuntimeError(timeout_message)
+        try:
+            yield
+        finally:
+            async with conn.cursor() as cursor:
+                await cursor.execute("SELECT RELEASE_LOCK(%s)", (lock_name,))
+    finally:
+        conn.close()
+
+async def acquire_until(primitive, deadline: float, timeout_message: str):
+    """Acquire an asyncio lock or semaphore, raising RuntimeError once the loop time reaches `deadline`"""
+    try:
+        async with asyncio.timeout_at(deadline):
+            await primitive.acquire()
+    except TimeoutError:
+        raise RuntimeError(timeout_message) from None
+
+@asynccontextmanager
+async def importer_import_lock(importer_name: str):
+    """
+    Serialize imports of one importer across uvicorn workers so they run one after
+    another instead of interleaving their delete and insert steps.
+    
+    Within a process, imports of the same importer wait on a local lock and only then
+    take one of the IMPORT_LOCK_CONNECTIONS lock connections, so queued synchronous
+    imports never open connections of their own. IMPORT_LOCK_TIMEOUT_SECONDS bounds
+    the whole wait. A task that already holds the lock (a summary rebuilding
+    aggregates inside an import) enters again without waiting.
+    """
+    held = held_import_locks.get()
+    if importer_name in held:
+        yield
+        return
+    # Lock names are limited to 64 characters
+    lock_name = "logcomex_import:" + hashlib.sha1(importer_name.encode("utf-8")).hexdigest()[:40]
+    timeout_message = f"Timed out waiting for another import of '{importer_name}' to finish"
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + IMPORT_LOCK_TIMEOUT_SECONDS
+    
+    entry = local_import_locks.setdefault(importer_name, [asyncio.Lock(), 0])
+    entry[1] += 1
+    try:
+        await acquire_until(entry[0], deadline, timeout_message)
+        try:
+            await acquire_until(import_lock_connections, deadline, timeout_message)
+            try:
+                remaining = max(0, int(deadline - loop.time()))
+                async with advisory_lock(lock_name, remaining, timeout_message):
+                    token = held_import_locks.set(held | {importer_name})
+                    try:
+                        yield
+                    finally:
+                        held_import_locks.reset(token)
+            finally:
+                import_lock_connections.release()
+        finally:
+            entry[0].release()
+    finally:
+        entry[1] -= 1
+        if not entry[1]:
+            del local_import_locks[importer_name]
 
 # Database functions
 async def create_database():
-    """Create MySQL database and tables with indexes for performance"""
-    pool = await get_async_db_pool()
-    async with pool.acquire() as conn:
+    """
+    Create MySQL tables with indexes for performance and run pending data backfills.
+    This runs once per process: workers take the "logcomex_schema" advisory lock in
+    turn, so only the first one creates tables and backfills while the rest wait and
+    then find nothing left to do. Later calls return immediately.
+    """
+    global schema_ready
+    if schema_ready:
+        return
+    async with schema_ready_lock:
+        if schema_ready:
+            return
+        async with advisory_lock("logcomex_schema", SCHEMA_LOCK_TIMEOUT_SECONDS,
+                                 "Timed out waiting for another worker to set up the database schema"):
+            await create_tables_async()
+            await run_pending_backfills_async()
+        schema_ready = True
+
+async def create_tables_async():
+    """Create missing tables, columns and indexes"""
+    async with acquire_db_connection() as conn:
         async with conn.cursor() as cursor:
+            # Create schema_migrations table (one-off data backfills: 'pending' from before
+            # the table they fill is created until the backfill finishes, then 'done')
+            await cursor.execute("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                name VARCHAR(64) PRIMARY KEY,
+                status VARCHAR(20) NOT NULL,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+            """)
+            
             # Create import_records table
             await cursor.execute("""
             CREATE TABLE IF NOT EXISTS import_records (
@@ -347,123 +1403,328 @@ async def create_database():
             ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
             """)
             
-            # Create import_summaries table
+            # Create import_summaries table (columns come from the summary KPI registry)
+            await cursor.execute(summary_table_ddl())
+            await ensure_columns_async(cursor, "import_summaries", dict(SUMMARY_COLUMNS[1:]))
+            
+            # Add ranking indexes to summary tables created before they existed
+            await ensure_indexes_async(cursor, "import_summaries", SUMMARY_TOP_INDEXES)
+
+            # Create table_versions table (per-table change counters and row counts maintained
+            # by the write paths; used as export cache keys and by /status)
             await cursor.execute("""
-            CREATE TABLE IF NOT EXISTS import_summaries (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                importer_name VARCHAR(255) UNIQUE,
-                rfc VARCHAR(255),
-                total_pedimentos_last_6_months INT,
-                total_freight_usd_value DECIMAL(15,2),
-                avg_freight_usd_per_shipment DECIMAL(15,2),
-                customs_offices_used TEXT,
-                pct_shipments_key_locations DECIMAL(5,2),
-                pct_regime_A1 DECIMAL(5,2),
-                pct_regime_F4 DECIMAL(5,2),
-                pct_regime_IN DECIMAL(5,2),
-                pct_regime_A3 DECIMAL(5,2),
-                pct_regime_AF DECIMAL(5,2),
-                pct_regime_C1 DECIMAL(5,2),
-                pct_regime_F5 DECIMAL(5,2),
-                pct_regime_OTHERS DECIMAL(5,2),
-                pct_transport_carretero DECIMAL(5,2),
-                pct_transport_aereo DECIMAL(5,2),
-                pct_transport_maritimo DECIMAL(5,2),
-                pct_transport_not_declared DECIMAL(5,2),
-                pct_port_NUEVO_LAREDO DECIMAL(5,2),
-                pct_port_COLOMBIA_NL DECIMAL(5,2),
-                pct_port_MONTERREY_AIRPORT DECIMAL(5,2),
-                pct_port_MANZANILLO DECIMAL(5,2),
-                pct_port_PUEBLA DECIMAL(5,2),
-                pct_port_AIFA_AIRPORT DECIMAL(5,2),
-                pct_port_NOGALES DECIMAL(5,2),
-                pct_port_ALTAMIRA DECIMAL(5,2),
-                pct_port_AICM_AIRPORT DECIMAL(5,2),
-                pct_port_LAZARO DECIMAL(5,2),
-                pct_port_VERACRUZ DECIMAL(5,2),
-                pct_port_TIJUANA DECIMAL(5,2),
-                pct_port_GUAYMAS DECIMAL(5,2),
-                pct_port_OTHERS DECIMAL(5,2),
-                pct_hs_84 DECIMAL(5,2),
-                pct_hs_85 DECIMAL(5,2),
-                pct_hs_90 DECIMAL(5,2),
-                pct_hs_73 DECIMAL(5,2),
-                pct_hs_74 DECIMAL(5,2),
-                pct_hs_OTROS DECIMAL(5,2),
-                is_origin_usa TINYINT(1),
-                is_candidate_for_crossborder TINYINT(1),
-                pct_incoterm_DAP DECIMAL(5,2),
-                pct_incoterm_EXW DECIMAL(5,2),
-                pct_incoterm_FCA DECIMAL(5,2),
-                pct_incoterm_FOB DECIMAL(5,2),
-                pct_incoterm_CIF DECIMAL(5,2),
-                pct_incoterm_CFR DECIMAL(5,2),
-                pct_incoterm_NOT_INFORMED DECIMAL(5,2),
-                pct_incoterm_OTROS DECIMAL(5,2),
-                custom_brokers_used TEXT,
-                top_custom_broker_id VARCHAR(255),
-                pct_top_custom_broker_id DECIMAL(5,2),
-                num_custom_brokers_used INT,
-                pct_broker_3995 DECIMAL(5,2),
-                pct_broker_3714 DECIMAL(5,2),
-                pct_broker_1720 DECIMAL(5,2),
-                pct_origin_TAIWAN DECIMAL(5,2),
-                pct_origin_VIETNAM DECIMAL(5,2),
-                pct_origin_CHINA DECIMAL(5,2),
-                pct_origin_USA DECIMAL(5,2),
-                pct_origin_GERMANY DECIMAL(5,2),
-                pct_origin_DENMARK DECIMAL(5,2),
-                pct_origin_FRANCE DECIMAL(5,2),
-                pct_origin_OTROS DECIMAL(5,2),
-                last_import_date DATE,
-                first_import_date DATE,
-                total_weight_kg DECIMAL(15,2),
-                avg_weight_per_shipment DECIMAL(15,2),
-                business_opportunity_score INT,
-                crossborder_potential INT,
-                ocean_freight_potential INT,
-                supply_chain_potential INT,
+            CREATE TABLE IF NOT EXISTS table_versions (
+                table_name VARCHAR(64) PRIMARY KEY,
+                version BIGINT NOT NULL DEFAULT 0,
+                row_count BIGINT NULL,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+            """)
+            await ensure_columns_async(cursor, "table_versions", {"row_count": "BIGINT NULL"})
+            
+            # Create import_jobs table (durable queue behind POST /jobs/import)
+            await cursor.execute("""
+            CREATE TABLE IF NOT EXISTS import_jobs (
+                id BIGINT AUTO_INCREMENT PRIMARY KEY,
+                status VARCHAR(20) NOT NULL DEFAULT 'queued',
+                request_json TEXT NOT NULL,
+                progress_json TEXT,
+                result_json MEDIUMTEXT,
+                error TEXT,
+                worker_id VARCHAR(128),
+                claim_token CHAR(32) NULL,
+                attempts INT NOT NULL DEFAULT 0,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                started_at TIMESTAMP NULL,
+                finished_at TIMESTAMP NULL,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+                INDEX idx_job_status (status, id),
+                INDEX idx_job_worker (worker_id, status),
+                INDEX idx_job_claim (claim_token)
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+            """)
+            await ensure_columns_async(cursor, "import_jobs", {"claim_token": "CHAR(32) NULL"})
+            await ensure_indexes_async(cursor, "import_jobs", {"idx_job_claim": "claim_token"})
+            
+            # Create importer_monthly_aggregates table (per importer and month summary
+            # aggregates; summaries merge whole months from here instead of raw rows)
+            if not await table_exists_async(cursor, "importer_monthly_aggregates"):
+                await mark_backfill_pending_async(cursor, "monthly_aggregates")
+            await cursor.execute("""
+            CREATE TABLE IF NOT EXISTS importer_monthly_aggregates (
+                importer_name VARCHAR(255) NOT NULL,
+                month DATE NOT NULL,
+                record_count INT NOT NULL,
+                freight_usd_sum DECIMAL(20,2) NOT NULL,
+                weight_kg_sum DECIMAL(20,2) NOT NULL,
+                first_date DATE,
+                last_date DATE,
+                rfc VARCHAR(255),
+                counters_json MEDIUMTEXT NOT NULL,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+                PRIMARY KEY (importer_name, month)
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+            """)
+    
+            # Create summary_dirty_importers table (importers whose records changed since
+            # their summary was last computed; drained by /summarize?mode=incremental)
+            await cursor.execute("""
+            CREATE TABLE IF NOT EXISTS summary_dirty_importers (
+                importer_name VARCHAR(255) PRIMARY KEY,
+                min_date DATE NULL,
+                max_date DATE NULL,
+                marked_at TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6)
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+            """)
+    
+            # Create importers catalog table (one row per importer, maintained by the
+            # import path so listings don't need SELECT DISTINCT over import_records)
+            if not await table_exists_async(cursor, "importers"):
+                await mark_backfill_pending_async(cursor, "importers_catalog")
+            await cursor.execute("""
+            CREATE TABLE IF NOT EXISTS importers (
+                importer_name VARCHAR(255) PRIMARY KEY,
+                importer_id VARCHAR(255),
+                row_count BIGINT NOT NULL DEFAULT 0,
+                first_dispatch_date DATE NULL,
+                last_dispatch_date DATE NULL,
+                last_import_at TIMESTAMP NULL,
+                last_summary_at TIMESTAMP NULL,
+                aggregates_stale INT NOT NULL DEFAULT 0,
                 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-                INDEX idx_business_score (business_opportunity_score),
-                INDEX idx_usa_origin (is_origin_usa),
-                INDEX idx_crossborder (is_candidate_for_crossborder)
+                INDEX idx_importers_row_count (row_count)
             ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
             """)
+            # aggregates_stale counts record writes whose monthly aggregates have not been refreshed
+            await ensure_columns_async(cursor, "importers", {"aggregates_stale": "INT NOT NULL DEFAULT 0"})
 
-async def clear_existing_data_async():
-    """Clear existing import records asynchronously"""
-    await execute_query_async("DELETE FROM import_records")
+async def mark_backfill_pending_async(cursor, name: str):
+    """Record that a backfill must run before creating the table it fills"""
+    await cursor.execute(
+        "INSERT INTO schema_migrations (name, status) VALUES (%s, 'pending') "
+        "ON DUPLICATE KEY UPDATE status = 'pending'",
+        (name,)
+    )
 
-def clear_existing_data():
-    """Clear existing import records (sync wrapper)"""
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    try:
-        loop.run_until_complete(clear_existing_data_async())
-    finally:
-        loop.close()
+async def run_pending_backfills_async():
+    """
+    Run the backfills still marked pending in schema_migrations. A backfill that was
+    interrupted (e.g. by a crash) stays pending and runs again on the next startup.
+    """
+    results = await execute_query_async("SELECT name FROM schema_migrations WHERE status = 'pending'")
+    pending = {row[0] for row in results or ()}
+    # The catalog goes first: summaries and the aggregate staleness check read it
+    if "importers_catalog" in pending:
+        async with acquire_db_connection() as conn:
+            async with conn.cursor() as cursor:
+                await backfill_importer_catalog_async(cursor)
+        await execute_query_async("UPDATE schema_migrations SET status = 'done' WHERE name = 'importers_catalog'")
+    # Build the aggregates of records imported before the table existed
+    if "monthly_aggregates" in pending:
+        await backfill_monthly_aggregates_async()
+        await execute_query_async("UPDATE schema_migrations SET status = 'done' WHERE name = 'monthly_aggregates'")
 
-async def delete_importer_records_async(importer_name: str):
-    """Delete all existing records for a specific importer"""
-    try:
-        result = await execute_query_async(
-            "DELETE FROM import_records WHERE importer_name = %s",
-            (importer_name,)
-        )
-        logger.info(f"Deleted existing records for importer: {importer_name}")
-        return True
-    except Exception as e:
-        logger.error(f"Error deleting records for importer {importer_name}: {e}")
-        raise
+async def table_exists_async(cursor, table_name: str) -> bool:
+    """Check whether a table exists in the application schema"""
+    await cursor.execute("""
+    SELECT COUNT(*) FROM information_schema.TABLES
+    WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s
+    """, (DB_NAME, table_name))
+    (count,) = await cursor.fetchone()
+    return count > 0
 
-async def delete_importer_summary_async(importer_name: str):
-    """Delete existing summary for a specific importer"""
-    try:
-        result = await execute_query_async(
-            "DELETE FROM import_summaries WHERE importer_name = %s",
-            (importer_name,)
+async def backfill_importer_catalog_async(cursor):
+    """
+    Fill the importers catalog from existing import records and summaries. Rows that
+    already exist are overwritten with the recomputed values, so a rerun (or a second
+    worker getting there first) is harmless.
+    """
+    await cursor.execute("""
+    INSERT INTO importers (importer_name, importer_id, row_count, first_dispatch_date, last_dispatch_date, last_import_at, last_summary_at)
+    SELECT r.importer_name, MAX(r.importer_id), COUNT(*), MIN(r.dispatch_date), MAX(r.dispatch_date), MAX(r.created_at), s.updated_at
+    FROM import_records r
+    LEFT JOIN import_summaries s ON s.importer_name = r.importer_name
+    WHERE r.importer_name IS NOT NULL
+    GROUP BY r.importer_name, s.updated_at
+    ON DUPLICATE KEY UPDATE
+        importer_id = VALUES(importer_id),
+        row_count = VALUES(row_count),
+        first_dispatch_date = VALUES(first_dispatch_date),
+        last_dispatch_date = VALUES(last_dispatch_date),
+        last_import_at = VALUES(last_import_at),
+        last_summary_at = VALUES(last_summary_at)
+    """)
+    logger.info(f"Backfilled importers catalog with {cursor.rowcount} importers")
+
+async def ensure_indexes_async(cursor, table_name: str, indexes: Dict[str, str]):
+    """Create any of the given indexes that are missing on an existing table"""
+    await cursor.execute("""
+    SELECT DISTINCT INDEX_NAME
+    FROM information_schema.STATISTICS
+    WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s
+    """, (DB_NAME, table_name))
+    existing = {row[0] for row in await cursor.fetchall()}
+    
+    for index_name, columns in indexes.items():
+        if index_name not in existing:
+            logger.info(f"Adding index {index_name} on {table_name}")
+            await cursor.execute(f"ALTER TABLE {table_name} ADD INDEX {index_name} ({columns})")
+
+async def ensure_columns_async(cursor, table_name: str, columns: Dict[str, str]):
+    """Add any of the given columns that are missing on an existing table"""
+    await cursor.execute("""
+    SELECT COLUMN_NAME
+    FROM information_schema.COLUMNS
+    WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s
+    """, (DB_NAME, table_name))
+    existing = {row[0] for row in await cursor.fetchall()}
+    
+    for column_name, definition in columns.items():
+        if column_name not in existing:
+            logger.info(f"Adding column {column_name} to {table_name}")
+            await cursor.execute(f"ALTER TABLE {table_name} ADD COLUMN {column_name} {definition}")
+
+@asynccontextmanager
+async def db_transaction():
+    """Run statements on one pooled connection inside a transaction, yielding its cursor"""
+    async with acquire_db_connection() as conn:
+        await conn.begin()
+        try:
+            async with conn.cursor() as cursor:
+                yield cursor
+            await conn.commit()
+        except BaseException:
+            await conn.rollback()
+            raise
+
+async def record_table_write_async(table_name: str, cursor, row_delta: int = 0, row_count: Optional[int] = None):
+    """
+    Record a write to a table: bump its change counter (invalidating cached exports)
+    and adjust its maintained row count by `row_delta`, or set it to `row_count`.
+    Runs on the cursor of the transaction that made the write, so the counters
+    commit or roll back together with it.
+    
+    A NULL row count means "unknown" and stays NULL until the next exact recount.
+    """
+    if row_count is not None:
+        await cursor.execute(
+            "INSERT INTO table_versions (table_name, version, row_count) VALUES (%s, 1, %s) "
+            "ON DUPLICATE KEY UPDATE version = version + 1, row_count = VALUES(row_count)",
+            (table_name, row_count)
+        )
+    else:
+        await cursor.execute(
+            "INSERT INTO table_versions (table_name, version, row_count) VALUES (%s, 1, NULL) "
+            "ON DUPLICATE KEY UPDATE version = version + 1, row_count = GREATEST(row_count + %s, 0)",
+            (table_name, row_delta)
+        )
+
+async def count_table_rows_async(table_name: str) -> int:
+    """Count the rows of a table exactly and store the result as its maintained row count"""
+    result = await execute_query_async(f"SELECT COUNT(*) FROM {table_name}")
+    row_count = result[0][0] if result else 0
+    # updated_at = updated_at keeps the last write time, a recount is not a write
+    await execute_query_async(
+        "INSERT INTO table_versions (table_name, version, row_count) VALUES (%s, 0, %s) "
+        "ON DUPLICATE KEY UPDATE row_count = VALUES(row_count), updated_at = updated_at",
+        (table_name, row_count)
+    )
+    return row_count
+
+async def get_table_stats_async(table_names: tuple) -> Dict[str, Dict[str, Any]]:
+    """Get maintained row counts and last write times, recounting tables whose count is unknown"""
+    placeholders = ", ".join(["%s"] * len(table_names))
+    rows = await execute_query_async(
+        f"SELECT table_name, row_count, updated_at FROM table_versions WHERE table_name IN ({placeholders})",
+        table_names
+    )
+    stats = {name: {"row_count": row_count, "updated_at": updated_at} for name, row_count, updated_at in rows or ()}
+    
+    for table_name in table_names:
+        entry = stats.setdefault(table_name, {"row_count": None, "updated_at": None})
+        if entry["row_count"] is None:
+            entry["row_count"] = await count_table_rows_async(table_name)
+    return stats
+
+async def get_table_row_count_async(table_name: str) -> int:
+    """Get the maintained row count of a table without scanning it"""
+    stats = await get_table_stats_async((table_name,))
+    return stats[table_name]["row_count"]
+
+async def get_table_version_async(table_name: str) -> Optional[int]:
+    """Get the current change counter of a table (None if versions are unavailable)"""
+    try:
+        result = await execute_query_async(
+            "SELECT version FROM table_versions WHERE table_name = %s",
+            (table_name,)
         )
+    except Exception as e:
+        logger.warning(f"Could not read table version for {table_name}: {e}")
+        return None
+    return result[0][0] if result else 0
+
+async def clear_existing_data_async():
+    """Clear existing import records asynchronously"""
+    async with db_transaction() as cursor:
+        await cursor.execute("DELETE FROM import_records")
+        await record_table_write_async("import_records", cursor, row_count=0)
+        await cursor.execute("DELETE FROM importer_monthly_aggregates")
+        await cursor.execute(
+            "UPDATE importers SET row_count = 0, first_dispatch_date = NULL, last_dispatch_date = NULL, aggregates_stale = 0"
+        )
+        # Every existing summary is now stale
+        await cursor.execute(
+            "INSERT INTO summary_dirty_importers (importer_name, min_date, max_date) "
+            "SELECT importer_name, NULL, NULL FROM import_summaries WHERE importer_name IS NOT NULL "
+            "ON DUPLICATE KEY UPDATE min_date = NULL, max_date = NULL, marked_at = CURRENT_TIMESTAMP(6)"
+        )
+
+def clear_existing_data():
+    """Clear existing import records (sync wrapper)"""
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        loop.run_until_complete(clear_existing_data_async())
+    finally:
+        loop.close()
+
+async def delete_importer_records_async(importer_name: str):
+    """Delete all existing records for a specific importer"""
+    try:
+        # Records, aggregates, both row counters and the dirty mark change together or not at all
+        async with db_transaction() as cursor:
+            await cursor.execute(
+                "DELETE FROM import_records WHERE importer_name = %s",
+                (importer_name,)
+            )
+            await record_table_write_async("import_records", cursor, row_delta=-cursor.rowcount)
+            await cursor.execute(
+                "DELETE FROM importer_monthly_aggregates WHERE importer_name = %s",
+                (importer_name,)
+            )
+            await cursor.execute(
+                "UPDATE importers SET row_count = 0, first_dispatch_date = NULL, last_dispatch_date = NULL "
+                "WHERE importer_name = %s",
+                (importer_name,)
+            )
+            await mark_importers_dirty_async({importer_name: (None, None)}, cursor)
+        logger.info(f"Deleted existing records for importer: {importer_name}")
+        return True
+    except Exception as e:
+        logger.error(f"Error deleting records for importer {importer_name}: {e}")
+        raise
+
+async def delete_importer_summary_async(importer_name: str):
+    """Delete existing summary for a specific importer"""
+    try:
+        async with db_transaction() as cursor:
+            await cursor.execute(
+                "DELETE FROM import_summaries WHERE importer_name = %s",
+                (importer_name,)
+            )
+            await record_table_write_async("import_summaries", cursor, row_delta=-cursor.rowcount)
+        summary_cache.record_own_write()
+        summary_cache.invalidate(importer_name)
         logger.info(f"Deleted existing summary for importer: {importer_name}")
         return True
     except Exception as e:
@@ -472,7 +1733,11 @@ async def delete_importer_summary_async(importer_name: str):
 
 async def clear_summaries_async():
     """Clear existing summaries asynchronously"""
-    await execute_query_async("DELETE FROM import_summaries")
+    async with db_transaction() as cursor:
+        await cursor.execute("DELETE FROM import_summaries")
+        await record_table_write_async("import_summaries", cursor, row_count=0)
+    summary_cache.record_own_write()
+    summary_cache.clear()
 
 def clear_summaries():
     """Clear existing summaries (sync wrapper)"""
@@ -483,8 +1748,120 @@ def clear_summaries():
     finally:
         loop.close()
 
-async def fetch_data_from_api_async(start_date: str, end_date: str, importer_name: str, operation_type: str = "import") -> List[Dict]:
-    """Fetch data from Logcomex API asynchronously"""
+async def update_importer_catalog_async(catalog: Dict[str, list], cursor):
+    """
+    Add inserted rows to the importers catalog: {name: [importer_id, row count, first date, last date]}.
+    Runs on the cursor of the transaction that inserted the rows.
+    """
+    if not catalog:
+        return
+    await cursor.execute(
+        "INSERT INTO importers (importer_name, importer_id, row_count, first_dispatch_date, last_dispatch_date, last_import_at) VALUES "
+        + ", ".join(["(%s, %s, %s, %s, %s, CURRENT_TIMESTAMP)"] * len(catalog))
+        + " ON DUPLICATE KEY UPDATE"
+        " importer_id = COALESCE(VALUES(importer_id), importer_id),"
+        " row_count = row_count + VALUES(row_count),"
+        " first_dispatch_date = LEAST(COALESCE(first_dispatch_date, VALUES(first_dispatch_date)), COALESCE(VALUES(first_dispatch_date), first_dispatch_date)),"
+        " last_dispatch_date = GREATEST(COALESCE(last_dispatch_date, VALUES(last_dispatch_date)), COALESCE(VALUES(last_dispatch_date), last_dispatch_date)),"
+        " last_import_at = CURRENT_TIMESTAMP",
+        tuple(value for name, entry in catalog.items() for value in (name, *entry))
+    )
+
+async def load_importer_name_index_async():
+    """Rebuild the importer name index from the importers catalog"""
+    global importer_name_index
+    results = await execute_query_async("SELECT importer_name FROM importers")
+    loop = asyncio.get_running_loop()
+    # Build off the event loop, then swap the finished index in
+    importer_name_index = await loop.run_in_executor(
+        thread_pool, ImporterNameIndex.from_names, [row[0] for row in results or []]
+    )
+    logger.info(f"Importer name index loaded with {len(importer_name_index)} names")
+
+async def ensure_importer_name_index_async():
+    """
+    Load the name index if it is missing or older than IMPORTER_INDEX_REFRESH_SECONDS,
+    which also picks up importers added by other worker processes. On failure the
+    current index is kept.
+    """
+    loaded_at = importer_name_index.loaded_at
+    if loaded_at is not None and time.monotonic() - loaded_at < IMPORTER_INDEX_REFRESH_SECONDS:
+        return
+    async with importer_name_index_lock:
+        if importer_name_index.loaded_at != loaded_at:
+            return
+        try:
+            await load_importer_name_index_async()
+        except Exception as e:
+            logger.error(f"Error loading importer name index: {e}")
+
+async def mark_importers_dirty_async(date_spans: Dict[str, tuple], cursor):
+    """
+    Record that the records of these importers changed within (first_date, last_date).
+    A None bound means the affected range is unknown, which marks the whole history.
+    Marks widen to cover every change until an incremental summarize clears them.
+    Runs on the cursor of the transaction that changed the records, so a committed
+    change is never left unmarked.
+    """
+    if not date_spans:
+        return
+    await cursor.execute(
+        "INSERT INTO summary_dirty_importers (importer_name, min_date, max_date) VALUES "
+        + ", ".join(["(%s, %s, %s)"] * len(date_spans))
+        + " ON DUPLICATE KEY UPDATE"
+        " min_date = IF(min_date IS NULL OR VALUES(min_date) IS NULL, NULL, LEAST(min_date, VALUES(min_date))),"
+        " max_date = IF(max_date IS NULL OR VALUES(max_date) IS NULL, NULL, GREATEST(max_date, VALUES(max_date))),"
+        " marked_at = CURRENT_TIMESTAMP(6)",
+        tuple(value for name, (first_date, last_date) in date_spans.items() for value in (name, first_date, last_date))
+    )
+
+async def get_dirty_importers_async(marked_before: datetime, start_date: str, end_date: str) -> List[str]:
+    """Importers marked dirty up to `marked_before` whose changes may affect the start_date..end_date window"""
+    results = await execute_query_async(
+        "SELECT importer_name FROM summary_dirty_importers WHERE marked_at <= %s "
+        "AND (min_date IS NULL OR max_date IS NULL OR (min_date <= %s AND max_date >= %s))",
+        (marked_before, end_date, start_date)
+    )
+    return [row[0] for row in results] if results else []
+
+async def get_stale_summary_importers_async(marked_before: datetime) -> List[str]:
+    """
+    Importers a full run must revisit besides those with records: ones marked dirty up to
+    `marked_before` and ones that still have a summary but no records left
+    """
+    results = await execute_query_async(
+        "SELECT importer_name FROM summary_dirty_importers WHERE marked_at <= %s "
+        "UNION "
+        "SELECT s.importer_name FROM import_summaries s "
+        "LEFT JOIN importers i ON i.importer_name = s.importer_name "
+        "WHERE s.importer_name IS NOT NULL AND COALESCE(i.row_count, 0) = 0",
+        (marked_before,)
+    )
+    return [row[0] for row in results] if results else []
+
+async def clear_dirty_importers_async(marked_before: datetime, importer_names: List[str]):
+    """Clear the given importers' marks made up to `marked_before`"""
+    for i in range(0, len(importer_names), 500):
+        chunk = importer_names[i:i + 500]
+        await execute_query_async(
+            f"DELETE FROM summary_dirty_importers WHERE marked_at <= %s AND importer_name IN ({', '.join(['%s'] * len(chunk))})",
+            (marked_before, *chunk)
+        )
+
+@traced("fetch")
+async def fetch_data_from_api_async(
+    start_date: str,
+    end_date: str,
+    importer_name: str,
+    operation_type: str = "import",
+    on_page: Optional[Callable[[int, int], None]] = None
+) -> List[Dict]:
+    """
+    Fetch data from Logcomex API asynchronously, calling on_page(page, record_count) per page.
+    Connection errors, timeouts, 429 and 5xx are retried up to API_MAX_RETRIES times per
+    page; a page that still cannot be fetched raises RuntimeError instead of returning a
+    partial result.
+    """
     # Set product-signature header based on operation type
     product_signature = 'mexico-export-logistic' if operation_type == 'export' else 'mexico-import-logistic'
     
@@ -511,39 +1888,58 @@ async def fetch_data_from_api_async(start_date: str, end_date: str, importer_nam
     
     all_records = []
     page = 1
+    retries = 0
     
     async with aiohttp.ClientSession() as session:
         while True:
             payload["page"] = page
             
+            page_started = time.perf_counter()
             try:
                 async with session.post(API_URL, headers=headers, json=payload, timeout=30) as response:
                     response.raise_for_status()
                     data = await response.json()
-                    
-                    # Handle the fact that data['data'] is a dict, not a list
-                    data_section = data.get("data", {})
-                    if isinstance(data_section, dict):
-                        records = list(data_section.values())  # Convert dict values to list
-                    else:
-                        records = data_section if data_section else []
-                    
-                    if not records:
-                        break
-                        
-                    all_records.extend(records)
-                    
-                    # Rate limiting
-                    await asyncio.sleep(0.5)  # Reduced sleep time
-                    page += 1
-                    
-                    # Check if more pages
-                    if len(records) < 100:
-                        break
-                        
-            except Exception as e:
-                logger.error(f"Error fetching data: {e}")
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                # Rate limited, server error or network failure: back off and retry the same page
+                status = getattr(e, "status", None)
+                if (status is None or status == 429 or status >= 500) and retries < API_MAX_RETRIES:
+                    api_page_latency.observe(time.perf_counter() - page_started, "retry")
+                    delay = retry_after_seconds((getattr(e, "headers", None) or {}).get("Retry-After"))
+                    if delay is None:
+                        delay = API_RETRY_BACKOFF_SECONDS * 2 ** retries
+                    retries += 1
+                    logger.warning(f"API page {page} failed ({status or type(e).__name__}); retry {retries}/{API_MAX_RETRIES} in {delay:.1f}s")
+                    await asyncio.sleep(delay)
+                    continue
+                api_page_latency.observe(time.perf_counter() - page_started, "error")
+                raise RuntimeError(f"Logcomex API page {page} could not be fetched: {str(e) or type(e).__name__}") from e
+            retries = 0
+            api_page_latency.observe(time.perf_counter() - page_started, "ok")
+            
+            # Handle the fact that data['data'] is a dict, not a list
+            data_section = data.get("data", {})
+            if isinstance(data_section, dict):
+                records = list(data_section.values())  # Convert dict values to list
+            else:
+                records = data_section if data_section else []
+            
+            if not records:
                 break
+                
+            all_records.extend(records)
+            if on_page:
+                on_page(page, len(records))
+            
+            # Check if more pages
+            if len(records) < 100:
+                break
+            
+            # Rate limiting
+            await asyncio.sleep(API_PAGE_DELAY_SECONDS)
+            page += 1
+    
+    api_pages_per_import.observe(page)
+    set_span_attrs(pages=page, rows=len(all_records))
     
     # Validate importer name by checking if we got any data
     if not all_records:
@@ -553,6 +1949,13 @@ async def fetch_data_from_api_async(start_date: str, end_date: str, importer_nam
     
     return all_records
 
+def retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """Seconds from a Retry-After header in its delta-seconds form, capped at one minute"""
+    try:
+        return min(max(float(value), 0.0), 60.0)
+    except (TypeError, ValueError):
+        return None
+
 def fetch_data_from_api(start_date: str, end_date: str, importer_name: str, operation_type: str = "import") -> List[Dict]:
     """Synchronous wrapper for API fetch (for backward compatibility)"""
     loop = asyncio.new_event_loop()
@@ -562,6 +1965,7 @@ def fetch_data_from_api(start_date: str, end_date: str, importer_name: str, oper
     finally:
         loop.close()
 
+@traced("insert")
 async def insert_records_bulk_async(records: List[Dict]) -> int:
     """Insert records into database using bulk operations for better performance"""
     if not records:
@@ -602,23 +2006,55 @@ async def insert_records_bulk_async(records: List[Dict]) -> int:
     if not values:
         return 0
     
-    pool = await get_async_db_pool()
-    async with pool.acquire() as conn:
-        async with conn.cursor() as cursor:
-            # Bulk insert with executemany for better performance
-            query = """
-            INSERT INTO import_records (
-                dispatch_date, importer_name, importer_address, supplier_name, supplier_address,
-                origin_destination_country, buyer_seller_country, entry_exit_transport,
-                departure_hscodes, departure_gross_weight, departure_goods_usd_value,
-                dispatch_customs, entry_customs, custom_broker_id, customs_regime,
-                customs_regime_id, declaration_type, dispatch_customs_state, importer_id,
-                incoterm, container_type, teus_qty, departure_insurance_usd_value,
-                departure_freight_usd_value
-            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """
-            await cursor.executemany(query, values)
-            return len(values)
+    # Catalog entries and the importers and months whose monthly aggregates the batch touches
+    date_spans: Dict[str, List[date]] = {}
+    catalog: Dict[str, list] = {}
+    for value in values:
+        dispatch_date = parse_record_date(value[0])
+        if not value[1]:
+            continue
+        # [importer_id, row count, first dispatch date, last dispatch date]
+        entry = catalog.setdefault(value[1], [value[18], 0, None, None])
+        entry[1] += 1
+        if dispatch_date:
+            span = date_spans.setdefault(value[1], [dispatch_date, dispatch_date])
+            span[0] = min(span[0], dispatch_date)
+            span[1] = max(span[1], dispatch_date)
+            entry[2], entry[3] = span
+    importer_names = list(catalog)
+    await begin_aggregate_writes_async(importer_names)
+    
+    insert_started = time.perf_counter()
+    # The rows, both row counters (table_versions and the catalog) and the dirty marks commit together
+    async with db_transaction() as cursor:
+        # Bulk insert with executemany for better performance
+        query = """
+        INSERT INTO import_records (
+            dispatch_date, importer_name, importer_address, supplier_name, supplier_address,
+            origin_destination_country, buyer_seller_country, entry_exit_transport,
+            departure_hscodes, departure_gross_weight, departure_goods_usd_value,
+            dispatch_customs, entry_customs, custom_broker_id, customs_regime,
+            customs_regime_id, declaration_type, dispatch_customs_state, importer_id,
+            incoterm, container_type, teus_qty, departure_insurance_usd_value,
+            departure_freight_usd_value
+        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """
+        await cursor.executemany(query, values)
+        await record_table_write_async("import_records", cursor, row_delta=len(values))
+        await update_importer_catalog_async(catalog, cursor)
+        await mark_importers_dirty_async({name: tuple(span) for name, span in date_spans.items()}, cursor)
+    insert_seconds_total.inc(time.perf_counter() - insert_started)
+    rows_inserted_total.inc(len(values))
+    set_span_attrs(rows=len(values))
+    
+    for importer_name in catalog:
+        importer_name_index.add(importer_name)
+    # Rebuild the monthly aggregates of every importer and month the batch touched
+    for importer_name, (first_date, last_date) in date_spans.items():
+        await refresh_monthly_aggregates_async(importer_name, first_date, last_date)
+    await finish_aggregate_writes_async(importer_names)
+    
+    return len(values)
 
 def insert_records(records: List[Dict]) -> int:
     """Synchronous wrapper for bulk insert (for backward compatibility)"""
@@ -631,7 +2067,7 @@ def insert_records(records: List[Dict]) -> int:
 
 async def get_importers_async() -> List[str]:
     """Get list of unique importers asynchronously"""
-    results = await execute_query_async("SELECT DISTINCT importer_name FROM import_records WHERE importer_name IS NOT NULL")
+    results = await execute_query_async("SELECT importer_name FROM importers WHERE row_count > 0")
     return [row[0] for row in results] if results else []
 
 def get_importers() -> List[str]:
@@ -660,533 +2096,1184 @@ def get_importer_records(importer_name: str, start_date: str, end_date: str) ->
     finally:
         loop.close()
 
+# Positions of the import_records columns (SELECT *) used by the summary KPIs
+SUMMARY_SOURCE_COLUMNS = {
+    "dispatch_date": 1,
+    "origin_destination_country": 6,
+    "entry_exit_transport": 8,
+    "departure_hscodes": 9,
+    "departure_gross_weight": 10,
+    "departure_goods_usd_value": 11,
+    "dispatch_customs": 12,
+    "entry_customs": 13,
+    "custom_broker_id": 14,
+    "customs_regime_id": 16,
+    "importer_id": 19,
+    "incoterm": 20,
+}
+SUMMARY_NUMERIC_COLUMNS = ("departure_gross_weight", "departure_goods_usd_value")
+
+def encode_column(values) -> tuple:
+    """Dictionary-encode a column as (distinct values in first-seen order, array of codes)"""
+    index: Dict[Any, int] = {}
+    codes = array('i', [index.setdefault(value, len(index)) for value in values])
+    return list(index), codes
+
+def encode_column_numpy(column: Any) -> tuple:
+    """
+    encode_column for an object array: rows are grouped by np.unique over the values'
+    hashes instead of a dict lookup per row, and the first row of each group orders
+    the distinct values (first-seen, so ties keep the row order as in encode_column).
+    The codes are checked against the column; a hash collision falls back to encode_column.
+    """
+    hashes = np.fromiter(map(hash, column), dtype=np.int64, count=len(column))
+    _, inverse = np.unique(hashes, return_inverse=True)
+    inverse = inverse.ravel()
+    first_rows = np.full(int(inverse.max()) + 1, len(column), dtype=np.intp)
+    np.minimum.at(first_rows, inverse, np.arange(len(column)))
+    order = np.argsort(first_rows)
+    rank = np.empty(len(order), dtype=np.intp)
+    rank[order] = np.arange(len(order))
+    distinct = column[first_rows[order]]
+    codes = rank[inverse]
+    if not (distinct[codes] == column).all():
+        values, codes = encode_column(column)
+        return values, np.asarray(codes, dtype=np.intp)
+    return distinct.tolist(), codes
+
+def date_range(dates: List[Any]) -> tuple:
+    """(first, last) non-NULL date of a column, (None, None) without any"""
+    dates = [d for d in dates if d]
+    return (min(dates), max(dates)) if dates else (None, None)
+
+def pack_summary_columns(records: List[tuple]) -> Dict[str, Any]:
+    """
+    Convert import_records rows into the compact columnar form consumed by
+    calculate_summary_columns: numeric columns become float arrays, text columns
+    are dictionary-encoded. The result pickles small enough to ship to a worker process.
+    """
+    if use_numpy_backend():
+        return pack_summary_columns_numpy(records)
+    transposed = list(zip(*records))
+    columns: Dict[str, Any] = {"row_count": len(records)}
+    columns["date_range"] = date_range(set(transposed[SUMMARY_SOURCE_COLUMNS["dispatch_date"]]))
+    for name, position in SUMMARY_SOURCE_COLUMNS.items():
+        if name in SUMMARY_NUMERIC_COLUMNS:
+            columns[name] = array('d', [float(value or 0) for value in transposed[position]])
+        elif name not in ("entry_customs", "dispatch_customs", "dispatch_date"):
+            columns[name] = encode_column(transposed[position])
+    # Ports are matched on entry and dispatch customs together, so encode the pair
+    columns["customs_pair"] = encode_column(zip(
+        transposed[SUMMARY_SOURCE_COLUMNS["entry_customs"]],
+        transposed[SUMMARY_SOURCE_COLUMNS["dispatch_customs"]]
+    ))
+    return columns
+
+def pack_summary_columns_numpy(records: List[tuple]) -> Dict[str, Any]:
+    """
+    pack_summary_columns for the NumPy backend: each source column is loaded into an
+    array once, straight from the rows (no transposed copy of the whole result), then
+    converted to floats or a date range and dictionary-encoded with array operations.
+    """
+    def load(name: str) -> Any:
+        return np.fromiter(map(itemgetter(SUMMARY_SOURCE_COLUMNS[name]), records), dtype=object, count=len(records))
+    
+    columns: Dict[str, Any] = {"row_count": len(records)}
+    dates = load("dispatch_date")
+    dates = dates[dates != None]  # noqa: E711 (element-wise comparison)
+    columns["date_range"] = (dates.min(), dates.max()) if len(dates) else (None, None)
+    for name in SUMMARY_SOURCE_COLUMNS:
+        if name in SUMMARY_NUMERIC_COLUMNS:
+            values = load(name)
+            values[values == None] = 0  # noqa: E711 (element-wise comparison)
+            columns[name] = values.astype(np.float64)
+        elif name not in ("entry_customs", "dispatch_customs", "dispatch_date"):
+            columns[name] = encode_column_numpy(load(name))
+    # Ports are matched on entry and dispatch customs together, so encode the pair
+    columns["customs_pair"] = encode_column_numpy(np.fromiter(zip(
+        map(itemgetter(SUMMARY_SOURCE_COLUMNS["entry_customs"]), records),
+        map(itemgetter(SUMMARY_SOURCE_COLUMNS["dispatch_customs"]), records)
+    ), dtype=object, count=len(records)))
+    return columns
+
+def use_numpy_backend() -> bool:
+    return np is not None and SUMMARY_BACKEND in ("auto", "numpy")
+
+def count_codes(codes: Any, size: int) -> List[int]:
+    """Number of rows for each dictionary code of a column"""
+    if np is not None and isinstance(codes, np.ndarray):
+        return np.bincount(codes, minlength=size).tolist()
+    counts = [0] * size
+    for code, count in Counter(codes).items():
+        counts[code] = count
+    return counts
+
+def column_total(values: Any) -> float:
+    """Sum of a numeric column"""
+    if np is not None and isinstance(values, np.ndarray):
+        # cumsum adds left to right like sum(), so both backends return the exact same float
+        return float(np.cumsum(values)[-1]) if len(values) else 0.0
+    return sum(values)
+
+def count_categories(column: tuple, classify: Callable[[Any], Any]) -> Counter:
+    """Count rows per category, classifying each distinct value only once"""
+    values, codes = column
+    counts = Counter()
+    for code, count in enumerate(count_codes(codes, len(values))):
+        if count:
+            counts[classify(values[code])] += count
+    return counts
+
+# Summary KPI registry. Each dimension yields one pct_ column per category plus one
+# for everything else; a category matches on any of its patterns, first match wins.
+# Adding a port, incoterm, origin, etc. is one line here: the import_summaries
+# column, INSERT statement and KPI are all generated from this table.
+#   match "exact": value equals a pattern; "contains": upper-cased value contains a
+#   pattern; "prefix": value starts with a pattern
+SUMMARY_PCT_TYPE = "DECIMAL(5,2)"
+SUMMARY_DIMENSIONS = {
+    "regime": {
+        "column": "customs_regime_id", "prefix": "pct_regime_", "match": "exact", "other": "OTHERS",
+        "categories": [
+            ("A1", ("A1",)),
+            ("F4", ("F4",)),
+            ("IN", ("IN",)),
+            ("A3", ("A3",)),
+            ("AF", ("AF",)),
+            ("C1", ("C1",)),
+            ("F5", ("F5",)),
+        ],
+    },
+    "transport": {
+        "column": "entry_exit_transport", "prefix": "pct_transport_", "match": "contains", "other": "not_declared",
+        "categories": [
+            ("carretero", ("CARRETERO",)),
+            ("aereo", ("AEREO", "AÉREO")),
+            ("maritimo", ("MARITIMO", "MARÍTIMO")),
+        ],
+    },
+    # Ports match on "<entry customs> <dispatch customs>"
+    "port": {
+        "column": "customs_pair", "prefix": "pct_port_", "match": "contains", "other": "OTHERS",
+        "categories": [
+            ("NUEVO_LAREDO", ("NUEVO LAREDO, NUEVO LAREDO, TAMAULIPAS",)),
+            ("COLOMBIA_NL", ("MONTERREY, GENERAL MARIANO ESCOBEDO, NUEVO LEON",)),
+            ("MONTERREY_AIRPORT", ("AEROPUERTO INTERNACIONAL GENERAL MARIANO ESCOBEDO, APODACA, NUEVO LEON",)),
+            ("MANZANILLO", ("MANZANILLO, MANZANILLO, COLIMA",)),
+            ("PUEBLA", ("PUEBLA, HEROICA PUEBLA DE ZARAGOZA, PUEBLA",)),
+            ("AIFA_AIRPORT", ("AEROPUERTO INTERNACIONAL FELIPE ANGELES, SANTA LUCIA, ZUMPANGO, ESTADO DE MEXICO",)),
+            ("NOGALES", ("NOGALES, NOGALES, SONORA",)),
+            ("ALTAMIRA", ("ALTAMIRA, ALTAMIRA, TAMAULIPAS",)),
+            ("AICM_AIRPORT", ("AEROPUERTO INTERNACIONAL DE LA CIUDAD DE MEXICO, CIUDAD DE MEXICO, CIUDAD DE MEXICO",)),
+            ("LAZARO", ("LAZARO CARDENAS, LAZARO CARDENAS, MICHOACAN",)),
+            ("VERACRUZ", ("VERACRUZ, VERACRUZ, VERACRUZ",)),
+            ("TIJUANA", ("TIJUANA, TIJUANA, BAJA CALIFORNIA",)),
+            ("GUAYMAS", ("GUAYMAS, GUAYMAS, SONORA",)),
+        ],
+    },
+    "hs": {
+        "column": "departure_hscodes", "prefix": "pct_hs_", "match": "prefix", "other": "OTROS",
+        "categories": [
+            ("84", ("84",)),
+            ("85", ("85",)),
+            ("90", ("90",)),
+            ("73", ("73",)),
+            ("74", ("74",)),
+        ],
+    },
+    "incoterm": {
+        "column": "incoterm", "prefix": "pct_incoterm_", "match": "exact", "other": "OTROS",
+        "categories": [
+            ("DAP", ("DAP",)),
+            ("EXW", ("EXW",)),
+            ("FCA", ("FCA",)),
+            ("FOB", ("FOB",)),
+            ("CIF", ("CIF",)),
+            ("CFR", ("CFR",)),
+            ("NOT_INFORMED", ("NO INFORMADO",)),
+        ],
+    },
+    "origin": {
+        "column": "origin_destination_country", "prefix": "pct_origin_", "match": "contains", "other": "OTROS",
+        "categories": [
+            ("TAIWAN", ("TAIWAN",)),
+            ("VIETNAM", ("VIETNAM",)),
+            ("CHINA", ("CHINA",)),
+            ("USA", ("ESTADOS UNIDOS", "USA")),
+            ("GERMANY", ("ALEMANIA", "GERMANY")),
+            ("DENMARK", ("DINAMARCA", "DENMARK")),
+            ("FRANCE", ("FRANCIA", "FRANCE")),
+        ],
+    },
+}
+# Brokers reported with their own pct_broker_ column
+SUMMARY_TRACKED_BROKERS = ("3995", "3714", "1720")
+
+def dimension_columns(dimension_name: str) -> List[tuple]:
+    dimension = SUMMARY_DIMENSIONS[dimension_name]
+    suffixes = [suffix for suffix, _ in dimension["categories"]] + [dimension["other"]]
+    return [(dimension["prefix"] + suffix, SUMMARY_PCT_TYPE) for suffix in suffixes]
+
+# import_summaries columns (name, SQL type) in table and INSERT order
+SUMMARY_COLUMNS = (
+    [
+        ("importer_name", "VARCHAR(255) UNIQUE"),
+        ("rfc", "VARCHAR(255)"),
+        ("total_pedimentos_last_6_months", "INT"),
+        ("total_freight_usd_value", "DECIMAL(15,2)"),
+        ("avg_freight_usd_per_shipment", "DECIMAL(15,2)"),
+        ("customs_offices_used", "TEXT"),
+        ("pct_shipments_key_locations", SUMMARY_PCT_TYPE),
+    ]
+    + dimension_columns("regime")
+    + dimension_columns("transport")
+    + dimension_columns("port")
+    + dimension_columns("hs")
+    + [
+        ("is_origin_usa", "TINYINT(1)"),
+        ("is_candidate_for_crossborder", "TINYINT(1)"),
+    ]
+    + dimension_columns("incoterm")
+    + [
+        ("custom_brokers_used", "TEXT"),
+        ("top_custom_broker_id", "VARCHAR(255)"),
+        ("pct_top_custom_broker_id", SUMMARY_PCT_TYPE),
+        ("num_custom_brokers_used", "INT"),
+    ]
+    + [(f"pct_broker_{broker_id}", SUMMARY_PCT_TYPE) for broker_id in SUMMARY_TRACKED_BROKERS]
+    + dimension_columns("origin")
+    + [
+        ("last_import_date", "DATE"),
+        ("first_import_date", "DATE"),
+        ("total_weight_kg", "DECIMAL(15,2)"),
+        ("avg_weight_per_shipment", "DECIMAL(15,2)"),
+        ("business_opportunity_score", "INT"),
+        ("crossborder_potential", "INT"),
+        ("ocean_freight_potential", "INT"),
+        ("supply_chain_potential", "INT"),
+    ]
+)
+SUMMARY_COLUMN_NAMES = tuple(name for name, _ in SUMMARY_COLUMNS)
+# Summary dict -> INSERT parameters, in one C-level call per row
+summary_row = itemgetter(*SUMMARY_COLUMN_NAMES)
+
+def summary_table_ddl() -> str:
+    """CREATE TABLE statement for import_summaries generated from the registry"""
+    definitions = (
+        ["id INT AUTO_INCREMENT PRIMARY KEY"]
+        + [f"{name} {sql_type}" for name, sql_type in SUMMARY_COLUMNS]
+        + [
+            "created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP",
+            "updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP",
+        ]
+        + [f"INDEX {index_name} ({columns})" for index_name, columns in SUMMARY_TOP_INDEXES.items()]
+    )
+    return (
+        "CREATE TABLE IF NOT EXISTS import_summaries (\n    "
+        + ",\n    ".join(definitions)
+        + "\n) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci"
+    )
+
+def normalize_dimension_value(dimension: Dict[str, Any], value: Any) -> str:
+    """Reduce a raw column value to the string its dimension's patterns are matched against"""
+    if dimension["match"] == "contains":
+        if isinstance(value, tuple):
+            return " ".join((part or "").upper() for part in value)
+        return (value or "").upper()
+    return value or ""
+
+def classify_dimension_value(dimension: Dict[str, Any], value: str) -> str:
+    """Column suffix of the first category whose patterns match `value`"""
+    match = dimension["match"]
+    for suffix, patterns in dimension["categories"]:
+        if match == "exact":
+            if value in patterns:
+                return suffix
+        elif match == "prefix":
+            if value.startswith(patterns):
+                return suffix
+        elif any(pattern in value for pattern in patterns):
+            return suffix
+    return dimension["other"]
+
 def calculate_summary(importer_name: str, records: List[tuple]) -> Optional[Dict]:
     """Calculate all KPIs for an importer"""
     if not records:
         return None
+    return calculate_summary_columns(importer_name, pack_summary_columns(records))
+
+def start_summary_process_pool():
+    """Create the process pool used by offload_summary_work_async"""
+    global summary_process_pool
+    if SUMMARY_PROCESS_WORKERS > 0 and summary_process_pool is None:
+        # spawn avoids forking a process that holds event loop and connection pool state
+        summary_process_pool = ProcessPoolExecutor(
+            max_workers=SUMMARY_PROCESS_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+        logger.info(f"Summary process pool started with {SUMMARY_PROCESS_WORKERS} workers")
+
+def stop_summary_process_pool():
+    """Shut down the summary process pool"""
+    global summary_process_pool
+    if summary_process_pool is not None:
+        summary_process_pool.shutdown(wait=True, cancel_futures=True)
+        summary_process_pool = None
+
+async def offload_summary_work_async(func: Callable, *args, row_count: int):
+    """
+    Run a summary function off the event loop: in the summary process pool for
+    at least SUMMARY_OFFLOAD_MIN_ROWS rows, inline for small inputs or when the
+    pool is disabled.
+    """
+    global summary_process_pool
+    if summary_process_pool is None or row_count < SUMMARY_OFFLOAD_MIN_ROWS:
+        return func(*args)
     
-    total_records = len(records)
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(summary_process_pool, func, *args)
+    except BrokenProcessPool as e:
+        # A worker died (e.g. OOM killed); recreate the pool for later calls and finish this one inline
+        logger.error(f"Summary process pool broken running {func.__name__}: {e}")
+        summary_process_pool = None
+        start_summary_process_pool()
+        return func(*args)
+
+async def aggregate_records_async(records: List[tuple]) -> Dict[str, Any]:
+    """
+    Build the summary aggregate of import_records rows. From SUMMARY_OFFLOAD_MIN_ROWS
+    rows on, packing runs in the thread pool so it doesn't block the event loop.
+    """
+    if not records:
+        return empty_summary_aggregate()
+    if len(records) < SUMMARY_OFFLOAD_MIN_ROWS:
+        columns = pack_summary_columns(records)
+    else:
+        loop = asyncio.get_running_loop()
+        columns = await loop.run_in_executor(thread_pool, pack_summary_columns, records)
+    return await offload_summary_work_async(aggregate_summary_columns, columns, row_count=len(records))
+
+def calculate_summary_columns(importer_name: str, columns: Dict[str, Any]) -> Optional[Dict]:
+    """Calculate all KPIs for an importer from the output of pack_summary_columns"""
+    return finalize_summary(importer_name, aggregate_summary_columns(columns))
+
+# Per-category counters kept in a summary aggregate
+SUMMARY_COUNTER_DIMENSIONS = tuple(SUMMARY_DIMENSIONS) + ("brokers",)
+# Bumped whenever the aggregate layout changes; stored aggregates of another version are rebuilt
+SUMMARY_AGGREGATE_VERSION = 2
+
+def aggregate_summary_columns(columns: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Reduce packed records to the mergeable state the KPIs are computed from:
+    row count, value totals, date range, RFC and, per dimension, row counts of
+    each distinct normalized value. Categories are assigned in finalize_summary,
+    so registry changes apply to stored aggregates without rebuilding them.
+    Aggregates of disjoint record sets combine with merge_summary_aggregates.
+    """
+    total_records = columns["row_count"]
+    if not total_records:
+        return empty_summary_aggregate()
     
-    # Basic metrics
-    total_freight = round(sum(float(r[11] or 0) for r in records), 2)
-    avg_freight = round(total_freight / total_records if total_records > 0 else 0, 2)
-    total_weight = round(sum(float(r[10] or 0) for r in records), 2)
-    avg_weight = round(total_weight / total_records if total_records > 0 else 0, 2)
-    
-    # Extract RFC from importer_id
-    rfc = records[0][19] if records[0][19] else ""
-    
-    # Date ranges
-    dates = [r[1] for r in records if r[1]]
-    first_date = min(dates) if dates else ""
-    last_date = max(dates) if dates else ""
-    
-    # Regime percentages
-    regimes = [r[16] or "" for r in records]
-    regime_counts = Counter(regimes)
-    pct_regime_A1 = round((regime_counts.get("A1", 0) / total_records) * 100, 2)
-    pct_regime_F4 = round((regime_counts.get("F4", 0) / total_records) * 100, 2)
-    pct_regime_IN = round((regime_counts.get("IN", 0) / total_records) * 100, 2)
-    pct_regime_A3 = round((regime_counts.get("A3", 0) / total_records) * 100, 2)
-    pct_regime_AF = round((regime_counts.get("AF", 0) / total_records) * 100, 2)
-    pct_regime_C1 = round((regime_counts.get("C1", 0) / total_records) * 100, 2)
-    pct_regime_F5 = round((regime_counts.get("F5", 0) / total_records) * 100, 2)
-    pct_regime_OTHERS = round(((total_records - regime_counts.get("A1", 0) - regime_counts.get("F4", 0) - regime_counts.get("IN", 0) - regime_counts.get("A3", 0) - regime_counts.get("AF", 0) - regime_counts.get("C1", 0) - regime_counts.get("F5", 0)) / total_records) * 100, 2)
-    
-    # Transport percentages
-    transports = [r[8] or "" for r in records]
-    transport_counts = {"CARRETERO": 0, "AEREO": 0, "MARITIMO": 0, "NOT_DECLARED": 0}
-    
-    for transport in transports:
-        transport_upper = transport.upper()
-        if "CARRETERO" in transport_upper:
-            transport_counts["CARRETERO"] += 1
-        elif "AEREO" in transport_upper or "AÉREO" in transport_upper:
-            transport_counts["AEREO"] += 1
-        elif "MARITIMO" in transport_upper or "MARÍTIMO" in transport_upper:
-            transport_counts["MARITIMO"] += 1
-        else:
-            transport_counts["NOT_DECLARED"] += 1
+    importer_ids, importer_id_codes = columns["importer_id"]
+    first_date, last_date = columns["date_range"]
+    aggregate = {
+        "record_count": total_records,
+        "freight_sum": column_total(columns["departure_goods_usd_value"]),
+        "weight_sum": column_total(columns["departure_gross_weight"]),
+        "rfc": importer_ids[importer_id_codes[0]] or "",
+        "first_date": first_date,
+        "last_date": last_date,
+    }
+    for name, dimension in SUMMARY_DIMENSIONS.items():
+        counts = count_categories(columns[dimension["column"]], lambda value: normalize_dimension_value(dimension, value))
+        aggregate[name] = dict(counts)
+    # Codes are assigned in first-seen order, so ties keep the row order
+    brokers = count_categories(columns["custom_broker_id"], lambda broker: broker)
+    aggregate["brokers"] = {broker: count for broker, count in brokers.items() if broker}
+    return aggregate
+
+def empty_summary_aggregate() -> Dict[str, Any]:
+    aggregate = {"record_count": 0, "freight_sum": 0.0, "weight_sum": 0.0, "rfc": None, "first_date": None, "last_date": None}
+    aggregate.update({dimension: {} for dimension in SUMMARY_COUNTER_DIMENSIONS})
+    return aggregate
+
+def merge_summary_aggregates(aggregates: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Combine aggregates of disjoint record sets, given in row order (oldest first)"""
+    merged = empty_summary_aggregate()
+    for aggregate in aggregates:
+        if not aggregate["record_count"]:
+            continue
+        merged["record_count"] += aggregate["record_count"]
+        merged["freight_sum"] += aggregate["freight_sum"]
+        merged["weight_sum"] += aggregate["weight_sum"]
+        if merged["rfc"] is None:
+            merged["rfc"] = aggregate["rfc"]
+        if aggregate["first_date"] and (merged["first_date"] is None or aggregate["first_date"] < merged["first_date"]):
+            merged["first_date"] = aggregate["first_date"]
+        if aggregate["last_date"] and (merged["last_date"] is None or aggregate["last_date"] > merged["last_date"]):
+            merged["last_date"] = aggregate["last_date"]
+        for dimension in SUMMARY_COUNTER_DIMENSIONS:
+            counts = merged[dimension]
+            for category, count in aggregate[dimension].items():
+                counts[category] = counts.get(category, 0) + count
+    return merged
+
+def finalize_summary(importer_name: str, aggregate: Dict[str, Any]) -> Optional[Dict]:
+    """Calculate all KPIs for an importer from a summary aggregate"""
+    total_records = aggregate["record_count"]
+    if not total_records:
+        return None
     
-    pct_transport_carretero = round((transport_counts["CARRETERO"] / total_records) * 100, 2)
-    pct_transport_aereo = round((transport_counts["AEREO"] / total_records) * 100, 2)
-    pct_transport_maritimo = round((transport_counts["MARITIMO"] / total_records) * 100, 2)
-    pct_transport_not_declared = round((transport_counts["NOT_DECLARED"] / total_records) * 100, 2)
+    def pct(count: int) -> float:
+        return round((count / total_records) * 100, 2)
     
-    # Port percentages
-    port_counts = {"NUEVO_LAREDO": 0, "COLOMBIA_NL": 0, "MONTERREY_AIRPORT": 0, "MANZANILLO": 0, "PUEBLA": 0, "AIFA_AIRPORT": 0, "NOGALES": 0, "ALTAMIRA": 0, "AICM_AIRPORT": 0, "LAZARO": 0, "VERACRUZ": 0, "TIJUANA": 0, "GUAYMAS": 0, "OTHERS": 0}
+    # Basic metrics
+    total_freight = round(aggregate["freight_sum"], 2)
+    total_weight = round(aggregate["weight_sum"], 2)
+    values = {
+        'importer_name': importer_name,
+        # RFC from the importer_id of the first record
+        'rfc': aggregate["rfc"] or "",
+        'total_pedimentos_last_6_months': total_records,
+        'total_freight_usd_value': total_freight,
+        'avg_freight_usd_per_shipment': round(total_freight / total_records, 2),
+        'pct_shipments_key_locations': 0.0,
+        'last_import_date': aggregate["last_date"] or "",
+        'first_import_date': aggregate["first_date"] or "",
+        'total_weight_kg': total_weight,
+        'avg_weight_per_shipment': round(total_weight / total_records, 2),
+    }
     
-    for record in records:
-        entry_customs = (record[13] or "").upper()
-        dispatch_customs = (record[12] or "").upper()
-        customs_combined = entry_customs + " " + dispatch_customs
-        
-        if "NUEVO LAREDO, NUEVO LAREDO, TAMAULIPAS" in customs_combined:
-            port_counts["NUEVO_LAREDO"] += 1
-        elif "MONTERREY, GENERAL MARIANO ESCOBEDO, NUEVO LEON" in customs_combined:
-            port_counts["COLOMBIA_NL"] += 1
-        elif "AEROPUERTO INTERNACIONAL GENERAL MARIANO ESCOBEDO, APODACA, NUEVO LEON" in customs_combined:
-            port_counts["MONTERREY_AIRPORT"] += 1
-        elif "MANZANILLO, MANZANILLO, COLIMA" in customs_combined:
-            port_counts["MANZANILLO"] += 1
-        elif "PUEBLA, HEROICA PUEBLA DE ZARAGOZA, PUEBLA" in customs_combined:
-            port_counts["PUEBLA"] += 1
-        elif "AEROPUERTO INTERNACIONAL FELIPE ANGELES, SANTA LUCIA, ZUMPANGO, ESTADO DE MEXICO" in customs_combined:
-            port_counts["AIFA_AIRPORT"] += 1
-        elif "NOGALES, NOGALES, SONORA" in customs_combined:
-            port_counts["NOGALES"] += 1
-        elif "ALTAMIRA, ALTAMIRA, TAMAULIPAS" in customs_combined:
-            port_counts["ALTAMIRA"] += 1
-        elif "AEROPUERTO INTERNACIONAL DE LA CIUDAD DE MEXICO, CIUDAD DE MEXICO, CIUDAD DE MEXICO" in customs_combined:
-            port_counts["AICM_AIRPORT"] += 1
-        elif "LAZARO CARDENAS, LAZARO CARDENAS, MICHOACAN" in customs_combined:
-            port_counts["LAZARO"] += 1
-        elif "VERACRUZ, VERACRUZ, VERACRUZ" in customs_combined:
-            port_counts["VERACRUZ"] += 1
-        elif "TIJUANA, TIJUANA, BAJA CALIFORNIA" in customs_combined:
-            port_counts["TIJUANA"] += 1
-        elif "GUAYMAS, GUAYMAS, SONORA" in customs_combined:
-            port_counts["GUAYMAS"] += 1
-        else:
-            port_counts["OTHERS"] += 1
-    
-    pct_port_NUEVO_LAREDO = round((port_counts["NUEVO_LAREDO"] / total_records) * 100, 2)
-    pct_port_COLOMBIA_NL = round((port_counts["COLOMBIA_NL"] / total_records) * 100, 2)
-    pct_port_MONTERREY_AIRPORT = round((port_counts["MONTERREY_AIRPORT"] / total_records) * 100, 2)
-    pct_port_MANZANILLO = round((port_counts["MANZANILLO"] / total_records) * 100, 2)
-    pct_port_PUEBLA = round((port_counts["PUEBLA"] / total_records) * 100, 2)
-    pct_port_AIFA_AIRPORT = round((port_counts["AIFA_AIRPORT"] / total_records) * 100, 2)
-    pct_port_NOGALES = round((port_counts["NOGALES"] / total_records) * 100, 2)
-    pct_port_ALTAMIRA = round((port_counts["ALTAMIRA"] / total_records) * 100, 2)
-    pct_port_AICM_AIRPORT = round((port_counts["AICM_AIRPORT"] / total_records) * 100, 2)
-    pct_port_LAZARO = round((port_counts["LAZARO"] / total_records) * 100, 2)
-    pct_port_VERACRUZ = round((port_counts["VERACRUZ"] / total_records) * 100, 2)
-    pct_port_TIJUANA = round((port_counts["TIJUANA"] / total_records) * 100, 2)
-    pct_port_GUAYMAS = round((port_counts["GUAYMAS"] / total_records) * 100, 2)
-    pct_port_OTHERS = round((port_counts["OTHERS"] / total_records) * 100, 2)
-    
-    # HS Code percentages
-    hs_counts = {"84": 0, "85": 0, "90": 0, "73": 0, "74": 0, "OTROS": 0}
+    # Category percentages for every registry dimension
+    for name, dimension in SUMMARY_DIMENSIONS.items():
+        category_counts = Counter()
+        for value, count in aggregate[name].items():
+            category_counts[classify_dimension_value(dimension, value)] += count
+        for column_name, _ in dimension_columns(name):
+            values[column_name] = pct(category_counts[column_name[len(dimension["prefix"]):]])
     
-    for record in records:
-        hs_code = record[9] or ""
-        if hs_code and len(hs_code) >= 2:
-            hs_prefix = hs_code[:2]
-            if hs_prefix in ["84", "85", "90", "73", "74"]:
-                hs_counts[hs_prefix] += 1
-            else:
-                hs_counts["OTROS"] += 1
-        else:
-            hs_counts["OTROS"] += 1
-    
-    pct_hs_84 = round((hs_counts["84"] / total_records) * 100, 2)
-    pct_hs_85 = round((hs_counts["85"] / total_records) * 100, 2)
-    pct_hs_90 = round((hs_counts["90"] / total_records) * 100, 2)
-    pct_hs_73 = round((hs_counts["73"] / total_records) * 100, 2)
-    pct_hs_74 = round((hs_counts["74"] / total_records) * 100, 2)
-    pct_hs_OTROS = round((hs_counts["OTROS"] / total_records) * 100, 2)
-    
-    # Origin country percentages
-    countries = [r[6] or "" for r in records]
-    country_counts = {"TAIWAN": 0, "VIETNAM": 0, "CHINA": 0, "USA": 0, "GERMANY": 0, "DENMARK": 0, "FRANCE": 0, "OTROS": 0}
-    
-    for country in countries:
-        country_upper = country.upper()
-        if "TAIWAN" in country_upper:
-            country_counts["TAIWAN"] += 1
-        elif "VIETNAM" in country_upper:
-            country_counts["VIETNAM"] += 1
-        elif "CHINA" in country_upper:
-            country_counts["CHINA"] += 1
-        elif "ESTADOS UNIDOS" in country_upper or "USA" in country_upper:
-            country_counts["USA"] += 1
-        elif "ALEMANIA" in country_upper or "GERMANY" in country_upper:
-            country_counts["GERMANY"] += 1
-        elif "DINAMARCA" in country_upper or "DENMARK" in country_upper:
-            country_counts["DENMARK"] += 1
-        elif "FRANCIA" in country_upper or "FRANCE" in country_upper:
-            country_counts["FRANCE"] += 1
-        else:
-            country_counts["OTROS"] += 1
-    
-    pct_origin_TAIWAN = round((country_counts["TAIWAN"] / total_records) * 100, 2)
-    pct_origin_VIETNAM = round((country_counts["VIETNAM"] / total_records) * 100, 2)
-    pct_origin_CHINA = round((country_counts["CHINA"] / total_records) * 100, 2)
-    pct_origin_USA = round((country_counts["USA"] / total_records) * 100, 2)
-    pct_origin_GERMANY = round((country_counts["GERMANY"] / total_records) * 100, 2)
-    pct_origin_DENMARK = round((country_counts["DENMARK"] / total_records) * 100, 2)
-    pct_origin_FRANCE = round((country_counts["FRANCE"] / total_records) * 100, 2)
-    pct_origin_OTROS = round((country_counts["OTROS"] / total_records) * 100, 2)
-    
-    # Incoterm percentages
-    incoterms = [r[20] or "" for r in records]
-    incoterm_counts = Counter(incoterms)
-    pct_incoterm_DAP = round((incoterm_counts.get("DAP", 0) / total_records) * 100, 2)
-    pct_incoterm_EXW = round((incoterm_counts.get("EXW", 0) / total_records) * 100, 2)
-    pct_incoterm_FCA = round((incoterm_counts.get("FCA", 0) / total_records) * 100, 2)
-    pct_incoterm_FOB = round((incoterm_counts.get("FOB", 0) / total_records) * 100, 2)
-    pct_incoterm_CIF = round((incoterm_counts.get("CIF", 0) / total_records) * 100, 2)
-    pct_incoterm_CFR = round((incoterm_counts.get("CFR", 0) / total_records) * 100, 2)
-    pct_incoterm_NOT_INFORMED = round((incoterm_counts.get("NO INFORMADO", 0) / total_records) * 100, 2)
-    pct_incoterm_OTROS = round(((total_records - incoterm_counts.get("DAP", 0) - incoterm_counts.get("EXW", 0) - incoterm_counts.get("FCA", 0) - incoterm_counts.get("FOB", 0) - incoterm_counts.get("CIF", 0) - incoterm_counts.get("CFR", 0) - incoterm_counts.get("NO INFORMADO", 0)) / total_records) * 100, 2)
-    
-    # Custom brokers
-    brokers = [r[14] or "" for r in records if r[14]]
-    broker_counts = Counter(brokers)
+    # Custom brokers (in first-seen order, so ties keep the row order)
+    broker_counts = Counter(aggregate["brokers"])
     num_brokers = len(broker_counts)
-    
-    # Get top 5 brokers by frequency
     top_brokers = broker_counts.most_common(5)
-    
+    top_broker = top_brokers[0] if top_brokers else ("", 0)
     # Format top brokers as comma-separated string (e.g., "1973, 1893, 1983, 9831, 1995")
-    custom_brokers_used = ", ".join([str(broker_id) for broker_id, _ in top_brokers])
-    
-    top_broker = broker_counts.most_common(1)[0] if broker_counts else ("", 0)
-    pct_top_broker = round((top_broker[1] / total_records) * 100, 2) if top_broker[1] > 0 else 0
-    
-    # Calculate percentages for specific broker IDs (3995, 3714, 1720)
-    pct_broker_3995 = round((broker_counts.get("3995", 0) / total_records) * 100, 2)
-    pct_broker_3714 = round((broker_counts.get("3714", 0) / total_records) * 100, 2)
-    pct_broker_1720 = round((broker_counts.get("1720", 0) / total_records) * 100, 2)
+    values['custom_brokers_used'] = ", ".join([str(broker_id) for broker_id, _ in top_brokers])
+    values['top_custom_broker_id'] = top_broker[0]
+    values['pct_top_custom_broker_id'] = pct(top_broker[1]) if top_broker[1] > 0 else 0
+    values['num_custom_brokers_used'] = num_brokers
+    values['customs_offices_used'] = str(num_brokers)
+    for broker_id in SUMMARY_TRACKED_BROKERS:
+        values[f'pct_broker_{broker_id}'] = pct(broker_counts.get(broker_id, 0))
     
     # Debug logging for broker percentages
-    logger.info(f"Broker calculations - Total records: {total_records}, Broker counts: {dict(broker_counts)}")
-    logger.info(f"Broker percentages - 3995: {pct_broker_3995}%, 3714: {pct_broker_3714}%, 1720: {pct_broker_1720}%")
+    logger.debug(f"Broker calculations - Total records: {total_records}, Broker counts: {dict(broker_counts)}")
     
     # Business intelligence flags
-    is_origin_usa = 1 if pct_origin_USA > 50 else 0
-    is_candidate_for_crossborder = 1 if is_origin_usa else 0
+    is_origin_usa = 1 if values['pct_origin_USA'] > 50 else 0
+    values['is_origin_usa'] = is_origin_usa
+    values['is_candidate_for_crossborder'] = is_origin_usa
     
     # Business opportunity score (1-10)
     score = 1
     if total_records > 10: score += 1
     if total_freight > 50000: score += 1
     if num_brokers > 3: score += 1
-    if pct_regime_A1 > 50: score += 1
-    if pct_transport_carretero > 50: score += 1
+    if values['pct_regime_A1'] > 50: score += 1
+    if values['pct_transport_carretero'] > 50: score += 1
     if is_origin_usa: score += 2
     if total_records > 50: score += 1
     if total_freight > 200000: score += 1
-    
-    business_opportunity_score = min(score, 10)
+    values['business_opportunity_score'] = min(score, 10)
     
     # Potential scores
-    crossborder_potential = 1 if is_candidate_for_crossborder else 0
-    ocean_freight_potential = 1 if pct_transport_maritimo > 30 else 0
-    supply_chain_potential = 1 if (total_records > 20 and num_brokers > 5) else 0
+    values['crossborder_potential'] = is_origin_usa
+    values['ocean_freight_potential'] = 1 if values['pct_transport_maritimo'] > 30 else 0
+    values['supply_chain_potential'] = 1 if (total_records > 20 and num_brokers > 5) else 0
     
-    return {
-        'importer_name': importer_name,
-        'rfc': rfc,
-        'total_pedimentos_last_6_months': total_records,
-        'total_freight_usd_value': total_freight,
-        'avg_freight_usd_per_shipment': avg_freight,
-        'customs_offices_used': str(num_brokers),
-        'pct_shipments_key_locations': 0.0,
-        'pct_regime_A1': pct_regime_A1,
-        'pct_regime_F4': pct_regime_F4,
-        'pct_regime_IN': pct_regime_A1,
-        'pct_regime_A3': pct_regime_A3,
-        'pct_regime_AF': pct_regime_AF,
-        'pct_regime_C1': pct_regime_C1,
-        'pct_regime_F5': pct_regime_F5,
-        'pct_regime_OTHERS': pct_regime_OTHERS,
-        'pct_transport_carretero': pct_transport_carretero,
-        'pct_transport_aereo': pct_transport_aereo,
-        'pct_transport_maritimo': pct_transport_maritimo,
-        'pct_transport_not_declared': pct_transport_not_declared,
-        'pct_port_NUEVO_LAREDO': pct_port_NUEVO_LAREDO,
-        'pct_port_COLOMBIA_NL': pct_port_COLOMBIA_NL,
-        'pct_port_MONTERREY_AIRPORT': pct_port_MONTERREY_AIRPORT,
-        'pct_port_MANZANILLO': pct_port_MANZANILLO,
-        'pct_port_PUEBLA': pct_port_PUEBLA,
-        'pct_port_AIFA_AIRPORT': pct_port_AIFA_AIRPORT,
-        'pct_port_NOGALES': pct_port_NOGALES,
-        'pct_port_ALTAMIRA': pct_port_ALTAMIRA,
-        'pct_port_AICM_AIRPORT': pct_port_AICM_AIRPORT,
-        'pct_port_LAZARO': pct_port_LAZARO,
-        'pct_port_VERACRUZ': pct_port_VERACRUZ,
-        'pct_port_TIJUANA': pct_port_TIJUANA,
-        'pct_port_GUAYMAS': pct_port_GUAYMAS,
-        'pct_port_OTHERS': pct_port_OTHERS,
-        'pct_hs_84': pct_hs_84,
-        'pct_hs_85': pct_hs_85,
-        'pct_hs_90': pct_hs_90,
-        'pct_hs_73': pct_hs_73,
-        'pct_hs_74': pct_hs_74,
-        'pct_hs_OTROS': pct_hs_OTROS,
-        'is_origin_usa': is_origin_usa,
-        'is_candidate_for_crossborder': is_candidate_for_crossborder,
-        'pct_incoterm_DAP': pct_incoterm_DAP,
-        'pct_incoterm_EXW': pct_incoterm_EXW,
-        'pct_incoterm_FCA': pct_incoterm_FCA,
-        'pct_incoterm_FOB': pct_incoterm_FOB,
-        'pct_incoterm_CIF': pct_incoterm_CIF,
-        'pct_incoterm_CFR': pct_incoterm_CFR,
-        'pct_incoterm_NOT_INFORMED': pct_incoterm_NOT_INFORMED,
-        'pct_incoterm_OTROS': pct_incoterm_OTROS,
-        'custom_brokers_used': custom_brokers_used,
-        'top_custom_broker_id': top_broker[0],
-        'pct_top_custom_broker_id': pct_top_broker,
-        'num_custom_brokers_used': num_brokers,
-        'pct_broker_3995': pct_broker_3995,
-        'pct_broker_3714': pct_broker_3714,
-        'pct_broker_1720': pct_broker_1720,
-        'pct_origin_TAIWAN': pct_origin_TAIWAN,
-        'pct_origin_VIETNAM': pct_origin_VIETNAM,
-        'pct_origin_CHINA': pct_origin_CHINA,
-        'pct_origin_USA': pct_origin_USA,
-        'pct_origin_GERMANY': pct_origin_GERMANY,
-        'pct_origin_DENMARK': pct_origin_DENMARK,
-        'pct_origin_FRANCE': pct_origin_FRANCE,
-        'pct_origin_OTROS': pct_origin_OTROS,
-        'last_import_date': last_date,
-        'first_import_date': first_date,
-        'total_weight_kg': total_weight,
-        'avg_weight_per_shipment': avg_weight,
-        'business_opportunity_score': business_opportunity_score,
-        'crossborder_potential': crossborder_potential,
-        'ocean_freight_potential': ocean_freight_potential,
-        'supply_chain_potential': supply_chain_potential
-    }
+    return {name: values[name] for name in SUMMARY_COLUMN_NAMES}
+
+# Multi-row upsert pieces generated from the summary registry
+SUMMARY_UPSERT_PREFIX = f"INSERT INTO import_summaries ({', '.join(SUMMARY_COLUMN_NAMES)}) VALUES "
+SUMMARY_UPSERT_ROW = "(" + ", ".join(["%s"] * len(SUMMARY_COLUMN_NAMES)) + ")"
+# updated_at is assigned first, while the other columns still hold their old values, and
+# only moves when one of them changes; unchanged rows then count 0 affected rows
+SUMMARY_UPSERT_SUFFIX = " ON DUPLICATE KEY UPDATE " + ", ".join(
+    ["updated_at = IF(" + " AND ".join(f"{column} <=> VALUES({column})" for column in SUMMARY_COLUMN_NAMES[1:])
+     + ", updated_at, CURRENT_TIMESTAMP)"]
+    + [f"{column} = VALUES({column})" for column in SUMMARY_COLUMN_NAMES[1:]]
+)
+
+async def upsert_summaries_async(summaries: List[Dict]) -> int:
+    """
+    Insert or update summaries with multi-row INSERT ... ON DUPLICATE KEY UPDATE,
+    SUMMARY_UPSERT_BATCH_SIZE rows per statement. Re-running with the same
+    summaries leaves the table (including updated_at) unchanged. Returns the number
+    of summaries written.
+    """
+    written = 0
+    for i in range(0, len(summaries), SUMMARY_UPSERT_BATCH_SIZE):
+        batch = summaries[i:i + SUMMARY_UPSERT_BATCH_SIZE]
+        try:
+            written += await upsert_summary_batch_async(batch)
+        except Exception as e:
+            if len(batch) == 1:
+                logger.error(f"Error upserting summary for {batch[0]['importer_name']}: {e}")
+                continue
+            # Retry row by row so one bad summary doesn't drop the whole batch
+            logger.error(f"Error upserting batch of {len(batch)} summaries, retrying individually: {e}")
+            for summary in batch:
+                try:
+                    written += await upsert_summary_batch_async([summary])
+                except Exception as row_error:
+                    logger.error(f"Error upserting summary for {summary['importer_name']}: {row_error}")
+    return written
+
+async def upsert_summary_batch_async(batch: List[Dict]) -> int:
+    """
+    Write one batch of summaries, and the importers' last_summary_at, in one
+    transaction. The importers that already have a summary are locked with
+    SELECT ... FOR UPDATE (which also blocks concurrent inserts of the missing
+    ones), so the inserted count is exact; the updated count comes from the affected
+    rows of the upsert (MySQL counts 1 per inserted row, 2 per changed row and 0 per
+    unchanged row).
+    """
+    names = [summary['importer_name'] for summary in batch]
+    values = []
+    for summary in batch:
+        values.extend(summary_row(summary))
+    names_sql = ", ".join(["%s"] * len(names))
+    
+    async with db_transaction() as cursor:
+        await cursor.execute(
+            f"SELECT importer_name FROM import_summaries WHERE importer_name IN ({names_sql}) FOR UPDATE",
+            tuple(names)
+        )
+        # Matched with the column collation, like the upsert's unique key
+        inserted = len(names) - len(await cursor.fetchall())
+        await cursor.execute(
+            SUMMARY_UPSERT_PREFIX + ", ".join([SUMMARY_UPSERT_ROW] * len(batch)) + SUMMARY_UPSERT_SUFFIX,
+            values
+        )
+        updated = (cursor.rowcount - inserted) // 2
+        # Re-writing unchanged summaries keeps the change counter (and cached exports) as they are
+        if inserted or updated:
+            await record_table_write_async("import_summaries", cursor, row_delta=inserted)
+        await cursor.execute(
+            f"UPDATE importers SET last_summary_at = CURRENT_TIMESTAMP WHERE importer_name IN ({names_sql})",
+            tuple(names)
+        )
+    logger.debug(f"Summary batch of {len(batch)}: {inserted} inserted, {updated} updated")
+    
+    if inserted or updated:
+        summary_cache.record_own_write()
+    for name in names:
+        summary_cache.invalidate(name)
+    return len(batch)
 
 async def insert_summary_async(summary: Dict) -> bool:
-    """Insert summary into database asynchronously"""
+    """Insert or update one summary asynchronously"""
+    return await upsert_summaries_async([summary]) == 1
+
+def insert_summary(summary: Dict) -> bool:
+    """Insert summary into database (sync wrapper)"""
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        return loop.run_until_complete(insert_summary_async(summary))
+    finally:
+        loop.close()
+
+# Monthly summary aggregates
+def parse_record_date(value: Any) -> Optional[date]:
+    """Parse a dispatch date as stored by MySQL (date, datetime or ISO string)"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    try:
+        return date.fromisoformat(str(value)[:10])
+    except (TypeError, ValueError):
+        return None
+
+def month_bounds(day: date) -> tuple:
+    """First and last day of the month containing `day`"""
+    first_day = day.replace(day=1)
+    return first_day, first_day + relativedelta(months=1) - timedelta(days=1)
+
+def serialize_monthly_aggregate(importer_name: str, month: date, aggregate: Dict[str, Any]) -> tuple:
+    counters = {dimension: aggregate[dimension] for dimension in SUMMARY_COUNTER_DIMENSIONS}
+    counters["version"] = SUMMARY_AGGREGATE_VERSION
+    return (
+        importer_name, month, aggregate["record_count"],
+        round(aggregate["freight_sum"], 2), round(aggregate["weight_sum"], 2),
+        aggregate["first_date"], aggregate["last_date"], aggregate["rfc"],
+        json.dumps(counters)
+    )
+
+def deserialize_monthly_aggregate(row: tuple) -> Optional[Dict[str, Any]]:
+    """Load a stored aggregate (None if it was written with another aggregate layout)"""
+    record_count, freight_sum, weight_sum, first_date, last_date, rfc, counters_json = row
+    counters = json.loads(counters_json)
+    if counters.pop("version", None) != SUMMARY_AGGREGATE_VERSION:
+        return None
+    aggregate = {
+        "record_count": record_count,
+        "freight_sum": float(freight_sum),
+        "weight_sum": float(weight_sum),
+        "rfc": rfc or "",
+        "first_date": first_date,
+        "last_date": last_date
+    }
+    aggregate.update(counters)
+    return aggregate
+
+async def refresh_monthly_aggregates_async(importer_name: str, start_date: date, end_date: date):
+    """Recompute an importer's monthly aggregates for every month overlapping start_date..end_date"""
+    first_month = month_bounds(start_date)[0]
+    last_day = month_bounds(end_date)[1]
+    records = await get_importer_records_async(importer_name, first_month.isoformat(), last_day.isoformat())
+    
+    records_by_month: Dict[date, List[tuple]] = {}
+    for record in records:
+        if record[1]:
+            records_by_month.setdefault(month_bounds(record[1])[0], []).append(record)
+    
+    months = sorted(records_by_month)
+    aggregates = await asyncio.gather(*(aggregate_records_async(records_by_month[month]) for month in months))
+    rows = [
+        serialize_monthly_aggregate(importer_name, month, aggregate)
+        for month, aggregate in zip(months, aggregates)
+    ]
+    
+    async with db_transaction() as cursor:
+        await cursor.execute(
+            "DELETE FROM importer_monthly_aggregates WHERE importer_name = %s AND month BETWEEN %s AND %s",
+            (importer_name, first_month, last_day)
+        )
+        if rows:
+            await cursor.executemany("""
+            INSERT INTO importer_monthly_aggregates (
+                importer_name, month, record_count, freight_usd_sum, weight_kg_sum,
+                first_date, last_date, rfc, counters_json
+            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+            """, rows)
+    logger.info(f"Refreshed {len(rows)} monthly aggregates for {importer_name} ({first_month} to {last_day})")
+
+async def backfill_monthly_aggregates_async():
+    """
+    Build monthly aggregates for every importer from the existing import records.
+    Importers whose rebuild fails stay marked stale and are rebuilt on their next summary.
+    """
+    results = await execute_query_async(
+        "SELECT importer_name, MIN(dispatch_date), MAX(dispatch_date) FROM import_records "
+        "WHERE importer_name IS NOT NULL AND dispatch_date IS NOT NULL GROUP BY importer_name"
+    )
+    await begin_aggregate_writes_async([row[0] for row in results or ()])
+    for importer_name, first_date, last_date in results or ():
+        try:
+            await refresh_monthly_aggregates_async(importer_name, first_date, last_date)
+            await finish_aggregate_writes_async([importer_name])
+        except Exception as e:
+            logger.error(f"Error backfilling monthly aggregates for {importer_name}: {e}")
+    logger.info(f"Backfilled monthly aggregates for {len(results or ())} importers")
+
+async def begin_aggregate_writes_async(importer_names: List[str]):
+    """
+    Count a pending change to these importers' records in importers.aggregates_stale,
+    before the records are written. The matching finish_aggregate_writes_async call
+    comes after their monthly aggregates are refreshed, so a write that fails half
+    way leaves the counter raised and the next summary rebuilds the aggregates.
+    """
+    if not importer_names:
+        return
+    await execute_query_async(
+        "INSERT INTO importers (importer_name, aggregates_stale) VALUES "
+        + ", ".join(["(%s, 1)"] * len(importer_names))
+        + " ON DUPLICATE KEY UPDATE aggregates_stale = aggregates_stale + 1",
+        tuple(importer_names)
+    )
+
+async def finish_aggregate_writes_async(importer_names: List[str]):
+    """Take one completed change off the importers' aggregates_stale counters"""
+    if not importer_names:
+        return
+    await execute_query_async(
+        "UPDATE importers SET aggregates_stale = GREATEST(aggregates_stale - 1, 0) "
+        f"WHERE importer_name IN ({', '.join(['%s'] * len(importer_names))})",
+        tuple(importer_names)
+    )
+
+async def rebuild_stale_aggregates_async(importer_name: str, first_month: date, last_month: date):
+    """
+    Rebuild an importer's monthly aggregates over its whole history (at least
+    first_month..last_month) and reset its aggregates_stale counter.
+    
+    Imports raise and lower the counter while holding the importer's import lock, so
+    under that lock it only counts writes that failed before refreshing their
+    aggregates. The reset is a compare-and-set against the value read here, so a
+    write outside the lock (a backfill) that raised it meanwhile keeps it raised.
+    """
+    async with importer_import_lock(importer_name):
+        catalog_rows = await execute_query_async(
+            "SELECT aggregates_stale, first_dispatch_date, last_dispatch_date FROM importers WHERE importer_name = %s",
+            (importer_name,)
+        )
+        stale, first_date, last_date = catalog_rows[0] if catalog_rows else (0, None, None)
+        rebuild_start = min(first_month, parse_record_date(first_date) or first_month)
+        rebuild_end = max(last_month, parse_record_date(last_date) or last_month)
+        logger.warning(f"Monthly aggregates of {importer_name} are stale; rebuilding {rebuild_start} to {rebuild_end}")
+        await refresh_monthly_aggregates_async(importer_name, rebuild_start, rebuild_end)
+        if stale:
+            await execute_query_async(
+                "UPDATE importers SET aggregates_stale = 0 WHERE importer_name = %s AND aggregates_stale = %s",
+                (importer_name, stale)
+            )
+
+async def get_monthly_aggregates_async(importer_name: str, first_month: date, last_month: date) -> tuple:
+    """Stored monthly aggregates of an importer, and whether every stored row was readable"""
+    monthly_rows = await execute_query_async(
+        "SELECT record_count, freight_usd_sum, weight_kg_sum, first_date, last_date, rfc, counters_json "
+        "FROM importer_monthly_aggregates WHERE importer_name = %s AND month BETWEEN %s AND %s ORDER BY month",
+        (importer_name, first_month, last_month)
+    )
+    monthly = [aggregate for aggregate in map(deserialize_monthly_aggregate, monthly_rows or ()) if aggregate]
+    return monthly, len(monthly) == len(monthly_rows or ())
+
+async def get_window_aggregate_async(importer_name: str, start_date: str, end_date: str) -> Dict[str, Any]:
+    """
+    Build the summary aggregate of an importer's records between start_date and
+    end_date. Whole calendar months come from importer_monthly_aggregates; only
+    the partial months at either edge of the window (at most two) are read from
+    import_records.
+    """
+    start = parse_record_date(start_date)
+    end = parse_record_date(end_date)
+    # First and last whole month inside the window
+    first_full = start if start.day == 1 else month_bounds(start)[1] + timedelta(days=1)
+    last_full = month_bounds(end)[0] - timedelta(days=1) if end != month_bounds(end)[1] else end
+    
+    if not SUMMARY_MONTHLY_AGGREGATES or first_full > last_full:
+        return await aggregate_records_async(await get_importer_records_async(importer_name, start_date, end_date))
+    
+    # Primary key lookup: a raised counter means a record write never got its aggregates refreshed
+    catalog_rows = await execute_query_async(
+        "SELECT aggregates_stale FROM importers WHERE importer_name = %s",
+        (importer_name,)
+    )
+    stale = catalog_rows[0][0] if catalog_rows else 0
+    monthly, readable = await get_monthly_aggregates_async(importer_name, first_full, last_full)
+    if stale or not readable:
+        await rebuild_stale_aggregates_async(importer_name, first_full, last_full)
+        monthly, _ = await get_monthly_aggregates_async(importer_name, first_full, last_full)
+    
+    head = tail = empty_summary_aggregate()
+    if start < first_full:
+        head_end = first_full - timedelta(days=1)
+        head = await aggregate_records_async(
+            await get_importer_records_async(importer_name, start.isoformat(), head_end.isoformat())
+        )
+    if end > last_full:
+        tail_start = last_full + timedelta(days=1)
+        tail = await aggregate_records_async(
+            await get_importer_records_async(importer_name, tail_start.isoformat(), end.isoformat())
+        )
+    return merge_summary_aggregates([head] + monthly + [tail])
+
+@traced("summary")
+async def calculate_window_summary_async(importer_name: str, start_date: str, end_date: str) -> Optional[Dict]:
+    """Calculate the KPIs of an importer over a date window"""
+    set_span_attrs(importer=importer_name)
+    started = time.perf_counter()
+    aggregate = await get_window_aggregate_async(importer_name, start_date, end_date)
+    summary = finalize_summary(importer_name, aggregate)
+    summary_compute_latency.observe(time.perf_counter() - started)
+    return summary
+
+# Background task functions
+async def run_summarization_background(since: str, clear_existing: bool):
+    """Run summarization in background"""
     try:
-        await execute_query_async("""
-        INSERT INTO import_summaries (
-            importer_name, rfc, total_pedimentos_last_6_months, total_freight_usd_value,
-            avg_freight_usd_per_shipment, customs_offices_used, pct_shipments_key_locations,
-            pct_regime_A1, pct_regime_F4, pct_regime_IN, pct_regime_A3, pct_regime_AF, pct_regime_C1, pct_regime_F5, pct_regime_OTHERS,
-            pct_transport_carretero, pct_transport_aereo, pct_transport_maritimo, pct_transport_not_declared,
-            pct_port_NUEVO_LAREDO, pct_port_COLOMBIA_NL, pct_port_MONTERREY_AIRPORT, pct_port_MANZANILLO,
-            pct_port_PUEBLA, pct_port_AIFA_AIRPORT, pct_port_NOGALES, pct_port_ALTAMIRA, pct_port_AICM_AIRPORT, pct_port_LAZARO, pct_port_VERACRUZ, pct_port_TIJUANA, pct_port_GUAYMAS, pct_port_OTHERS, pct_hs_84, pct_hs_85, pct_hs_90, pct_hs_73, pct_hs_74,
-            pct_hs_OTROS, is_origin_usa, is_candidate_for_crossborder, pct_incoterm_DAP, pct_incoterm_EXW,
-            pct_incoterm_FCA, pct_incoterm_FOB, pct_incoterm_CIF, pct_incoterm_CFR, pct_incoterm_NOT_INFORMED, pct_incoterm_OTROS, custom_brokers_used, top_custom_broker_id,
-            pct_top_custom_broker_id, num_custom_brokers_used, pct_broker_3995, pct_broker_3714, pct_broker_1720, pct_origin_TAIWAN, pct_origin_VIETNAM, pct_origin_CHINA, pct_origin_USA,
-            pct_origin_GERMANY, pct_origin_DENMARK, pct_origin_FRANCE, pct_origin_OTROS,
-            last_import_date, first_import_date, total_weight_kg, avg_weight_per_shipment,
-            business_opportunity_score, crossborder_potential, ocean_freight_potential, supply_chain_potential
-        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        ON DUPLICATE KEY UPDATE
-            rfc = VALUES(rfc),
-            total_pedimentos_last_6_months = VALUES(total_pedimentos_last_6_months),
-            total_freight_usd_value = VALUES(total_freight_usd_value),
-            avg_freight_usd_per_shipment = VALUES(avg_freight_usd_per_shipment),
-            customs_offices_used = VALUES(customs_offices_used),
-            pct_shipments_key_locations = VALUES(pct_shipments_key_locations),
-            pct_regime_A1 = VALUES(pct_regime_A1),
-            pct_regime_F4 = VALUES(pct_regime_F4),
-            pct_regime_IN = VALUES(pct_regime_IN),
-            pct_regime_A3 = VALUES(pct_regime_A3),
-            pct_regime_AF = VALUES(pct_regime_AF),
-            pct_regime_C1 = VALUES(pct_regime_C1),
-            pct_regime_F5 = VALUES(pct_regime_F5),
-            pct_regime_OTHERS = VALUES(pct_regime_OTHERS),
-            pct_transport_carretero = VALUES(pct_transport_carretero),
-            pct_transport_aereo = VALUES(pct_transport_aereo),
-            pct_transport_maritimo = VALUES(pct_transport_maritimo),
-            pct_transport_not_declared = VALUES(pct_transport_not_declared),
-            pct_port_NUEVO_LAREDO = VALUES(pct_port_NUEVO_LAREDO),
-            pct_port_COLOMBIA_NL = VALUES(pct_port_COLOMBIA_NL),
-            pct_port_MONTERREY_AIRPORT = VALUES(pct_port_MONTERREY_AIRPORT),
-            pct_port_MANZANILLO = VALUES(pct_port_MANZANILLO),
-            pct_port_PUEBLA = VALUES(pct_port_PUEBLA),
-            pct_port_AIFA_AIRPORT = VALUES(pct_port_AIFA_AIRPORT),
-            pct_port_NOGALES = VALUES(pct_port_NOGALES),
-            pct_port_ALTAMIRA = VALUES(pct_port_ALTAMIRA),
-            pct_port_AICM_AIRPORT = VALUES(pct_port_AICM_AIRPORT),
-            pct_port_LAZARO = VALUES(pct_port_LAZARO),
-            pct_port_VERACRUZ = VALUES(pct_port_VERACRUZ),
-            pct_port_TIJUANA = VALUES(pct_port_TIJUANA),
-            pct_port_GUAYMAS = VALUES(pct_port_GUAYMAS),
-            pct_port_OTHERS = VALUES(pct_port_OTHERS),
-            pct_hs_84 = VALUES(pct_hs_84),
-            pct_hs_85 = VALUES(pct_hs_85),
-            pct_hs_90 = VALUES(pct_hs_90),
-            pct_hs_73 = VALUES(pct_hs_73),
-            pct_hs_74 = VALUES(pct_hs_74),
-            pct_hs_OTROS = VALUES(pct_hs_OTROS),
-            is_origin_usa = VALUES(is_origin_usa),
-            is_candidate_for_crossborder = VALUES(is_candidate_for_crossborder),
-            pct_incoterm_DAP = VALUES(pct_incoterm_DAP),
-            pct_incoterm_EXW = VALUES(pct_incoterm_EXW),
-            pct_incoterm_FCA = VALUES(pct_incoterm_FCA),
-            pct_incoterm_FOB = VALUES(pct_incoterm_FOB),
-            pct_incoterm_CIF = VALUES(pct_incoterm_CIF),
-            pct_incoterm_CFR = VALUES(pct_incoterm_CFR),
-            pct_incoterm_NOT_INFORMED = VALUES(pct_incoterm_NOT_INFORMED),
-            pct_incoterm_OTROS = VALUES(pct_incoterm_OTROS),
-            custom_brokers_used = VALUES(custom_brokers_used),
-            top_custom_broker_id = VALUES(top_custom_broker_id),
-            pct_top_custom_broker_id = VALUES(pct_top_custom_broker_id),
-            num_custom_brokers_used = VALUES(num_custom_brokers_used),
-            pct_broker_3995 = VALUES(pct_broker_3995),
-            pct_broker_3714 = VALUES(pct_broker_3714),
-            pct_broker_1720 = VALUES(pct_broker_1720),
-            pct_origin_TAIWAN = VALUES(pct_origin_TAIWAN),
-            pct_origin_VIETNAM = VALUES(pct_origin_VIETNAM),
-            pct_origin_CHINA = VALUES(pct_origin_CHINA),
-            pct_origin_USA = VALUES(pct_origin_USA),
-            pct_origin_GERMANY = VALUES(pct_origin_GERMANY),
-            pct_origin_DENMARK = VALUES(pct_origin_DENMARK),
-            pct_origin_FRANCE = VALUES(pct_origin_FRANCE),
-            pct_origin_OTROS = VALUES(pct_origin_OTROS),
-            last_import_date = VALUES(last_import_date),
-            first_import_date = VALUES(first_import_date),
-            total_weight_kg = VALUES(total_weight_kg),
-            avg_weight_per_shipment = VALUES(avg_weight_per_shipment),
-            business_opportunity_score = VALUES(business_opportunity_score),
-            crossborder_potential = VALUES(crossborder_potential),
-            ocean_freight_potential = VALUES(ocean_freight_potential),
-            supply_chain_potential = VALUES(supply_chain_potential),
-            updated_at = CURRENT_TIMESTAMP
-        """, (
-            summary['importer_name'], summary['rfc'], summary['total_pedimentos_last_6_months'], 
-            summary['total_freight_usd_value'], summary['avg_freight_usd_per_shipment'], 
-            summary['customs_offices_used'], summary['pct_shipments_key_locations'],
-            summary['pct_regime_A1'], summary['pct_regime_F4'], summary['pct_regime_IN'], 
-            summary['pct_regime_A3'], summary['pct_regime_AF'], summary['pct_regime_C1'], summary['pct_regime_F5'], summary['pct_regime_OTHERS'],
-            summary['pct_transport_carretero'], summary['pct_transport_aereo'], 
-            summary['pct_transport_maritimo'], summary['pct_transport_not_declared'],
-            summary['pct_port_NUEVO_LAREDO'], summary['pct_port_COLOMBIA_NL'], 
-            summary['pct_port_MONTERREY_AIRPORT'], summary['pct_port_MANZANILLO'],
-            summary['pct_port_PUEBLA'], summary['pct_port_AIFA_AIRPORT'], summary['pct_port_NOGALES'], summary['pct_port_ALTAMIRA'], summary['pct_port_AICM_AIRPORT'], summary['pct_port_LAZARO'], summary['pct_port_VERACRUZ'], summary['pct_port_TIJUANA'], summary['pct_port_GUAYMAS'], summary['pct_port_OTHERS'], summary['pct_hs_84'], 
-            summary['pct_hs_85'], summary['pct_hs_90'], summary['pct_hs_73'], summary['pct_hs_74'],
-            summary['pct_hs_OTROS'], summary['is_origin_usa'], summary['is_candidate_for_crossborder'], 
-            summary['pct_incoterm_DAP'], summary['pct_incoterm_EXW'],
-            summary['pct_incoterm_FCA'], summary['pct_incoterm_FOB'], summary['pct_incoterm_CIF'], summary['pct_incoterm_CFR'], summary['pct_incoterm_NOT_INFORMED'], summary['pct_incoterm_OTROS'], summary['custom_brokers_used'], 
-            summary['top_custom_broker_id'], summary['pct_top_custom_broker_id'], 
-            summary['num_custom_brokers_used'], summary['pct_broker_3995'], summary['pct_broker_3714'], summary['pct_broker_1720'], summary['pct_origin_TAIWAN'], 
-            summary['pct_origin_VIETNAM'], summary['pct_origin_CHINA'], summary['pct_origin_USA'],
-            summary['pct_origin_GERMANY'], summary['pct_origin_DENMARK'], summary['pct_origin_FRANCE'], 
-            summary['pct_origin_OTROS'], summary['last_import_date'], summary['first_import_date'], 
-            summary['total_weight_kg'], summary['avg_weight_per_shipment'],
-            summary['business_opportunity_score'], summary['crossborder_potential'], 
-            summary['ocean_freight_potential'], summary['supply_chain_potential']
+        await run_summarization_internal_async(SummaryRequest(
+            since=since,
+            clear_existing=clear_existing
         ))
+        logger.info("Background summarization completed successfully")
+    except Exception as e:
+        logger.error(f"Background summarization failed: {e}")
+
+@traced("summarize")
+async def create_importer_summary_async(importer_name: str, start_date: str, end_date: str) -> Optional[Dict]:
+    """Create summary for a specific importer and return the summary data"""
+    set_span_attrs(importer=importer_name)
+    try:
+        (computed_at,) = (await execute_query_async("SELECT NOW(6)"))[0]
+        
+        # Calculate summary for this importer within the date range
+        summary = await calculate_window_summary_async(importer_name, start_date, end_date)
+        if summary:
+            logger.info(f"Summary calculated successfully for {importer_name}, broker fields: 3995={summary.get('pct_broker_3995', 'NOT_FOUND')}, 3714={summary.get('pct_broker_3714', 'NOT_FOUND')}, 1720={summary.get('pct_broker_1720', 'NOT_FOUND')}")
+            # Upsert replaces any previous summary of this importer in place
+            success = await insert_summary_reliable_async(summary)
+            if success:
+                await clear_dirty_importers_async(computed_at, [importer_name])
+                logger.info(f"Successfully created summary for importer: {importer_name}")
+                return summary
+            else:
+                logger.error(f"Failed to insert summary for importer: {importer_name}")
+                return None
+        
+        # Nothing in the window: drop the previous summary rather than leave it stale
+        await delete_importer_summary_async(importer_name)
+        await clear_dirty_importers_async(computed_at, [importer_name])
+        logger.warning(f"No records found for importer: {importer_name} in date range {start_date} to {end_date}")
+        return None
+    except Exception as e:
+        logger.error(f"Error creating summary for importer {importer_name}: {e}")
+        return None
+
+async def insert_summary_reliable_async(summary: Dict) -> bool:
+    """Insert or update one summary, logging the outcome"""
+    if await upsert_summaries_async([summary]) == 1:
+        logger.info(f"Successfully inserted summary for {summary['importer_name']}")
         return True
+    return False
+
+# Import job queue
+job_worker_tasks: List[asyncio.Task] = []
+job_wakeup = asyncio.Event()
+
+async def enqueue_import_job_async(request: ImportRequest) -> int:
+    """Store an import request as a queued job and return its id"""
+    async with acquire_db_connection() as conn:
+        async with conn.cursor() as cursor:
+            await cursor.execute(
+                "INSERT INTO import_jobs (status, request_json, progress_json) VALUES ('queued', %s, %s)",
+                (request.model_dump_json(), json.dumps(ImportProgress().to_dict()))
+            )
+            job_id = cursor.lastrowid
+    job_wakeup.set()
+    return job_id
+
+async def claim_next_job_async(worker_id: str) -> Optional[tuple]:
+    """
+    Atomically mark the oldest queued job as running for this worker. Returns
+    (job id, request JSON, claim token); the random claim token identifies this claim,
+    since worker ids repeat across container restarts (same hostname and pid).
+    """
+    claim_token = uuid.uuid4().hex
+    claimed = await execute_query_async(
+        "UPDATE import_jobs SET status = 'running', worker_id = %s, claim_token = %s, started_at = NOW(), "
+        "attempts = attempts + 1 WHERE status = 'queued' ORDER BY id LIMIT 1",
+        (worker_id, claim_token)
+    )
+    if not claimed:
+        return None
+    
+    rows = await execute_query_async(
+        "SELECT id, request_json FROM import_jobs WHERE claim_token = %s",
+        (claim_token,)
+    )
+    return (*rows[0], claim_token) if rows else None
+
+async def requeue_stale_jobs_async():
+    """Put back running jobs whose worker stopped reporting progress (e.g. a killed process)"""
+    abandoned = await execute_query_async(
+        "UPDATE import_jobs SET status = 'failed', error = 'Worker stopped responding too many times', finished_at = NOW() "
+        "WHERE status = 'running' AND updated_at < NOW() - INTERVAL %s SECOND AND attempts >= %s",
+        (JOB_STALE_SECONDS, JOB_MAX_ATTEMPTS)
+    )
+    requeued = await execute_query_async(
+        "UPDATE import_jobs SET status = 'queued', worker_id = NULL, claim_token = NULL "
+        "WHERE status = 'running' AND updated_at < NOW() - INTERVAL %s SECOND",
+        (JOB_STALE_SECONDS,)
+    )
+    if abandoned or requeued:
+        logger.warning(f"Requeued {requeued} and failed {abandoned} stale import jobs")
+
+async def update_job_progress_async(job_id: int, claim_token: str, progress: ImportProgress) -> bool:
+    """
+    Persist job progress; also serves as the heartbeat checked by requeue_stale_jobs_async.
+    Returns False once the claim is lost (the job was requeued and claimed again).
+    """
+    updated = await execute_query_async(
+        "UPDATE import_jobs SET progress_json = %s, updated_at = CURRENT_TIMESTAMP "
+        "WHERE id = %s AND claim_token = %s AND status = 'running'",
+        (json.dumps(progress.to_dict()), job_id, claim_token)
+    )
+    if updated:
+        return True
+    # 0 rows also means "nothing changed" (same progress within the same second)
+    rows = await execute_query_async(
+        "SELECT 1 FROM import_jobs WHERE id = %s AND claim_token = %s AND status = 'running'",
+        (job_id, claim_token)
+    )
+    return bool(rows)
+
+async def run_import_job_async(job_id: int, request_json: str, claim_token: str):
+    """
+    Run one claimed job and store its outcome. The import is stopped as soon as a
+    heartbeat finds the claim lost, and its outcome is then discarded: the job belongs
+    to the worker that claimed it again.
+    """
+    progress = ImportProgress()
+    claim_lost = False
+    
+    async def report_progress(import_task: asyncio.Task):
+        nonlocal claim_lost
+        while True:
+            await asyncio.sleep(1)
+            try:
+                with untraced():
+                    if not await update_job_progress_async(job_id, claim_token, progress):
+                        claim_lost = True
+                        import_task.cancel()
+                        return
+            except Exception as e:
+                logger.warning(f"Could not update progress of job {job_id}: {e}")
+    
+    response = None
+    error = None
+    try:
+        request = ImportRequest.model_validate_json(request_json)
+        import_task = asyncio.create_task(run_import_async(request, progress))
+        reporter = asyncio.create_task(report_progress(import_task))
+        try:
+            response = await import_task
+        except asyncio.CancelledError:
+            if not claim_lost:
+                raise
+        finally:
+            reporter.cancel()
     except Exception as e:
-        logger.error(f"Error inserting summary for {summary['importer_name']}: {e}")
+        error = f"Job failed: {str(e)}"
+    if claim_lost:
+        logger.warning(f"Import job {job_id} was requeued and claimed by another worker; stopped this run")
+        return
+    
+    if response is not None:
+        error = response.error
+    finished = await execute_query_async(
+        "UPDATE import_jobs SET status = %s, progress_json = %s, result_json = %s, error = %s, finished_at = NOW() "
+        "WHERE id = %s AND claim_token = %s AND status = 'running'",
+        (
+            "succeeded" if response is not None and response.success else "failed",
+            json.dumps(progress.to_dict()),
+            response.model_dump_json() if response is not None else None,
+            error,
+            job_id,
+            claim_token
+        )
+    )
+    if not finished:
+        logger.warning(f"Import job {job_id} was requeued and claimed by another worker; discarded this run's result")
+        return
+    logger.info(f"Import job {job_id} finished in {progress.stage_timings}")
+
+async def job_worker_loop(worker_id: str):
+    """Claim and run queued import jobs until cancelled"""
+    last_recovery = 0.0
+    while True:
+        try:
+            # Idle polls run every JOB_POLL_INTERVAL_SECONDS per worker; keep them out of the trace log
+            with untraced():
+                if time.monotonic() - last_recovery > JOB_STALE_SECONDS / 2:
+                    await requeue_stale_jobs_async()
+                    last_recovery = time.monotonic()
+                
+                job = await claim_next_job_async(worker_id)
+            if job is None:
+                job_wakeup.clear()
+                try:
+                    await asyncio.wait_for(job_wakeup.wait(), timeout=JOB_POLL_INTERVAL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            
+            job_id, request_json, claim_token = job
+            logger.info(f"Worker {worker_id} running import job {job_id}")
+            await run_import_job_async(job_id, request_json, claim_token)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Job worker {worker_id} error: {e}")
+            await asyncio.sleep(JOB_POLL_INTERVAL_SECONDS)
+
+async def start_job_workers():
+    """Start the import job worker coroutines of this process"""
+    worker_prefix = f"{socket.gethostname()}:{os.getpid()}"
+    for n in range(JOB_WORKERS):
+        job_worker_tasks.append(asyncio.create_task(job_worker_loop(f"{worker_prefix}:{n}")))
+    logger.info(f"Started {JOB_WORKERS} import job workers")
+
+async def stop_job_workers():
+    """Cancel the worker coroutines; their running jobs are requeued once stale"""
+    for task in job_worker_tasks:
+        task.cancel()
+    await asyncio.gather(*job_worker_tasks, return_exceptions=True)
+    job_worker_tasks.clear()
+
+# Export cache helpers
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header value against an ETag"""
+    if not if_none_match:
         return False
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    return "*" in candidates or any(value.removeprefix("W/") == etag for value in candidates)
 
-def insert_summary(summary: Dict) -> bool:
-    """Insert summary into database (sync wrapper)"""
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
+def touch_export_file(path: str):
+    """Mark an export file as recently used for LRU eviction"""
     try:
-        return loop.run_until_complete(insert_summary_async(summary))
-    finally:
-        loop.close()
+        os.utime(path, None)
+    except OSError:
+        pass
 
-# Background task functions
-async def run_summarization_background(since: str, clear_existing: bool):
-    """Run summarization in background"""
+def export_file_response(path: str, filename: str, export: str, cache: str, headers: Optional[Dict] = None) -> FileResponse:
+    """Serve an export file, counting its size in export_bytes_total"""
     try:
-        await run_summarization_internal_async(SummaryRequest(
-            since=since,
-            clear_existing=clear_existing
-        ))
-        logger.info("Background summarization completed successfully")
-    except Exception as e:
-        logger.error(f"Background summarization failed: {e}")
+        export_bytes_total.inc(os.path.getsize(path), export, cache)
+    except OSError:
+        pass
+    return FileResponse(path=path, filename=filename, media_type='text/csv', headers=headers)
 
-async def process_importer_summary(importer: str, start_date: str, end_date: str) -> bool:
-    """Process summary for a single importer"""
+def enforce_export_cache_limit(keep_path: Optional[str] = None):
+    """
+    Evict least recently used files from the exports directory until it fits the size
+    cap. Files used in the last EXPORT_EVICT_MIN_AGE_SECONDS are skipped: a cache hit
+    touches its file before returning the FileResponse, which opens it only later.
+    """
+    min_age_cutoff = time.time() - EXPORT_EVICT_MIN_AGE_SECONDS
     try:
-        records = await get_importer_records_async(importer, start_date, end_date)
-        if records:
-            summary = calculate_summary(importer, records)
-            if summary:
-                return await insert_summary_async(summary)
-        return False
-    except Exception as e:
-        logger.error(f"Error processing summary for {importer}: {e}")
-        return False
+        entries = []
+        for entry in os.scandir(EXPORTS_DIR):
+            if entry.is_file() and not entry.name.endswith('.tmp'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+    except FileNotFoundError:
+        return
+    
+    total_size = sum(size for _, size, _ in entries)
+    for mtime, size, path in sorted(entries):
+        if total_size <= EXPORT_CACHE_MAX_BYTES or mtime > min_age_cutoff:
+            break
+        if keep_path and os.path.abspath(path) == os.path.abspath(keep_path):
+            continue
+        try:
+            os.remove(path)
+            total_size -= size
+            logger.info(f"Evicted export artifact {path} ({size} bytes)")
+        except OSError as e:
+            logger.warning(f"Could not evict export artifact {path}: {e}")
 
-async def create_importer_summary_async(importer_name: str, start_date: str, end_date: str) -> Optional[Dict]:
-    """Create summary for a specific importer and return the summary data"""
-    try:
-        # Delete existing summary for this importer first
-        await delete_importer_summary_async(importer_name)
-        logger.info(f"Deleted existing summary for importer: {importer_name}")
-        
-        # Get records for this importer within the date range
-        records = await get_importer_records_async(importer_name, start_date, end_date)
-        
-        if records:
-            # Calculate summary
-            logger.info(f"About to call calculate_summary for {importer_name} with {len(records)} records")
-            summary = calculate_summary(importer_name, records)
-            if summary:
-                logger.info(f"Summary calculated successfully for {importer_name}, broker fields: 3995={summary.get('pct_broker_3995', 'NOT_FOUND')}, 3714={summary.get('pct_broker_3714', 'NOT_FOUND')}, 1720={summary.get('pct_broker_1720', 'NOT_FOUND')}")
-                # Insert the new summary using a more reliable method
-                success = await insert_summary_reliable_async(summary)
-                if success:
-                    logger.info(f"Successfully created summary for importer: {importer_name}")
-                    return summary
-                else:
-                    logger.error(f"Failed to insert summary for importer: {importer_name}")
-                    return None
-        
-        logger.warning(f"No records found for importer: {importer_name} in date range {start_date} to {end_date}")
-        return None
-    except Exception as e:
-        logger.error(f"Error creating summary for importer {importer_name}: {e}")
+# Keyset pagination helpers
+def encode_page_cursor(values: List[Any]) -> str:
+    """Encode the sort key of the last row of a page as an opaque cursor"""
+    raw = json.dumps(values, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def parse_cursor_id(value: Any) -> int:
+    """Cursor element holding a row id"""
+    # bool is an int subclass, but never a valid id
+    if type(value) is not int:
+        raise ValueError(f"expected an id, got {value!r}")
+    return value
+
+def parse_cursor_date(value: Any) -> Optional[date]:
+    """Cursor element holding an ISO date, or None for rows without one"""
+    if value is None:
         return None
+    if not isinstance(value, str):
+        raise ValueError(f"expected an ISO date, got {value!r}")
+    return date.fromisoformat(value)
 
-async def insert_summary_reliable_async(summary: Dict) -> bool:
-    """Insert summary into database with explicit column mapping"""
+def decode_page_cursor(cursor: str, parsers: tuple) -> List[Any]:
+    """
+    Decode a cursor produced by encode_page_cursor, converting each element with
+    the matching parser; a malformed cursor is a 400, never a database error
+    """
     try:
-        query = """
-        INSERT INTO import_summaries (
-            importer_name, rfc, total_pedimentos_last_6_months, total_freight_usd_value,
-            avg_freight_usd_per_shipment, customs_offices_used, pct_shipments_key_locations,
-            pct_regime_A1, pct_regime_F4, pct_regime_IN, pct_regime_A3, pct_regime_AF, pct_regime_C1, pct_regime_F5, pct_regime_OTHERS,
-            pct_transport_carretero, pct_transport_aereo, pct_transport_maritimo, pct_transport_not_declared,
-            pct_port_NUEVO_LAREDO, pct_port_COLOMBIA_NL, pct_port_MONTERREY_AIRPORT, pct_port_MANZANILLO,
-            pct_port_PUEBLA, pct_port_AIFA_AIRPORT, pct_port_NOGALES, pct_port_ALTAMIRA, pct_port_AICM_AIRPORT, pct_port_LAZARO, pct_port_VERACRUZ, pct_port_TIJUANA, pct_port_GUAYMAS, pct_port_OTHERS, pct_hs_84, pct_hs_85, pct_hs_90, pct_hs_73, pct_hs_74,
-            pct_hs_OTROS, is_origin_usa, is_candidate_for_crossborder, pct_incoterm_DAP, pct_incoterm_EXW,
-            pct_incoterm_FCA, pct_incoterm_FOB, pct_incoterm_CIF, pct_incoterm_CFR, pct_incoterm_NOT_INFORMED, pct_incoterm_OTROS, custom_brokers_used, top_custom_broker_id,
-            pct_top_custom_broker_id, num_custom_brokers_used, pct_broker_3995, pct_broker_3714, pct_broker_1720, pct_origin_TAIWAN, pct_origin_VIETNAM, 
-            pct_origin_CHINA, pct_origin_USA, pct_origin_GERMANY, pct_origin_DENMARK, pct_origin_FRANCE, 
-            pct_origin_OTROS, last_import_date, first_import_date, total_weight_kg, avg_weight_per_shipment,
-            business_opportunity_score, crossborder_potential, ocean_freight_potential, supply_chain_potential
-        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """
-        
-        # Extract values in the exact order they appear in the query
-        values = (
-            summary['importer_name'], summary['rfc'], summary['total_pedimentos_last_6_months'], 
-            summary['total_freight_usd_value'], summary['avg_freight_usd_per_shipment'], 
-            summary['customs_offices_used'], summary['pct_shipments_key_locations'],
-            summary['pct_regime_A1'], summary['pct_regime_F4'], summary['pct_regime_IN'], 
-            summary['pct_regime_A3'], summary['pct_regime_AF'], summary['pct_regime_C1'], summary['pct_regime_F5'], summary['pct_regime_OTHERS'],
-            summary['pct_transport_carretero'], summary['pct_transport_aereo'], 
-            summary['pct_transport_maritimo'], summary['pct_transport_not_declared'],
-            summary['pct_port_NUEVO_LAREDO'], summary['pct_port_COLOMBIA_NL'], 
-            summary['pct_port_MONTERREY_AIRPORT'], summary['pct_port_MANZANILLO'],
-            summary['pct_port_PUEBLA'], summary['pct_port_AIFA_AIRPORT'], summary['pct_port_NOGALES'], summary['pct_port_ALTAMIRA'], summary['pct_port_AICM_AIRPORT'], summary['pct_port_LAZARO'], summary['pct_port_VERACRUZ'], summary['pct_port_TIJUANA'], summary['pct_port_GUAYMAS'], summary['pct_port_OTHERS'], summary['pct_hs_84'], 
-            summary['pct_hs_85'], summary['pct_hs_90'], summary['pct_hs_73'], summary['pct_hs_74'],
-            summary['pct_hs_OTROS'], summary['is_origin_usa'], summary['is_candidate_for_crossborder'], 
-            summary['pct_incoterm_DAP'], summary['pct_incoterm_EXW'],
-            summary['pct_incoterm_FCA'], summary['pct_incoterm_FOB'], summary['pct_incoterm_CIF'], summary['pct_incoterm_CFR'], summary['pct_incoterm_NOT_INFORMED'], summary['pct_incoterm_OTROS'], summary['custom_brokers_used'], 
-            summary['top_custom_broker_id'], summary['pct_top_custom_broker_id'], 
-            summary['num_custom_brokers_used'], summary['pct_broker_3995'], summary['pct_broker_3714'], summary['pct_broker_1720'], summary['pct_origin_TAIWAN'], 
-            summary['pct_origin_VIETNAM'], summary['pct_origin_CHINA'], summary['pct_origin_USA'],
-            summary['pct_origin_GERMANY'], summary['pct_origin_DENMARK'], summary['pct_origin_FRANCE'], 
-            summary['pct_origin_OTROS'], summary['last_import_date'], summary['first_import_date'], 
-            summary['total_weight_kg'], summary['avg_weight_per_shipment'],
-            summary['business_opportunity_score'], summary['crossborder_potential'], 
-            summary['ocean_freight_potential'], summary['supply_chain_potential']
-        )
-        
-        await execute_query_async(query, values)
-        logger.info(f"Successfully inserted summary for {summary['importer_name']}")
-        return True
-    except Exception as e:
-        logger.error(f"Error inserting summary for {summary['importer_name']}: {e}")
-        return False
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(values, list) or len(values) != len(parsers):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    try:
+        return [parse(value) for parse, value in zip(parsers, values)]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def is_admin_token(token: Optional[str]) -> bool:
+    return bool(ADMIN_TOKEN) and token is not None and hmac.compare_digest(token, ADMIN_TOKEN)
+
+def require_admin(token: Optional[str]):
+    """Reject the request unless it carries the configured X-Admin-Token"""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Admin endpoints are disabled; set ADMIN_TOKEN to enable them")
+    if not is_admin_token(token):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+def span_breakdown(root: TraceSpan) -> Dict[str, float]:
+    """Milliseconds per span name below `root` (nested spans count in their parent too)"""
+    totals: Dict[str, float] = {}
+    for span in root.trace.spans:
+        if span is not root and span.duration is not None:
+            totals[span.name] = totals.get(span.name, 0.0) + span.duration
+    return {name: round(seconds * 1000, 2) for name, seconds in totals.items()}
+
+@app.middleware("http")
+async def observe_requests(request: Request, call_next):
+    """
+    Run each request as the root span of its trace, keep the slowest ones in the
+    slow request log, and profile the request when an admin sends ?profile=1 or
+    an X-Profile: 1 header.
+    """
+    profiler = None
+    if (request.query_params.get("profile") == "1" or request.headers.get("x-profile") == "1") \
+            and is_admin_token(request.headers.get("x-admin-token")):
+        profiler = SamplingProfiler(threading.get_ident(), PROFILE_INTERVAL_MS / 1000)
+        profiler.start()
+    
+    with trace_span("request", method=request.method, path=request.url.path) as span:
+        try:
+            response = await call_next(request)
+        finally:
+            if profiler:
+                profiler.stop()
+        span.attrs["status"] = response.status_code
+    
+    keep_slow = slow_requests.would_keep(span.duration)
+    stages_ms = span_breakdown(span) if keep_slow or profiler else None
+    if keep_slow:
+        slow_requests.add(span.duration, {
+            "method": request.method,
+            "path": request.url.path,
+            "query": str(request.query_params),
+            "status": response.status_code,
+            "duration_ms": round(span.duration * 1000, 2),
+            "stages_ms": stages_ms,
+            "trace_id": span.trace.trace_id,
+            "finished_at": time.time()
+        })
+    
+    if profiler:
+        profile_id = span.trace.trace_id
+        request_profiles[profile_id] = {
+            "method": request.method,
+            "path": request.url.path,
+            "duration_ms": round(span.duration * 1000, 2),
+            "stages_ms": stages_ms,
+            "samples": sum(profiler.samples.values()),
+            "interval_ms": PROFILE_INTERVAL_MS,
+            "created_at": datetime.now().isoformat(),
+            "collapsed": profiler.collapsed()
+        }
+        while len(request_profiles) > PROFILE_STORE_SIZE:
+            request_profiles.popitem(last=False)
+        response.headers["X-Profile-Id"] = profile_id
+        response.headers["X-Profile-Url"] = f"/admin/profiles/{profile_id}"
+    return response
 
 # API Endpoints
 @app.get("/")
@@ -1197,55 +3284,155 @@ async def root():
         "version": "1.0.0",
         "endpoints": {
             "import": "/import",
+            "import_job": "/jobs/import",
             "summarize": "/summarize",
             "status": "/status",
             "export_csv": "/export/csv",
             "export_importer": "/export/importer",
+            "records": "/records",
+            "summaries": "/summaries",
+            "top_summaries": "/summaries/top",
+            "importer_summary": "/summaries/{importer_name}",
+            "importer_search": "/importers/search",
+            "cache_stats": "/cache/stats",
+            "metrics": "/metrics",
+            "slow_requests": "/admin/slow-requests",
             "docs": "/docs"
         }
     }
 
+@app.get("/importers/search")
+async def search_importers(
+    q: str = Query(..., min_length=1, description="Beginning of, or approximate, importer name"),
+    limit: int = Query(10, ge=1, le=100, description="Maximum number of names to return")
+):
+    """Autocomplete importer names from the in-memory index of the importers catalog"""
+    await ensure_importer_name_index_async()
+    return {
+        "query": q,
+        "results": importer_name_index.search(q, limit),
+        "indexed_names": len(importer_name_index)
+    }
+
 @app.get("/status")
-async def get_status():
-    """Get current database status with optimized async queries"""
+async def get_status(
+    exact: bool = Query(False, description="Recount rows with COUNT(*) instead of using the maintained counters")
+):
+    """Get current database status from maintained counters, cached for a few seconds"""
     try:
-        # Check if tables exist
-        tables_result = await execute_query_async("""
-        SELECT TABLE_NAME 
-        FROM information_schema.TABLES 
-        WHERE TABLE_SCHEMA = %s AND TABLE_NAME IN ('import_records', 'import_summaries')
-        """, (DB_NAME,))
-        tables = [row[0] for row in tables_result] if tables_result else []
-        
-        records_count = 0
-        summaries_count = 0
-        last_updated = None
+        if not exact:
+            found, status = status_cache.get("status")
+            if found:
+                return status
         
-        if 'import_records' in tables:
+        generation = status_cache.generation
+        status = await compute_exact_status_async() if exact else await compute_status_async()
+        status_cache.set("status", status, generation)
+        return status
+    except Exception as e:
+        logger.error(f"Error getting status: {e}")
+        raise HTTPException(status_code=500, detail=f"Error getting status: {str(e)}")
+
+async def compute_status_async() -> StatusResponse:
+    """Build the status from the table_versions counters (a primary key lookup)"""
+    try:
+        stats = await get_table_stats_async(("import_records", "import_summaries"))
+    except pymysql.err.ProgrammingError as e:
+        # table_versions does not exist until create_database has run on this schema
+        if e.args and e.args[0] == ER_NO_SUCH_TABLE:
+            return await compute_exact_status_async()
+        raise
+    
+    last_write = stats["import_records"]["updated_at"]
+    return StatusResponse(
+        database_exists=True,
+        records_count=stats["import_records"]["row_count"],
+        summaries_count=stats["import_summaries"]["row_count"],
+        importers_count=await count_catalog_importers_async(),
+        last_updated=last_write.isoformat() if last_write else None
+    )
+
+async def count_catalog_importers_async() -> Optional[int]:
+    """Number of importers with records, from the importers catalog (None if it doesn't exist yet)"""
+    try:
+        result = await execute_query_async("SELECT COUNT(*) FROM importers WHERE row_count > 0")
+    except pymysql.err.ProgrammingError as e:
+        if e.args and e.args[0] == ER_NO_SUCH_TABLE:
+            return None
+        raise
+    return result[0][0] if result else 0
+
+async def compute_exact_status_async() -> StatusResponse:
+    """Build the status with full COUNT(*) scans and resynchronize the maintained counters"""
+    tables_result = await execute_query_async("""
+    SELECT TABLE_NAME 
+    FROM information_schema.TABLES 
+    WHERE TABLE_SCHEMA = %s AND TABLE_NAME IN ('import_records', 'import_summaries', 'table_versions')
+    """, (DB_NAME,))
+    tables = [row[0] for row in tables_result] if tables_result else []
+    
+    records_count = 0
+    summaries_count = 0
+    last_updated = None
+    
+    if 'import_records' in tables:
+        if 'table_versions' in tables:
+            records_count = await count_table_rows_async("import_records")
+        else:
             count_result = await execute_query_async("SELECT COUNT(*) FROM import_records")
             records_count = count_result[0][0] if count_result else 0
-            
-            date_result = await execute_query_async("SELECT MAX(created_at) FROM import_records")
-            if date_result and date_result[0][0]:
-                last_updated = date_result[0][0].isoformat()
         
-        if 'import_summaries' in tables:
+        date_result = await execute_query_async("SELECT MAX(created_at) FROM import_records")
+        if date_result and date_result[0][0]:
+            last_updated = date_result[0][0].isoformat()
+    
+    if 'import_summaries' in tables:
+        if 'table_versions' in tables:
+            summaries_count = await count_table_rows_async("import_summaries")
+        else:
             summary_result = await execute_query_async("SELECT COUNT(*) FROM import_summaries")
             summaries_count = summary_result[0][0] if summary_result else 0
-        
-        return StatusResponse(
-            database_exists=len(tables) > 0,
-            records_count=records_count,
-            summaries_count=summaries_count,
-            last_updated=last_updated
-        )
-    except Exception as e:
-        logger.error(f"Error getting status: {e}")
-        raise HTTPException(status_code=500, detail=f"Error getting status: {str(e)}")
+    
+    return StatusResponse(
+        database_exists='import_records' in tables or 'import_summaries' in tables,
+        records_count=records_count,
+        summaries_count=summaries_count,
+        importers_count=await count_catalog_importers_async(),
+        last_updated=last_updated
+    )
 
 @app.post("/import")
 async def import_records(request: ImportRequest, background_tasks: BackgroundTasks):
     """Import records from Logcomex API with optimized async operations"""
+    return await run_import_async(request)
+
+async def run_import_async(request: ImportRequest, progress: Optional["ImportProgress"] = None) -> ImportResponse:
+    """
+    Run an import, sharing the in-flight run when an identical request is already
+    being processed by this process (single-flight).
+    """
+    progress = progress or ImportProgress()
+    key = (request.importer_name, request.since, request.type, request.clear_existing, request.run_summarize, request.name_resolution)
+    
+    inflight = inflight_imports.get(key)
+    if inflight is None:
+        task = asyncio.create_task(import_pipeline_async(request, progress))
+        inflight_imports[key] = (task, progress)
+        task.add_done_callback(lambda _: inflight_imports.pop(key, None))
+        return await asyncio.shield(task)
+    
+    task, leader_progress = inflight
+    logger.info(f"Joining in-flight import for '{request.importer_name}'")
+    progress.start_stage("waiting_for_inflight_import")
+    try:
+        return await asyncio.shield(task)
+    finally:
+        progress.finish()
+        progress.copy_counters_from(leader_progress)
+
+@traced("import")
+async def import_pipeline_async(request: ImportRequest, progress: "ImportProgress") -> ImportResponse:
+    """Run the fetch, insert and summarize stages of an import, reporting into `progress`"""
     start_time = time.time()
     
     try:
@@ -1266,14 +3453,17 @@ async def import_records(request: ImportRequest, background_tasks: BackgroundTas
                 error=message
             )
         
-        # Calculate date range from 'since' parameter
-        try:
-            start_date, end_date = calculate_date_range(request.since)
-        except ValueError as e:
+        # Catch typos of known importers before a full API round trip
+        requested_name = request.importer_name
+        name_resolution = request.name_resolution or IMPORTER_NAME_RESOLUTION
+        if name_resolution != "off":
+            await ensure_importer_name_index_async()
+        importer_name, message, suggestions = resolve_importer_name(requested_name, name_resolution)
+        if message:
             execution_time = time.time() - start_time
             return ImportResponse(
                 success=False,
-                message=f"Invalid date parameter: {str(e)}",
+                message=message,
                 records_fetched=0,
                 records_inserted=0,
                 total_records=0,
@@ -1281,30 +3471,22 @@ async def import_records(request: ImportRequest, background_tasks: BackgroundTas
                 total_summaries=0,
                 summary_data=None,
                 execution_time=execution_time,
-                error=f"Date parameter error: {str(e)}. Please check your JSON parameters, especially the 'since' field."
+                error=message,
+                suggestions=suggestions
             )
+        resolved_importer_name = None
+        if importer_name != requested_name:
+            resolved_importer_name = importer_name
+            request = request.model_copy(update={"importer_name": importer_name})
         
-        logger.info(f"Processing import request for '{request.importer_name}' from {start_date} to {end_date}")
-        
-        # Create database if not exists
-        await create_database()
-        
-        # Clear existing data if requested (run in background)
-        if request.clear_existing:
-            await clear_existing_data_async()
-        else:
-            # Delete existing records for this specific importer
-            await delete_importer_records_async(request.importer_name)
-        
-        # Fetch data from API asynchronously
-        records = await fetch_data_from_api_async(start_date, end_date, request.importer_name, request.type)
-        
-        # Check if no records were found (importer name might be wrong)
-        if not records:
+        # Calculate date range from 'since' parameter
+        try:
+            start_date, end_date = calculate_date_range(request.since)
+        except ValueError as e:
             execution_time = time.time() - start_time
             return ImportResponse(
                 success=False,
-                message=f"No records found for importer '{request.importer_name}'. Please verify the importer name is correct and exists in the system.",
+                message=f"Invalid date parameter: {str(e)}",
                 records_fetched=0,
                 records_inserted=0,
                 total_records=0,
@@ -1312,44 +3494,92 @@ async def import_records(request: ImportRequest, background_tasks: BackgroundTas
                 total_summaries=0,
                 summary_data=None,
                 execution_time=execution_time,
-                error=f"No records found for importer '{request.importer_name}'. Please verify the importer name is correct and exists in the system."
+                error=f"Date parameter error: {str(e)}. Please check your JSON parameters, especially the 'since' field."
             )
         
-        # Insert records using bulk operations
-        inserted = await insert_records_bulk_async(records)
-        
-        # Get final count asynchronously
-        total_records = await execute_query_async("SELECT COUNT(*) FROM import_records")
-        total_records = total_records[0][0] if total_records else 0
-        
-        # Run summarization if requested (synchronously to include in response)
-        summary_data = None
-        summaries_created = 0
-        
-        if request.run_summarize:
-            logger.info(f"Creating summary for importer: {request.importer_name}")
-            summary_data = await create_importer_summary_async(request.importer_name, start_date, end_date)
-            if summary_data:
-                summaries_created = 1
-        
-        execution_time = time.time() - start_time
+        logger.info(f"Processing import request for '{request.importer_name}' from {start_date} to {end_date}")
+        set_span_attrs(importer=request.importer_name)
         
-        return ImportResponse(
-            success=True,
-            message=f"Successfully imported {inserted} records",
-            records_fetched=len(records),
-            records_inserted=inserted,
-            total_records=total_records,
-            summaries_created=summaries_created,
-            total_summaries=summaries_created,
-            summary_data=summary_data,
-            execution_time=execution_time
-        )
+        # Serialize imports of the same importer across processes
+        progress.start_stage("lock_wait")
+        async with importer_import_lock(request.importer_name):
+            # Create database if not exists
+            progress.start_stage("prepare")
+            await create_database()
+            
+            # Fetch everything before touching existing rows: a failed fetch raises and
+            # leaves the importer's current records in place
+            progress.start_stage("fetch")
+            records = await fetch_data_from_api_async(
+                start_date, end_date, request.importer_name, request.type,
+                on_page=progress.record_page
+            )
+            
+            # Check if no records were found (importer name might be wrong)
+            if not records:
+                progress.finish()
+                execution_time = time.time() - start_time
+                return ImportResponse(
+                    success=False,
+                    message=f"No records found for importer '{request.importer_name}'. Please verify the importer name is correct and exists in the system.",
+                    records_fetched=0,
+                    records_inserted=0,
+                    total_records=0,
+                    summaries_created=0,
+                    total_summaries=0,
+                    summary_data=None,
+                    execution_time=execution_time,
+                    error=f"No records found for importer '{request.importer_name}'. Please verify the importer name is correct and exists in the system.",
+                    resolved_importer_name=resolved_importer_name
+                )
+            
+            # Clear existing data if requested
+            progress.start_stage("insert")
+            if request.clear_existing:
+                await clear_existing_data_async()
+            else:
+                # Delete existing records for this specific importer
+                await delete_importer_records_async(request.importer_name)
+            
+            # Insert records using bulk operations
+            inserted = await insert_records_bulk_async(records)
+            progress.rows_inserted = inserted
+            
+            # Get final count from the maintained counter
+            total_records = await get_table_row_count_async("import_records")
+            
+            # Run summarization if requested (synchronously to include in response)
+            summary_data = None
+            summaries_created = 0
+            
+            if request.run_summarize:
+                progress.start_stage("summarize")
+                logger.info(f"Creating summary for importer: {request.importer_name}")
+                summary_data = await create_importer_summary_async(request.importer_name, start_date, end_date)
+                if summary_data:
+                    summaries_created = 1
+            
+            progress.finish()
+            execution_time = time.time() - start_time
+            
+            return ImportResponse(
+                success=True,
+                message=f"Successfully imported {inserted} records",
+                records_fetched=len(records),
+                records_inserted=inserted,
+                total_records=total_records,
+                summaries_created=summaries_created,
+                total_summaries=summaries_created,
+                summary_data=summary_data,
+                execution_time=execution_time,
+                resolved_importer_name=resolved_importer_name
+            )
         
     except HTTPException:
         # Re-raise HTTP exceptions as-is
         raise
     except Exception as e:
+        progress.finish()
         execution_time = time.time() - start_time
         logger.error(f"Import failed: {str(e)}")
         return ImportResponse(
@@ -1365,14 +3595,78 @@ async def import_records(request: ImportRequest, background_tasks: BackgroundTas
             error=f"Unexpected error during import: {str(e)}. Please check your parameters and try again."
         )
 
+@app.post("/jobs/import", status_code=202)
+async def create_import_job(request: ImportRequest):
+    """Queue an import and return its job id immediately"""
+    is_valid, message = validate_importer_name(request.importer_name)
+    if not is_valid:
+        raise HTTPException(status_code=400, detail=message)
+    try:
+        calculate_date_range(request.since)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    name_resolution = request.name_resolution or IMPORTER_NAME_RESOLUTION
+    if name_resolution != "off":
+        await ensure_importer_name_index_async()
+    importer_name, message, suggestions = resolve_importer_name(request.importer_name, name_resolution)
+    if message:
+        raise HTTPException(status_code=400, detail={"message": message, "suggestions": suggestions})
+    if importer_name != request.importer_name:
+        request = request.model_copy(update={"importer_name": importer_name})
+    
+    await create_database()
+    job_id = await enqueue_import_job_async(request)
+    return {"job_id": job_id, "status": "queued", "status_url": f"/jobs/{job_id}"}
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: int):
+    """Report the status, progress and result of an import job"""
+    rows = await fetch_dicts_async(
+        "SELECT id, status, progress_json, result_json, error, created_at, started_at, finished_at "
+        "FROM import_jobs WHERE id = %s",
+        (job_id,)
+    )
+    if not rows:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    
+    job = rows[0]
+    return JobResponse(
+        job_id=job["id"],
+        status=job["status"],
+        progress=json.loads(job["progress_json"]) if job["progress_json"] else None,
+        result=json.loads(job["result_json"]) if job["result_json"] else None,
+        error=job["error"],
+        created_at=job["created_at"].isoformat() if job["created_at"] else None,
+        started_at=job["started_at"].isoformat() if job["started_at"] else None,
+        finished_at=job["finished_at"].isoformat() if job["finished_at"] else None
+    )
+
 @app.post("/summarize")
-async def run_summarization(request: SummaryRequest):
+async def run_summarization(
+    request: SummaryRequest,
+    mode: str = Query("full", pattern="^(full|incremental)$", description="full recomputes every importer; incremental only those whose records changed")
+):
     """Run summarization on imported records with optimized async processing"""
-    return await run_summarization_internal_async(request)
+    started = time.perf_counter()
+    try:
+        return await run_summarization_internal_async(request, mode)
+    finally:
+        summarize_run_latency.observe(time.perf_counter() - started, mode)
 
-async def run_summarization_internal_async(request: SummaryRequest) -> SummaryResponse:
-    """Internal summarization function with async operations"""
+@traced("summarize_run")
+async def run_summarization_internal_async(request: SummaryRequest, mode: str = "full") -> SummaryResponse:
+    """
+    Internal summarization function with async operations.
+    
+    mode="incremental" recomputes only importers marked in summary_dirty_importers
+    (records inserted or deleted since their last summary). Both modes delete the
+    summaries of importers left without records in the window, and clear only the
+    marks of importers they processed; marks made while the run is in progress are
+    kept for the next run. clear_existing always forces a full run.
+    """
     start_time = time.time()
+    incremental = mode == "incremental" and not request.clear_existing
     
     try:
         # Calculate date range from 'since' parameter
@@ -1392,11 +3686,16 @@ async def run_summarization_internal_async(request: SummaryRequest) -> SummaryRe
         
         logger.info(f"Processing summarization for date range {start_date} to {end_date}")
         
+        # Create summary table if not exists
+        await create_database()
+        
+        # Marks made after this point belong to the next run
+        (run_started,) = (await execute_query_async("SELECT NOW(6)"))[0]
+        
         # Check if data exists
-        record_count_result = await execute_query_async("SELECT COUNT(*) FROM import_records")
-        record_count = record_count_result[0][0] if record_count_result else 0
+        record_count = await get_table_row_count_async("import_records")
         
-        if record_count == 0:
+        if record_count == 0 and not incremental:
             execution_time = time.time() - start_time
             return SummaryResponse(
                 success=False,
@@ -1408,34 +3707,60 @@ async def run_summarization_internal_async(request: SummaryRequest) -> SummaryRe
                 error="No import records found. Please run import first before creating summaries."
             )
         
-        # Create summary table if not exists
-        await create_database()
-        
         # Clear existing summaries if requested
         if request.clear_existing:
             await clear_summaries_async()
         
         # Get importers
-        importers = await get_importers_async()
+        if incremental:
+            importers = await get_dirty_importers_async(run_started, start_date, end_date)
+            logger.info(f"Incremental summarization of {len(importers)} changed importers")
+        else:
+            importers = await get_importers_async()
+            # Importers whose records were all deleted are not listed; revisit their marks
+            # and leftover summaries so those summaries are removed
+            listed = set(importers)
+            importers += [name for name in await get_stale_summary_importers_async(run_started) if name not in listed]
+        set_span_attrs(mode="incremental" if incremental else "full", importers=len(importers))
         
         # Generate summaries with concurrent processing
         summaries_created = 0
         batch_size = 10  # Process in batches to avoid overwhelming the database
+        pending_summaries = []
+        processed = []
         
         for i in range(0, len(importers), batch_size):
             batch = importers[i:i + batch_size]
             batch_tasks = []
             
             for importer in batch:
-                batch_tasks.append(process_importer_summary(importer, start_date, end_date))
+                batch_tasks.append(calculate_window_summary_async(importer, start_date, end_date))
             
             # Process batch concurrently
             batch_results = await asyncio.gather(*batch_tasks, return_exceptions=True)
-            summaries_created += sum(1 for result in batch_results if result is True)
+            for importer, result in zip(batch, batch_results):
+                if isinstance(result, Exception):
+                    # Leave the importer marked so the next incremental run retries it
+                    logger.error(f"Error processing summary for {importer}: {result}")
+                    continue
+                if isinstance(result, dict):
+                    pending_summaries.append(result)
+                else:
+                    # No records left in the window
+                    await delete_importer_summary_async(importer)
+                processed.append(importer)
+            
+            # Write summaries in multi-row upserts of SUMMARY_UPSERT_BATCH_SIZE
+            if len(pending_summaries) >= SUMMARY_UPSERT_BATCH_SIZE:
+                summaries_created += await upsert_summaries_async(pending_summaries)
+                pending_summaries = []
+        
+        summaries_created += await upsert_summaries_async(pending_summaries)
+        
+        await clear_dirty_importers_async(run_started, processed)
         
         # Get final count
-        total_summaries_result = await execute_query_async("SELECT COUNT(*) FROM import_summaries")
-        total_summaries = total_summaries_result[0][0] if total_summaries_result else 0
+        total_summaries = await get_table_row_count_async("import_summaries")
         
         execution_time = time.time() - start_time
         
@@ -1466,37 +3791,19 @@ async def run_summarization_internal(request: SummaryRequest) -> SummaryResponse
     return await run_summarization_internal_async(request)
 
 @app.get("/export/csv")
+@traced("export")
 async def export_csv(
     table: str = Query(..., description="Table to export: 'records' or 'summaries'"),
-    filename: Optional[str] = Query(None, description="Custom filename (optional)")
+    filename: Optional[str] = Query(None, description="Custom filename (optional)"),
+    if_none_match: Optional[str] = Header(None, description="ETag of a previously downloaded export")
 ):
-    """Export data to CSV"""
+    """Export data to CSV, reusing the cached artifact while the table is unchanged"""
     try:
         if table not in ['records', 'summaries']:
             raise HTTPException(status_code=400, detail="Table must be 'records' or 'summaries'")
         
-        try:
-            if table == 'records':
-                data = await execute_query_async("SELECT * FROM import_records")
-                columns_result = await execute_query_async("SHOW COLUMNS FROM import_records")
-                columns = [row[0] for row in columns_result] if columns_result else []
-            else:
-                data = await execute_query_async("SELECT * FROM import_summaries")
-                columns_result = await execute_query_async("SHOW COLUMNS FROM import_summaries")
-                columns = [row[0] for row in columns_result] if columns_result else []
-            
-            # Debug logging
-            logger.info(f"Export data type: {type(data)}")
-            logger.info(f"Export data length: {len(data) if data else 'None'}")
-            logger.info(f"Export columns type: {type(columns)}")
-            logger.info(f"Export columns length: {len(columns) if columns else 'None'}")
-            
-        except Exception as e:
-            logger.error(f"Error exporting data: {e}")
-            raise HTTPException(status_code=500, detail=f"Error exporting data: {str(e)}")
-        
-        if not data:
-            raise HTTPException(status_code=404, detail=f"No data found in {table} table")
+        table_name = 'import_records' if table == 'records' else 'import_summaries'
+        set_span_attrs(export=table)
         
         # Generate filename
         if filename:
@@ -1506,42 +3813,69 @@ async def export_csv(
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"{table}_{timestamp}.csv"
         
-        # Create CSV file
-        csv_path = f"exports/{filename}"
-        os.makedirs("exports", exist_ok=True)
+        # Serve from the export cache when the table has not changed
+        version = await get_table_version_async(table_name)
+        headers = {}
+        cache_path = None
+        if version is not None:
+            etag = f'"{table}-v{version}"'
+            headers = {"ETag": etag, "Cache-Control": "no-cache"}
+            if etag_matches(if_none_match, etag):
+                return Response(status_code=304, headers=headers)
+            
+            cache_path = os.path.join(EXPORTS_DIR, f"{table}_v{version}.csv")
+            if os.path.exists(cache_path):
+                touch_export_file(cache_path)
+                return export_file_response(cache_path, filename, table, "hit", headers)
+        
+        try:
+            data = await execute_query_async(f"SELECT * FROM {table_name}")
+            columns_result = await execute_query_async(f"SHOW COLUMNS FROM {table_name}")
+            columns = [row[0] for row in columns_result] if columns_result else []
+        except Exception as e:
+            logger.error(f"Error exporting data: {e}")
+            raise HTTPException(status_code=500, detail=f"Error exporting data: {str(e)}")
+        
+        if not data:
+            raise HTTPException(status_code=404, detail=f"No data found in {table} table")
+        set_span_attrs(rows=len(data))
+        
+        # Create CSV file (written to a temp file first so readers never see a partial artifact)
+        csv_path = cache_path or os.path.join(EXPORTS_DIR, filename)
+        os.makedirs(EXPORTS_DIR, exist_ok=True)
+        tmp_path = f"{csv_path}.{os.getpid()}.tmp"
         
-        with open(csv_path, 'w', newline='', encoding='utf-8') as csvfile:
+        with open(tmp_path, 'w', newline='', encoding='utf-8') as csvfile:
             writer = csv.writer(csvfile)
             writer.writerow(columns)
             writer.writerows(data)
+        os.replace(tmp_path, csv_path)
         
-        return FileResponse(
-            path=csv_path,
-            filename=filename,
-            media_type='text/csv'
-        )
+        enforce_export_cache_limit(keep_path=csv_path)
+        
+        return export_file_response(csv_path, filename, table, "miss", headers)
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Export failed: {str(e)}")
 
 @app.get("/export/importer")
+@traced("export")
 async def export_importer_csv(
     importer_name: str = Query(..., description="Importer name to export records for"),
     filename: Optional[str] = Query(None, description="Custom filename (optional)")
 ):
     """Export records for a specific importer to CSV"""
     try:
-        logger.info(f"Export request for importer: '{importer_name}', filename: '{filename}'")
-        logger.info(f"Importer name type: {type(importer_name)}")
+        set_span_attrs(export="importer", importer=importer_name)
         
         # Check if importer exists in database
-        logger.info("Checking if importer exists in database...")
         try:
             importer_check = await execute_query_async(
-                "SELECT COUNT(*) FROM import_records WHERE importer_name = %s",
+                "SELECT row_count FROM importers WHERE importer_name = %s",
                 (importer_name,)
             )
-            logger.info(f"Importer check result: {importer_check}, type: {type(importer_check)}")
         except Exception as db_error:
             logger.error(f"Database query error: {db_error}")
             raise HTTPException(status_code=500, detail=f"Database error: {str(db_error)}")
@@ -1553,25 +3887,14 @@ async def export_importer_csv(
             )
         
         # Get records for the specific importer
-        logger.info("Fetching records for importer...")
         data = await execute_query_async(
             "SELECT * FROM import_records WHERE importer_name = %s ORDER BY dispatch_date DESC",
             (importer_name,)
         )
-        logger.info(f"Data fetched: {type(data)}, length: {len(data) if data else 'None'}")
         
         # Get column names
-        logger.info("Fetching column names...")
         columns_result = await execute_query_async("SHOW COLUMNS FROM import_records")
-        logger.info(f"Columns result: {type(columns_result)}, length: {len(columns_result) if columns_result else 'None'}")
         columns = [row[0] for row in columns_result] if columns_result else []
-        logger.info(f"Columns: {columns}")
-        
-        # Debug logging
-        logger.info(f"Export data type: {type(data)}")
-        logger.info(f"Export data length: {len(data) if data else 'None'}")
-        logger.info(f"Export columns type: {type(columns)}")
-        logger.info(f"Export columns length: {len(columns) if columns else 'None'}")
         
         if not data:
             raise HTTPException(
@@ -1586,24 +3909,19 @@ async def export_importer_csv(
         else:
             # Sanitize importer name for filename
             try:
-                logger.info(f"Sanitizing importer name: '{importer_name}', type: {type(importer_name)}")
                 importer_str = str(importer_name)
-                logger.info(f"Converted to string: '{importer_str}'")
                 safe_importer_name = "".join(c for c in importer_str if c.isalnum() or c in (' ', '-', '_')).rstrip()
-                logger.info(f"Sanitized name: '{safe_importer_name}'")
                 safe_importer_name = safe_importer_name.replace(' ', '_')
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
                 filename = f"{safe_importer_name}_{timestamp}.csv"
-                logger.info(f"Final filename: '{filename}'")
             except Exception as e:
                 logger.error(f"Error sanitizing importer name '{importer_name}': {e}")
-                logger.error(f"Importer name type: {type(importer_name)}")
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
                 filename = f"importer_export_{timestamp}.csv"
         
         # Create CSV file
-        csv_path = f"exports/{filename}"
-        os.makedirs("exports", exist_ok=True)
+        csv_path = os.path.join(EXPORTS_DIR, filename)
+        os.makedirs(EXPORTS_DIR, exist_ok=True)
         
         try:
             with open(csv_path, 'w', newline='', encoding='utf-8') as csvfile:
@@ -1611,18 +3929,16 @@ async def export_importer_csv(
                 writer.writerow(columns)
                 writer.writerows(data)
             
+            set_span_attrs(rows=len(data))
             logger.info(f"Exported {len(data)} records for importer '{importer_name}' to {filename}")
+            enforce_export_cache_limit(keep_path=csv_path)
         except Exception as csv_error:
             logger.error(f"Error writing CSV file: {csv_error}")
             logger.error(f"Data type: {type(data)}, Data length: {len(data) if data else 'None'}")
             logger.error(f"Columns type: {type(columns)}, Columns length: {len(columns) if columns else 'None'}")
             raise HTTPException(status_code=500, detail=f"Error writing CSV file: {str(csv_error)}")
         
-        return FileResponse(
-            path=csv_path,
-            filename=filename,
-            media_type='text/csv'
-        )
+        return export_file_response(csv_path, filename, "importer", "none")
         
     except HTTPException:
         # Re-raise HTTP exceptions as-is
@@ -1634,6 +3950,233 @@ async def export_importer_csv(
         logger.error(f"Traceback: {traceback.format_exc()}")
         raise HTTPException(status_code=500, detail=f"Export failed: {str(e)}")
 
+@app.get("/records")
+async def list_records(
+    importer_name: Optional[str] = Query(None, description="Exact importer name"),
+    date_from: Optional[date] = Query(None, description="Earliest dispatch date (inclusive)"),
+    date_to: Optional[date] = Query(None, description="Latest dispatch date (inclusive)"),
+    limit: int = Query(100, ge=1, le=1000, description="Page size"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page")
+):
+    """
+    Page through import records ordered by (dispatch_date, id) using keyset pagination.
+    Records without a dispatch date come last, ordered by id; a date_from or date_to
+    filter leaves them out.
+    """
+    conditions: List[str] = []
+    params: List[Any] = []
+    
+    if importer_name:
+        conditions.append("importer_name = %s")
+        params.append(importer_name)
+    if date_from:
+        conditions.append("dispatch_date >= %s")
+        params.append(date_from)
+    if date_to:
+        conditions.append("dispatch_date <= %s")
+        params.append(date_to)
+    last_date, last_id = decode_page_cursor(cursor, (parse_cursor_date, parse_cursor_id)) if cursor else (None, None)
+    
+    # Dated and undated records are read as two index ranges, so neither needs a filesort
+    rows: List[Dict] = []
+    if last_id is None or last_date is not None:
+        dated_conditions = conditions + ["dispatch_date IS NOT NULL"]
+        dated_params = list(params)
+        if last_id is not None:
+            # Expanded row comparison so MySQL can use it as an index range
+            dated_conditions.append("(dispatch_date > %s OR (dispatch_date = %s AND id > %s))")
+            dated_params.extend([last_date, last_date, last_id])
+            last_id = None
+        rows = await fetch_dicts_async(
+            f"SELECT * FROM import_records WHERE {' AND '.join(dated_conditions)} "
+            f"ORDER BY dispatch_date, id LIMIT %s",
+            tuple(dated_params) + (limit + 1,)
+        )
+    if len(rows) <= limit and not (date_from or date_to):
+        undated_conditions = conditions + ["dispatch_date IS NULL"]
+        undated_params = list(params)
+        if last_id is not None:
+            undated_conditions.append("id > %s")
+            undated_params.append(last_id)
+        rows += await fetch_dicts_async(
+            f"SELECT * FROM import_records WHERE {' AND '.join(undated_conditions)} "
+            f"ORDER BY id LIMIT %s",
+            tuple(undated_params) + (limit + 1 - len(rows),)
+        )
+    
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last_row_date = rows[-1]["dispatch_date"]
+        next_cursor = encode_page_cursor([last_row_date.isoformat() if last_row_date else None, rows[-1]["id"]])
+    
+    return FastJSONResponse(content={"data": rows, "count": len(rows), "next_cursor": next_cursor})
+
+@app.get("/summaries")
+async def list_summaries(
+    importer_name: Optional[str] = Query(None, description="Exact importer name"),
+    date_from: Optional[date] = Query(None, description="Earliest last_import_date (inclusive)"),
+    date_to: Optional[date] = Query(None, description="Latest last_import_date (inclusive)"),
+    min_score: Optional[int] = Query(None, ge=1, le=10, description="Minimum business_opportunity_score"),
+    is_origin_usa: Optional[bool] = Query(None, description="Filter by USA origin flag"),
+    limit: int = Query(100, ge=1, le=1000, description="Page size"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page")
+):
+    """Page through importer summaries ordered by id using keyset pagination"""
+    conditions = []
+    params: List[Any] = []
+    
+    if importer_name:
+        conditions.append("importer_name = %s")
+        params.append(importer_name)
+    if date_from:
+        conditions.append("last_import_date >= %s")
+        params.append(date_from)
+    if date_to:
+        conditions.append("last_import_date <= %s")
+        params.append(date_to)
+    if min_score is not None:
+        conditions.append("business_opportunity_score >= %s")
+        params.append(min_score)
+    if is_origin_usa is not None:
+        conditions.append("is_origin_usa = %s")
+        params.append(1 if is_origin_usa else 0)
+    if cursor:
+        (last_id,) = decode_page_cursor(cursor, (parse_cursor_id,))
+        conditions.append("id > %s")
+        params.append(last_id)
+    
+    where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    rows = await fetch_dicts_async(
+        f"SELECT * FROM import_summaries {where_clause} ORDER BY id LIMIT %s",
+        tuple(params) + (limit + 1,)
+    )
+    
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_page_cursor([rows[-1]["id"]])
+    
+    return FastJSONResponse(content={"data": rows, "count": len(rows), "next_cursor": next_cursor})
+
+def top_summaries_query(limit: int, crossborder: Optional[bool] = None, is_origin_usa: Optional[bool] = None,
+                        min_score: Optional[int] = None) -> tuple:
+    """(query, params, index name) for /summaries/top; test_top_summaries.py checks their plans"""
+    conditions = []
+    params: List[Any] = []
+    
+    # Pick the index whose leading column matches the equality filter so the
+    # ORDER BY is satisfied by a backward index scan
+    if crossborder is not None:
+        index_name = "idx_top_crossborder"
+        conditions.append("is_candidate_for_crossborder = %s")
+        params.append(1 if crossborder else 0)
+        if is_origin_usa is not None:
+            conditions.append("is_origin_usa = %s")
+            params.append(1 if is_origin_usa else 0)
+    elif is_origin_usa is not None:
+        index_name = "idx_top_usa"
+        conditions.append("is_origin_usa = %s")
+        params.append(1 if is_origin_usa else 0)
+    else:
+        index_name = "idx_top_score"
+    
+    if min_score is not None:
+        conditions.append("business_opportunity_score >= %s")
+        params.append(min_score)
+    
+    where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    query = (
+        f"SELECT {', '.join(TOP_SUMMARY_COLUMNS)} FROM import_summaries FORCE INDEX ({index_name}) "
+        f"{where_clause} ORDER BY business_opportunity_score DESC, total_freight_usd_value DESC LIMIT %s"
+    )
+    params.append(limit)
+    return query, tuple(params), index_name
+
+@app.get("/summaries/top")
+async def top_summaries(
+    limit: int = Query(50, ge=1, le=500, description="Number of importers to return"),
+    crossborder: Optional[bool] = Query(None, description="Filter by cross-border candidate flag"),
+    is_origin_usa: Optional[bool] = Query(None, description="Filter by USA origin flag"),
+    min_score: Optional[int] = Query(None, ge=1, le=10, description="Minimum business_opportunity_score")
+):
+    """Rank importers by business_opportunity_score (ties broken by freight value)"""
+    query, params, _ = top_summaries_query(limit, crossborder, is_origin_usa, min_score)
+    rows = await fetch_dicts_async(query, params)
+    return FastJSONResponse(content={"data": rows, "count": len(rows)})
+
+@app.get("/summaries/{importer_name}")
+async def get_importer_summary(importer_name: str):
+    """
+    Get the summary of a single importer, served from the in-process cache when
+    possible. Writes made by this process invalidate their importer right away; the
+    import_summaries change counter is checked at most every
+    SUMMARY_CACHE_VERSION_CHECK_MS, and the cache is dropped when another worker
+    moved it, so a summary rewritten elsewhere is served stale for at most that long.
+    """
+    if summary_cache.version_check_due():
+        own_writes = summary_cache.own_writes
+        summary_cache.validate(await get_table_version_async("import_summaries"), own_writes)
+    found, summary = summary_cache.get(importer_name)
+    cache_status = "HIT" if found else "MISS"
+    
+    if not found:
+        generation = summary_cache.generation
+        rows = await fetch_dicts_async(
+            "SELECT * FROM import_summaries WHERE importer_name = %s",
+            (importer_name,)
+        )
+        summary = rows[0] if rows else None
+        # Missing summaries are cached too; inserting one invalidates the entry
+        summary_cache.set(importer_name, summary, generation)
+    
+    if summary is None:
+        raise HTTPException(status_code=404, detail=f"No summary found for importer '{importer_name}'")
+    
+    return FastJSONResponse(content=summary, headers={"X-Cache": cache_status})
+
+@app.get("/cache/stats")
+async def cache_stats():
+    """Hit/miss counters of the in-process caches"""
+    return {"summaries": summary_cache.stats(), "importer_names": importer_name_index.stats()}
+
+@app.get("/admin/profiles")
+async def list_profiles(x_admin_token: Optional[str] = Header(None)):
+    """Stored request profiles, newest last (admin only)"""
+    require_admin(x_admin_token)
+    return [
+        {"profile_id": profile_id, **{key: value for key, value in profile.items() if key != "collapsed"}}
+        for profile_id, profile in request_profiles.items()
+    ]
+
+@app.get("/admin/profiles/{profile_id}")
+async def get_profile(profile_id: str, x_admin_token: Optional[str] = Header(None)):
+    """A request profile as collapsed stacks, for flamegraph.pl or speedscope (admin only)"""
+    require_admin(x_admin_token)
+    profile = request_profiles.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail=f"Profile {profile_id} not found")
+    return Response(content=profile["collapsed"], media_type="text/plain; charset=utf-8")
+
+@app.get("/admin/slow-requests")
+async def get_slow_requests(x_admin_token: Optional[str] = Header(None)):
+    """The slowest recent requests with their per-stage time (admin only)"""
+    require_admin(x_admin_token)
+    return {
+        "window_seconds": SLOW_REQUEST_WINDOW_SECONDS,
+        "requests": slow_requests.entries()
+    }
+
+@app.get("/metrics")
+async def metrics():
+    """
+    Counters and histograms in the Prometheus text format. Values are per worker
+    process and labelled with its pid: with WEB_CONCURRENCY > 1 each scrape sees one
+    worker's series, and totals are the sum over the pid label.
+    """
+    body = "\n".join(metric.render() for metric in metrics_registry) + "\n"
+    return Response(content=body, media_type="text/plain; version=0.0.4; charset=utf-8")
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
@@ -1645,33 +4188,47 @@ async def ping():
     return {"message": "pong", "timestamp": datetime.now().isoformat()}
 
 if __name__ == "__main__":
-    async def startup():
-        """Initialize database on startup"""
-        await create_database()
-        logger.info("Database initialized successfully")
-    
-    # Add startup event
-    @app.on_event("startup")
-    async def startup_event():
-        await startup()
-    
-    @app.on_event("shutdown")
-    async def shutdown_event():
-        """Cleanup on shutdown"""
-        global async_db_pool, thread_pool
-        if async_db_pool:
-            async_db_pool.close()
-            await async_db_pool.wait_closed()
-        if thread_pool:
-            thread_pool.shutdown(wait=True)
-        logger.info("Server shutdown completed")
-    
-    # Run the FastAPI application
-    uvicorn.run(
-        "main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True,
-        log_level="info",
-        workers=1  # Single worker for development
-    )
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Run the Logcomex Importer API")
+    parser.add_argument("--production", action="store_true", default=os.getenv("APP_ENV") == "production",
+                        help="Run without auto-reload and with several worker processes")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Worker processes in production mode (default: WEB_CONCURRENCY, or the CPU "
+                             "count capped to what DB_MAX_CONNECTIONS can hold)")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    args = parser.parse_args()
+    
+    if args.production:
+        workers = args.workers or int(os.getenv("WEB_CONCURRENCY") or default_worker_count())
+        pool_maxsize = int(os.getenv("DB_POOL_MAXSIZE") or default_pool_maxsize(workers))
+        needed = workers * worker_connections(pool_maxsize)
+        if needed > DB_MAX_CONNECTIONS:
+            sys.exit(
+                f"{workers} workers need up to {needed} MySQL connections ({pool_maxsize} pooled, "
+                f"{DB_SYNC_POOL_SIZE} sync, {IMPORT_LOCK_CONNECTIONS} import lock and 1 schema lock each), more "
+                f"than DB_MAX_CONNECTIONS={DB_MAX_CONNECTIONS}. Lower WEB_CONCURRENCY, IMPORT_LOCK_CONNECTIONS "
+                f"or DB_POOL_MAXSIZE, or raise DB_MAX_CONNECTIONS."
+            )
+        # Worker processes read WEB_CONCURRENCY to size their share of the connection budget
+        os.environ["WEB_CONCURRENCY"] = str(workers)
+        logger.info(f"Starting {workers} workers with {needed} of {DB_MAX_CONNECTIONS} DB connections")
+        uvicorn.run(
+            "main:app",
+            host=args.host,
+            port=args.port,
+            reload=False,
+            log_level="info",
+            workers=workers
+        )
+    else:
+        # Run the FastAPI application
+        uvicorn.run(
+            "main:app",
+            host=args.host,
+            port=args.port,
+            reload=True,
+            log_level="info",
+            workers=1  # Single worker for development
+        )
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Mock Logcomex API
+Local stand-in for /api/v1/details that serves deterministic synthetic pages,
+with configurable importer sizes, latency, error rate and 429 bursts.
+
+Point the backend at it with API_URL=http://localhost:8090/api/v1/details
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import zlib
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Dict
+
+from aiohttp import web
+
+TRANSPORTS = ["CARRETERO", "AÉREO", "MARÍTIMO", "FERROVIARIO", None]
+CUSTOMS = [
+    "NUEVO LAREDO, NUEVO LAREDO, TAMAULIPAS",
+    "MANZANILLO, MANZANILLO, COLIMA",
+    "VERACRUZ, VERACRUZ, VERACRUZ",
+    "AEROPUERTO INTERNACIONAL DE LA CIUDAD DE MEXICO, CIUDAD DE MEXICO, CIUDAD DE MEXICO",
+    "CIUDAD JUAREZ, CIUDAD JUAREZ, CHIHUAHUA",
+]
+COUNTRIES = ["CHINA", "ESTADOS UNIDOS DE AMERICA", "ALEMANIA", "TAIWAN", "JAPON", None]
+REGIMES = ["A1", "F4", "IN", "A3", "AF", "C1", "F5", "V1", None]
+INCOTERMS = ["DAP", "EXW", "FCA", "FOB", "CIF", "CFR", "NO INFORMADO", "DDP", None]
+BROKERS = ["3995", "3714", "1720", "1973", "1893", "1983", "9831", None]
+
+
+@dataclass
+class MockConfig:
+    records: int = 2000                 # records per importer unless listed in sizes
+    sizes: Dict[str, int] = field(default_factory=dict)
+    strict_names: bool = False          # importers not in sizes have no records
+    latency_ms: float = 50.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0             # share of requests answered with 500
+    burst_every: int = 0                # after every N requests...
+    burst_length: int = 0               # ...answer the next K with 429
+    retry_after: float = 1.0
+    webhook_error_rate: float = 0.0     # share of /webhook requests answered with 503
+    seed: int = 42
+
+
+@dataclass
+class MockStats:
+    requests: int = 0
+    pages_served: int = 0
+    records_served: int = 0
+    errors: int = 0
+    rate_limited: int = 0
+    webhook_requests: int = 0
+    webhook_bytes: int = 0
+    webhook_records: int = 0
+    webhook_errors: int = 0
+
+
+def importer_size(config: MockConfig, importer_name: str) -> int:
+    if importer_name in config.sizes:
+        return config.sizes[importer_name]
+    return 0 if config.strict_names else config.records
+
+
+def make_record(importer_name: str, index: int, start: date, days: int) -> Dict:
+    """Record number `index` of an importer; the same inputs always give the same record"""
+    rng = random.Random(zlib.crc32(f"{importer_name}|{index}".encode("utf-8")))
+    return {
+        "dispatch_date": (start + timedelta(days=rng.randrange(days))).isoformat(),
+        "importer_name": importer_name,
+        "importer_address": f"CALLE {rng.randrange(1, 500)}, COL. CENTRO",
+        "supplier_name": f"SUPPLIER {rng.randrange(200):03d} LTD",
+        "supplier_address": f"{rng.randrange(1, 9999)} INDUSTRIAL RD",
+        "origin_destination_country": rng.choice(COUNTRIES),
+        "buyer_seller_country": rng.choice(COUNTRIES),
+        "entry_exit_transport": rng.choice(TRANSPORTS),
+        "departure_hscodes": f"{rng.randrange(1, 98):02d}{rng.randrange(10000):04d}",
+        "departure_gross_weight": round(rng.uniform(1, 5000), 2),
+        "departure_goods_usd_value": round(rng.uniform(10, 200000), 2),
+        "dispatch_customs": rng.choice(CUSTOMS),
+        "entry_customs": rng.choice(CUSTOMS),
+        "custom_broker_id": rng.choice(BROKERS),
+        "customs_regime": rng.choice(REGIMES),
+        "customs_regime_id": str(rng.randrange(1, 20)),
+        "declaration_type": "IMPORTACION",
+        "dispatch_customs_state": "TAMAULIPAS",
+        "importer_id": f"RFC{zlib.crc32(importer_name.encode('utf-8')) % 1000000:06d}XX1",
+        "incoterm": rng.choice(INCOTERMS),
+        "container_type": None,
+        "teus_qty": 0,
+        "departure_insurance_usd_value": round(rng.uniform(0, 500), 2),
+        "departure_freight_usd_value": round(rng.uniform(0, 20000), 2),
+    }
+
+
+def parse_filters(payload: Dict) -> tuple:
+    """(importer_name, start date, end date) from a Logcomex details request body"""
+    importer_name, start, end = "", date(2024, 1, 1), date(2024, 12, 31)
+    for item in payload.get("filters", []):
+        if item.get("field") == "importer_name":
+            importer_name = item.get("value") or ""
+        elif item.get("field") == "dispatch_date":
+            start, end = (date.fromisoformat(value) for value in item["value"])
+    return importer_name, start, end
+
+
+def create_app(config: MockConfig) -> web.Application:
+    """Build the mock application; app["stats"] holds the request counters"""
+    stats = MockStats()
+    rng = random.Random(config.seed)
+    app = web.Application()
+    app["stats"] = stats
+
+    async def details(request: web.Request) -> web.Response:
+        stats.requests += 1
+        if config.latency_ms or config.jitter_ms:
+            await asyncio.sleep(max(0.0, config.latency_ms + rng.uniform(-config.jitter_ms, config.jitter_ms)) / 1000)
+
+        if config.burst_every and config.burst_length:
+            if (stats.requests - 1) % (config.burst_every + config.burst_length) >= config.burst_every:
+                stats.rate_limited += 1
+                return web.json_response(
+                    {"message": "Too Many Requests"}, status=429,
+                    headers={"Retry-After": str(config.retry_after)}
+                )
+        if config.error_rate and rng.random() < config.error_rate:
+            stats.errors += 1
+            return web.json_response({"message": "Internal Server Error"}, status=500)
+
+        payload = await request.json()
+        importer_name, start, end = parse_filters(payload)
+        page = max(1, int(payload.get("page", 1)))
+        size = max(1, int(payload.get("size", 100)))
+        total = importer_size(config, importer_name)
+        days = max(1, (end - start).days + 1)
+
+        first = (page - 1) * size
+        indexes = range(first, min(first + size, total))
+        stats.pages_served += 1
+        stats.records_served += len(indexes)
+        # The real API returns "data" as an object keyed by position
+        data = {str(i): make_record(importer_name, index, start, days) for i, index in enumerate(indexes)}
+        return web.json_response({"data": data, "total": total, "page": page})
+
+    async def webhook(request: web.Request) -> web.Response:
+        # aiohttp inflates gzip bodies itself; count the bytes that went over the wire
+        body = await request.read()
+        stats.webhook_requests += 1
+        stats.webhook_bytes += request.content_length or len(body)
+        if config.webhook_error_rate and rng.random() < config.webhook_error_rate:
+            stats.webhook_errors += 1
+            return web.json_response({"message": "Service Unavailable"}, status=503)
+        records = len(json.loads(body).get("data") or []) if body else 0
+        stats.webhook_records += records
+        return web.json_response({"received": len(body), "records": records})
+
+    async def get_stats(request: web.Request) -> web.Response:
+        return web.json_response(stats.__dict__)
+
+    app.router.add_post("/api/v1/details", details)
+    app.router.add_route("*", "/webhook", webhook)
+    app.router.add_get("/stats", get_stats)
+    return app
+
+
+async def start_mock_server(config: MockConfig, host: str = "127.0.0.1", port: int = 0) -> tuple:
+    """Run the mock in the current event loop; returns (runner, base URL, stats)"""
+    app = create_app(config)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    bound_port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://{host}:{bound_port}", app["stats"]
+
+
+def parse_sizes(values) -> Dict[str, int]:
+    sizes = {}
+    for value in values or []:
+        name, _, count = value.rpartition("=")
+        sizes[name] = int(count)
+    return sizes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve synthetic Logcomex /api/v1/details pages")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--records", type=int, default=2000, help="Records per importer")
+    parser.add_argument("--size", action="append", metavar="NAME=COUNT", help="Records for one importer (repeatable)")
+    parser.add_argument("--strict-names", action="store_true", help="Importers without --size have no records")
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with 500")
+    parser.add_argument("--burst-every", type=int, default=0, help="Answer with 429 after every N requests")
+    parser.add_argument("--burst-length", type=int, default=0, help="Number of 429 responses per burst")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds sent with 429")
+    parser.add_argument("--webhook-error-rate", type=float, default=0.0, help="Share of /webhook requests answered with 503")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    config = MockConfig(
+        records=args.records, sizes=parse_sizes(args.size), strict_names=args.strict_names,
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+        burst_every=args.burst_every, burst_length=args.burst_length,
+        retry_after=args.retry_after, webhook_error_rate=args.webhook_error_rate, seed=args.seed
+    )
+    print(f"🧪 Mock Logcomex API on http://{args.host}:{args.port}/api/v1/details (webhook sink: /webhook)")
+    web.run_app(create_app(config), host=args.host, port=args.port, access_log=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+The NumPy summary backend must give exactly the same aggregates and summaries as the
+pure-Python one (SUMMARY_BACKEND=python), including the order of tied brokers.
+
+    python -m pytest test_summary_backends.py
+"""
+
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+
+import main
+
+pytestmark = pytest.mark.skipif(main.np is None, reason="NumPy is not installed")
+
+CUSTOMS = [
+    "NUEVO LAREDO, NUEVO LAREDO, TAMAULIPAS",
+    "MANZANILLO, MANZANILLO, COLIMA",
+    "AEROPUERTO INTERNACIONAL DE LA CIUDAD DE MEXICO, CIUDAD DE MEXICO, CIUDAD DE MEXICO",
+    "CIUDAD JUAREZ, CIUDAD JUAREZ, CHIHUAHUA",
+    "",
+    None,
+]
+
+
+def make_records(count: int, seed: int) -> list:
+    """Rows shaped like SELECT * FROM import_records, with NULLs in every source column"""
+    rng = random.Random(seed)
+    start = date(2024, 1, 1)
+    records = []
+    for i in range(count):
+        row = [None] * 28
+        row[0] = i + 1
+        row[1] = rng.choice([start + timedelta(days=rng.randrange(365)), None])
+        row[2] = "TEST IMPORTER SA DE CV"
+        row[6] = rng.choice(["CHINA", "ESTADOS UNIDOS DE AMERICA", "Alemania", "", None])
+        row[8] = rng.choice(["CARRETERO", "AÉREO", "MARÍTIMO", "FERROVIARIO", None])
+        row[9] = rng.choice([f"{rng.randrange(1, 98):02d}{rng.randrange(100):02d}", "", None])
+        row[10] = rng.choice([Decimal(f"{rng.uniform(1, 5000):.2f}"), Decimal("0.00"), None])
+        row[11] = rng.choice([Decimal(f"{rng.uniform(10, 200000):.2f}"), None])
+        row[12] = rng.choice(CUSTOMS)
+        row[13] = rng.choice(CUSTOMS)
+        row[14] = rng.choice(["3995", "3714", "1720", "1973", "", None])
+        row[16] = rng.choice(["A1", "F4", "IN", "V1", None])
+        row[19] = rng.choice(["ABC010101XYZ", None]) if i else None
+        row[20] = rng.choice(["DAP", "EXW", "NO INFORMADO", "DDP", None])
+        records.append(tuple(row))
+    return records
+
+
+def summarize_with(backend: str, records: list, monkeypatch) -> tuple:
+    monkeypatch.setattr(main, "SUMMARY_BACKEND", backend)
+    aggregate = main.aggregate_summary_columns(main.pack_summary_columns(records))
+    return aggregate, main.finalize_summary("TEST IMPORTER SA DE CV", aggregate)
+
+
+@pytest.mark.parametrize("count,seed", [(1, 1), (7, 2), (500, 3), (5000, 4)])
+def test_backends_match(count, seed, monkeypatch):
+    records = make_records(count, seed)
+    python_aggregate, python_summary = summarize_with("python", records, monkeypatch)
+    numpy_aggregate, numpy_summary = summarize_with("numpy", records, monkeypatch)
+
+    assert numpy_aggregate == python_aggregate
+    # Dict order decides the top broker on ties
+    assert list(numpy_aggregate["brokers"]) == list(python_aggregate["brokers"])
+    assert numpy_summary == python_summary
+
+
+def test_backends_match_without_dates(monkeypatch):
+    records = [row[:1] + (None,) + row[2:] for row in make_records(50, 5)]
+    python_aggregate, _ = summarize_with("python", records, monkeypatch)
+    numpy_aggregate, _ = summarize_with("numpy", records, monkeypatch)
+
+    assert numpy_aggregate == python_aggregate
+    assert numpy_aggregate["first_date"] is None and numpy_aggregate["last_date"] is None
+
+
+def test_hash_collisions_fall_back_to_exact_encoding():
+    # hash(-1) == hash(-2) in CPython
+    column = main.np.array([-1, "A", -2, -1, None], dtype=object)
+    values, codes = main.encode_column_numpy(column)
+
+    assert values == [-1, "A", -2, None]
+    assert codes.tolist() == [0, 1, 2, 0, 3]
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+EXPLAIN checks for /summaries/top: every filter combination must be answered from its
+covering index, without a filesort or a full scan.
+
+Needs a scratch MySQL database (its import_summaries table is filled with test rows):
+
+    TEST_DB_NAME=logcomex_test python -m pytest test_top_summaries.py
+
+The DB_HOST / DB_PORT / DB_USER / DB_PASSWORD settings are used; the tests are skipped
+when TEST_DB_NAME is not set or the server cannot be reached.
+"""
+
+import asyncio
+import os
+
+import pytest
+
+import main
+
+TEST_DB_NAME = os.getenv("TEST_DB_NAME")
+SEED_ROWS = 2000
+main_loop = None
+
+FILTER_COMBINATIONS = [
+    {},
+    {"min_score": 7},
+    {"crossborder": True},
+    {"crossborder": False, "min_score": 5},
+    {"crossborder": True, "is_origin_usa": True},
+    {"is_origin_usa": True},
+    {"is_origin_usa": False, "min_score": 3},
+]
+
+
+def run(coroutine):
+    return main_loop.run_until_complete(coroutine)
+
+
+def seed_summary(index: int) -> dict:
+    summary = dict.fromkeys(main.SUMMARY_COLUMN_NAMES)
+    summary.update({
+        "importer_name": f"TOP SUMMARIES TEST {index:05d} SA DE CV",
+        "rfc": f"TST{index:06d}XX1",
+        "total_pedimentos_last_6_months": index % 300,
+        "total_freight_usd_value": round(index * 137.5 % 250000, 2),
+        "is_origin_usa": index % 3 == 0,
+        "is_candidate_for_crossborder": index % 4 == 0,
+        "business_opportunity_score": 1 + index % 10,
+    })
+    return summary
+
+
+@pytest.fixture(scope="module", autouse=True)
+def summaries_table():
+    if not TEST_DB_NAME:
+        pytest.skip("TEST_DB_NAME is not set")
+    global main_loop
+    main_loop = asyncio.new_event_loop()
+    main.DB_NAME = TEST_DB_NAME
+    try:
+        run(main.create_database())
+    except Exception as e:
+        main_loop.close()
+        pytest.skip(f"MySQL database {TEST_DB_NAME} is not reachable: {e}")
+
+    run(main.clear_summaries_async())
+    run(main.upsert_summaries_async([seed_summary(index) for index in range(SEED_ROWS)]))
+    run(main.execute_query_async("ANALYZE TABLE import_summaries"))
+    yield
+    run(main.clear_summaries_async())
+    main.async_db_pool.close()
+    run(main.async_db_pool.wait_closed())
+    main.async_db_pool = None
+    main_loop.close()
+
+
+@pytest.mark.parametrize("filters", FILTER_COMBINATIONS, ids=lambda filters: ",".join(filters) or "none")
+def test_top_summaries_plan(filters):
+    query, params, index_name = main.top_summaries_query(50, **filters)
+    plan = run(main.fetch_dicts_async(f"EXPLAIN {query}", params))
+    extra = {part.strip() for step in plan for part in str(step.get("Extra") or "").split(";")}
+
+    assert [step.get("key") for step in plan] == [index_name]
+    assert all(step.get("type") != "ALL" for step in plan), plan
+    assert "Using filesort" not in extra, plan
+    assert "Using index" in extra, plan
+
+
+@pytest.mark.parametrize("filters", FILTER_COMBINATIONS, ids=lambda filters: ",".join(filters) or "none")
+def test_top_summaries_order(filters):
+    query, params, _ = main.top_summaries_query(50, **filters)
+    rows = run(main.fetch_dicts_async(query, params))
+
+    assert rows
+    keys = [(row["business_opportunity_score"], row["total_freight_usd_value"]) for row in rows]
+    assert keys == sorted(keys, reverse=True)
+    if "crossborder" in filters:
+        assert all(bool(row["is_candidate_for_crossborder"]) == filters["crossborder"] for row in rows)
+    if "is_origin_usa" in filters:
+        assert all(bool(row["is_origin_usa"]) == filters["is_origin_usa"] for row in rows)
+    if "min_score" in filters:
+        assert all(row["business_opportunity_score"] >= filters["min_score"] for row in rows)
@@ -1,33 +1,192 @@
 #!/usr/bin/env python3
+"""
+Summary KPIs of known records. The expected dicts are what the original hand-written
+calculate_summary returned for the same rows, except pct_regime_IN, which it filled
+with the A1 percentage.
 
-# Test the values tuple structure
-values = (
-    'importer_name', 'rfc', 'total_pedimentos_last_6_months', 
-    'total_freight_usd_value', 'avg_freight_usd_per_shipment', 
-    'customs_offices_used', 'pct_shipments_key_locations',
-    'pct_regime_A1', 'pct_regime_F4', 'pct_regime_IN', 
-    'pct_regime_A3', 'pct_regime_AF',
-    'pct_transport_carretero', 'pct_transport_aereo', 
-    'pct_transport_maritimo', 'pct_transport_not_declared',
-    'pct_port_NUEVO_LAREDO', 'pct_port_COLOMBIA_NL', 
-    'pct_port_MONTERREY_AIRPORT', 'pct_port_MANZANILLO',
-    'pct_port_PUEBLA', 'pct_port_OTHERS', 'pct_hs_84', 
-    'pct_hs_85', 'pct_hs_90', 'pct_hs_73', 'pct_hs_74',
-    'pct_hs_OTROS', 'is_origin_usa', 'is_candidate_for_crossborder', 
-    'pct_incoterm_DAP', 'pct_incoterm_EXW',
-    'pct_incoterm_FCA', 'pct_incoterm_OTROS', 'custom_brokers_used', 
-    'top_custom_broker_id', 'pct_top_custom_broker_id', 
-    'num_custom_brokers_used', 'pct_broker_3995', 'pct_broker_3714', 'pct_broker_1720', 'pct_origin_TAIWAN', 
-    'pct_origin_VIETNAM', 'pct_origin_CHINA', 'pct_origin_USA',
-    'pct_origin_GERMANY', 'pct_origin_DENMARK', 'pct_origin_FRANCE', 
-    'pct_origin_OTROS', 'last_import_date', 'first_import_date', 
-    'total_weight_kg', 'avg_weight_per_shipment',
-    'business_opportunity_score', 'crossborder_potential', 
-    'ocean_freight_potential', 'supply_chain_potential'
+    python -m pytest test_values.py
+"""
+
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+import main
+
+IMPORTER = "ACME IMPORTS SA DE CV"
+
+# Positions of the source columns in a SELECT * FROM import_records row
+FIELDS = {
+    "dispatch_date": 1, "country": 6, "transport": 8, "hscode": 9, "weight": 10, "value": 11,
+    "dispatch_customs": 12, "entry_customs": 13, "broker": 14, "regime": 16, "rfc": 19, "incoterm": 20,
+}
+
+
+def record(**values) -> tuple:
+    row = [None] * 28
+    for name, value in values.items():
+        row[FIELDS[name]] = value
+    return tuple(row)
+
+
+NUEVO_LAREDO = "NUEVO LAREDO, NUEVO LAREDO, TAMAULIPAS"
+MANZANILLO = "MANZANILLO, MANZANILLO, COLIMA"
+AICM = "AEROPUERTO INTERNACIONAL DE LA CIUDAD DE MEXICO, CIUDAD DE MEXICO, CIUDAD DE MEXICO"
+ROAD_FROM_USA = dict(
+    transport="CARRETERO", entry_customs=NUEVO_LAREDO, dispatch_customs=NUEVO_LAREDO,
+    country="ESTADOS UNIDOS DE AMERICA", rfc="ABC010101XYZ",
 )
 
-print(f"Number of values: {len(values)}")
-print("Values:")
-for i, val in enumerate(values):
-    print(f"{i+1}: {val}")
+USA_RECORDS = [
+    record(dispatch_date=date(2024, 1, 5), hscode="8481", weight=Decimal("1200.50"), value=Decimal("25000.00"), broker="3995", regime="A1", incoterm="DAP", **ROAD_FROM_USA),
+    record(dispatch_date=date(2024, 1, 19), hscode="8413", weight=Decimal("800.00"), value=Decimal("18000.25"), broker="3995", regime="A1", incoterm="DAP", **ROAD_FROM_USA),
+    record(dispatch_date=date(2024, 2, 2), hscode="8536", weight=Decimal("150.75"), value=Decimal("9200.00"), broker="3714", regime="IN", incoterm="EXW", **ROAD_FROM_USA),
+    record(dispatch_date=date(2024, 2, 28), hscode="9026", weight=Decimal("45.00"), value=Decimal("31000.00"), broker="1720", regime="A1", incoterm="FCA", **ROAD_FROM_USA),
+    record(dispatch_date=date(2024, 3, 14), hscode="7318", weight=Decimal("2300.00"), value=Decimal("12500.50"), broker="3995", regime="F4", incoterm="DAP", **ROAD_FROM_USA),
+    record(dispatch_date=date(2024, 3, 30), hscode="7411", weight=Decimal("560.00"), value=Decimal("7400.00"), broker="1973", regime="IN", incoterm="NO INFORMADO", **ROAD_FROM_USA),
+    record(dispatch_date=date(2024, 4, 11), hscode="8481", weight=Decimal("990.10"), value=Decimal("22000.00"), broker="3995", regime="A1", incoterm="DAP", **ROAD_FROM_USA),
+    record(dispatch_date=date(2024, 5, 6), hscode="3926", weight=Decimal("75.00"), value=Decimal("4300.00"), broker="3714", regime="A1", incoterm="CIF",
+           transport="MARÍTIMO", entry_customs=MANZANILLO, dispatch_customs=MANZANILLO, country="CHINA", rfc="ABC010101XYZ"),
+    record(dispatch_date=date(2024, 5, 21), hscode="8504", weight=Decimal("12.30"), value=Decimal("15800.00"), broker="1893", regime="A1", incoterm="FCA",
+           transport="AÉREO", entry_customs=AICM, dispatch_customs=AICM, country="ALEMANIA", rfc="ABC010101XYZ"),
+    record(dispatch_date=date(2024, 6, 3), hscode="8481", weight=Decimal("1410.00"), value=Decimal("26750.75"), broker="3995", regime="A1", incoterm="DAP", **ROAD_FROM_USA),
+    record(dispatch_date=date(2024, 6, 17), hscode="84", weight=Decimal("630.40"), value=Decimal("19999.99"), broker="1720", regime="A3", incoterm="FOB", **ROAD_FROM_USA),
+    record(dispatch_date=date(2024, 6, 29), hscode="9032", weight=Decimal("38.60"), value=Decimal("11250.00"), broker="1983", regime="A1", incoterm="DAP", **ROAD_FROM_USA),
+]
+
+# NULL and empty source columns, and rows without a dispatch date
+SPARSE_RECORDS = [
+    record(dispatch_date=date(2024, 2, 10), country="TAIWAN", transport="FERROVIARIO", hscode="8", weight=Decimal("10.00"),
+           value=Decimal("1000.00"), regime="C1", incoterm="CFR", broker=""),
+    record(country="Vietnam", transport="", hscode="", value=Decimal("0.00"), regime="F5", incoterm="",
+           entry_customs="PUEBLA, HEROICA PUEBLA DE ZARAGOZA, PUEBLA"),
+    record(dispatch_date=date(2024, 2, 1), country="FRANCIA", transport="AEREO", hscode="9018", weight=Decimal("3.25"),
+           value=Decimal("520.10"), regime="AF", incoterm="EXW", broker="3714", dispatch_customs="TIJUANA, TIJUANA, BAJA CALIFORNIA"),
+    record(),
+]
+
+PORTS = [
+    "NUEVO_LAREDO", "COLOMBIA_NL", "MONTERREY_AIRPORT", "MANZANILLO", "PUEBLA", "AIFA_AIRPORT", "NOGALES",
+    "ALTAMIRA", "AICM_AIRPORT", "LAZARO", "VERACRUZ", "TIJUANA", "GUAYMAS", "OTHERS",
+]
+
+
+def ports(**pcts) -> dict:
+    return {f"pct_port_{port}": pcts.get(port, 0.0) for port in PORTS}
+
+
+USA_SUMMARY = {
+    "importer_name": IMPORTER,
+    "rfc": "ABC010101XYZ",
+    "total_pedimentos_last_6_months": 12,
+    "total_freight_usd_value": 203201.49,
+    "avg_freight_usd_per_shipment": 16933.46,
+    "customs_offices_used": "6",
+    "pct_shipments_key_locations": 0.0,
+    "pct_regime_A1": 66.67, "pct_regime_F4": 8.33, "pct_regime_IN": 16.67, "pct_regime_A3": 8.33,
+    "pct_regime_AF": 0.0, "pct_regime_C1": 0.0, "pct_regime_F5": 0.0, "pct_regime_OTHERS": 0.0,
+    "pct_transport_carretero": 83.33, "pct_transport_aereo": 8.33, "pct_transport_maritimo": 8.33,
+    "pct_transport_not_declared": 0.0,
+    **ports(NUEVO_LAREDO=83.33, MANZANILLO=8.33, AICM_AIRPORT=8.33),
+    "pct_hs_84": 41.67, "pct_hs_85": 16.67, "pct_hs_90": 16.67, "pct_hs_73": 8.33, "pct_hs_74": 8.33,
+    "pct_hs_OTROS": 8.33,
+    "is_origin_usa": 1,
+    "is_candidate_for_crossborder": 1,
+    "pct_incoterm_DAP": 50.0, "pct_incoterm_EXW": 8.33, "pct_incoterm_FCA": 16.67, "pct_incoterm_FOB": 8.33,
+    "pct_incoterm_CIF": 8.33, "pct_incoterm_CFR": 0.0, "pct_incoterm_NOT_INFORMED": 8.33, "pct_incoterm_OTROS": 0.0,
+    "custom_brokers_used": "3995, 3714, 1720, 1973, 1893",
+    "top_custom_broker_id": "3995",
+    "pct_top_custom_broker_id": 41.67,
+    "num_custom_brokers_used": 6,
+    "pct_broker_3995": 41.67, "pct_broker_3714": 16.67, "pct_broker_1720": 16.67,
+    "pct_origin_TAIWAN": 0.0, "pct_origin_VIETNAM": 0.0, "pct_origin_CHINA": 8.33, "pct_origin_USA": 83.33,
+    "pct_origin_GERMANY": 8.33, "pct_origin_DENMARK": 0.0, "pct_origin_FRANCE": 0.0, "pct_origin_OTROS": 0.0,
+    "last_import_date": date(2024, 6, 29),
+    "first_import_date": date(2024, 1, 5),
+    "total_weight_kg": 8212.65,
+    "avg_weight_per_shipment": 684.39,
+    "business_opportunity_score": 9,
+    "crossborder_potential": 1,
+    "ocean_freight_potential": 0,
+    "supply_chain_potential": 0,
+}
+
+SPARSE_SUMMARY = {
+    "importer_name": IMPORTER,
+    "rfc": "",
+    "total_pedimentos_last_6_months": 4,
+    "total_freight_usd_value": 1520.1,
+    "avg_freight_usd_per_shipment": 380.02,
+    "customs_offices_used": "1",
+    "pct_shipments_key_locations": 0.0,
+    "pct_regime_A1": 0.0, "pct_regime_F4": 0.0, "pct_regime_IN": 0.0, "pct_regime_A3": 0.0,
+    "pct_regime_AF": 25.0, "pct_regime_C1": 25.0, "pct_regime_F5": 25.0, "pct_regime_OTHERS": 25.0,
+    "pct_transport_carretero": 0.0, "pct_transport_aereo": 25.0, "pct_transport_maritimo": 0.0,
+    "pct_transport_not_declared": 75.0,
+    **ports(PUEBLA=25.0, TIJUANA=25.0, OTHERS=50.0),
+    "pct_hs_84": 0.0, "pct_hs_85": 0.0, "pct_hs_90": 25.0, "pct_hs_73": 0.0, "pct_hs_74": 0.0,
+    "pct_hs_OTROS": 75.0,
+    "is_origin_usa": 0,
+    "is_candidate_for_crossborder": 0,
+    "pct_incoterm_DAP": 0.0, "pct_incoterm_EXW": 25.0, "pct_incoterm_FCA": 0.0, "pct_incoterm_FOB": 0.0,
+    "pct_incoterm_CIF": 0.0, "pct_incoterm_CFR": 25.0, "pct_incoterm_NOT_INFORMED": 0.0, "pct_incoterm_OTROS": 50.0,
+    "custom_brokers_used": "3714",
+    "top_custom_broker_id": "3714",
+    "pct_top_custom_broker_id": 25.0,
+    "num_custom_brokers_used": 1,
+    "pct_broker_3995": 0.0, "pct_broker_3714": 25.0, "pct_broker_1720": 0.0,
+    "pct_origin_TAIWAN": 25.0, "pct_origin_VIETNAM": 25.0, "pct_origin_CHINA": 0.0, "pct_origin_USA": 0.0,
+    "pct_origin_GERMANY": 0.0, "pct_origin_DENMARK": 0.0, "pct_origin_FRANCE": 25.0, "pct_origin_OTROS": 25.0,
+    "last_import_date": date(2024, 2, 10),
+    "first_import_date": date(2024, 2, 1),
+    "total_weight_kg": 13.25,
+    "avg_weight_per_shipment": 3.31,
+    "business_opportunity_score": 1,
+    "crossborder_potential": 0,
+    "ocean_freight_potential": 0,
+    "supply_chain_potential": 0,
+}
+
+BACKENDS = ["python", pytest.param("numpy", marks=pytest.mark.skipif(main.np is None, reason="NumPy is not installed"))]
+
+
+def aggregate(records: list) -> dict:
+    return main.aggregate_summary_columns(main.pack_summary_columns(records))
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("records,expected", [(USA_RECORDS, USA_SUMMARY), (SPARSE_RECORDS, SPARSE_SUMMARY)],
+                         ids=["usa", "sparse"])
+def test_known_records(records, expected, backend, monkeypatch):
+    monkeypatch.setattr(main, "SUMMARY_BACKEND", backend)
+    summary = main.calculate_summary(IMPORTER, records)
+
+    assert summary == expected
+    # Same columns, in the order import_summaries stores them
+    assert tuple(summary) == tuple(main.SUMMARY_COLUMN_NAMES)
+
+
+def test_no_records():
+    assert main.calculate_summary(IMPORTER, []) is None
+    assert main.finalize_summary(IMPORTER, main.empty_summary_aggregate()) is None
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_merged_aggregates_match_direct_computation(backend, monkeypatch):
+    monkeypatch.setattr(main, "SUMMARY_BACKEND", backend)
+    records = USA_RECORDS + SPARSE_RECORDS
+    # Monthly aggregates plus an undated chunk, the way get_window_aggregate_async combines them
+    chunks: dict = {}
+    for row in records:
+        month = row[1].replace(day=1) if row[1] else None
+        chunks.setdefault(month, []).append(row)
+    merged = main.merge_summary_aggregates([aggregate(chunk) for chunk in chunks.values()] + [main.empty_summary_aggregate()])
+    direct = aggregate(records)
 
+    assert merged["record_count"] == direct["record_count"] == len(records)
+    assert merged["freight_sum"] == pytest.approx(direct["freight_sum"])
+    assert merged["weight_sum"] == pytest.approx(direct["weight_sum"])
+    for key in ("rfc", "first_date", "last_date", *main.SUMMARY_COUNTER_DIMENSIONS):
+        assert merged[key] == direct[key], key
+    assert main.finalize_summary(IMPORTER, merged) == main.calculate_summary(IMPORTER, records)